@@ -0,0 +1,353 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+from pipeline import parse
+from properties import characters
+from syntax import Alternative
+from syntax import Anchor
+from syntax import Backref
+from syntax import CharSet
+from syntax import Group
+from syntax import Node
+from syntax import Sequence
+from utils import Range
+
+LINEAR = 'linear'
+POLYNOMIAL = 'polynomial'
+EXPONENTIAL = 'exponential'
+
+ANY = ~Range()
+
+
+class Report(NamedTuple):
+    pattern: str
+    complexity: Optional[str]
+    reason: Optional[str]
+    offending: Optional[str]
+    degree: int
+    nodes: int
+    depth: int
+    states: int
+    error: Optional[str] = None
+
+
+class _Loop(NamedTuple):
+    first: int
+    last: int
+    span: Tuple[int, int]
+    nested: bool
+
+
+class _Automaton:
+
+    def __init__(self):
+        self.chars = []
+        self.follow = []
+        self.loops = []
+        self.owners = {}
+
+    def position(self, chars: Range) -> int:
+        self.chars.append(chars)
+        self.follow.append({})
+
+        return len(self.chars) - 1
+
+    def link(self, sources: Set[int], targets: Set[int], owner: int = None) -> None:
+        for source in sources:
+            follow = self.follow[source]
+            for target in targets:
+                follow[target] = follow.get(target, 0) + 1
+                if owner is not None:
+                    self.owners.setdefault((source, target), []).append(owner)
+
+    def build(self, node: Node) -> Tuple[bool, Set[int], Set[int]]:
+        if isinstance(node, CharSet):
+            values = characters(node)
+            p = self.position(ANY if values is None else ~values if node.negated else values)
+            return False, {p}, {p}
+
+        if isinstance(node, Backref):
+            p = self.position(ANY)
+            return False, {p}, {p}
+
+        if isinstance(node, Anchor):
+            return True, set(), set()
+
+        if isinstance(node, Alternative):
+            return self.alternative(node)
+
+        if isinstance(node, Sequence):
+            return self.sequence(node)
+
+        return self.repeat(node)
+
+    def alternative(self, node: Alternative) -> Tuple[bool, Set[int], Set[int]]:
+        nullable, first, last = False, set(), set()
+        for item in node.items:
+            n, f, la = self.build(item)
+            nullable, first, last = nullable or n, first | f, last | la
+
+        return nullable, first, last
+
+    def sequence(self, node: Sequence) -> Tuple[bool, Set[int], Set[int]]:
+        nullable, first, last = True, set(), set()
+        for item in node.items:
+            n, f, la = self.build(item)
+            self.link(last, f)
+            first = first | f if nullable else first
+            last = last | la if n else la
+            nullable = nullable and n
+
+        return nullable, first, last
+
+    def repeat(self, node: Node) -> Tuple[bool, Set[int], Set[int]]:
+        start = len(self.chars)
+        nested = len(self.loops)
+        nullable, first, last = self.build(node.item)
+        quantifier = node.quantifier
+        if quantifier is None:
+            return nullable, first, last
+
+        if quantifier.upper == 0:
+            return True, set(), set()
+
+        if quantifier.upper is None or quantifier.upper > 1:
+            self.link(last, first, len(self.loops))
+            self.loops.append(_Loop(start, len(self.chars), (node.start, node.end), len(self.loops) > nested))
+
+        return nullable or quantifier.lower == 0, first, last
+
+
+def _push(node: int, index: Dict[int, int], low: Dict[int, int], stack: List[int], on_stack: Set[int]) -> None:
+    index[node] = low[node] = len(index)
+    stack.append(node)
+    on_stack.add(node)
+
+
+def _pop(node: int, stack: List[int], on_stack: Set[int]) -> List[int]:
+    component = []
+    while True:
+        member = stack.pop()
+        on_stack.discard(member)
+        component.append(member)
+        if member == node:
+            return component
+
+
+def _components(follow: List[Dict[int, int]]) -> List[List[int]]:
+    index, low, stack, on_stack, result = {}, {}, [], set(), []
+    for root in range(len(follow)):
+        if root in index:
+            continue
+
+        work = [(root, iter(follow[root]))]
+        _push(root, index, low, stack, on_stack)
+        while work:
+            node, targets = work[-1]
+            for target in targets:
+                if target not in index:
+                    _push(target, index, low, stack, on_stack)
+                    work.append((target, iter(follow[target])))
+                    break
+
+                if target in on_stack:
+                    low[node] = min(low[node], index[target])
+            else:
+                work.pop()
+                if work:
+                    low[work[-1][0]] = min(low[work[-1][0]], low[node])
+                if low[node] == index[node]:
+                    result.append(_pop(node, stack, on_stack))
+
+    return result
+
+
+def _overlapping(
+        automaton: _Automaton,
+        component: Set[int],
+        overlap: Dict[Tuple[int, int], bool],
+        pair: Tuple[int, int],
+) -> Iterator[Tuple[int, int]]:
+    chars, follow = automaton.chars, automaton.follow
+    for q1 in follow[pair[0]]:
+        if q1 not in component:
+            continue
+
+        for q2 in follow[pair[1]]:
+            if q2 not in component:
+                continue
+
+            key = (q1, q2) if q1 <= q2 else (q2, q1)
+            if key not in overlap:
+                overlap[key] = bool(chars[q1] & chars[q2])
+            if overlap[key]:
+                yield q1, q2
+
+
+def _pairs(automaton: _Automaton, component: Set[int]) -> Set[Tuple[int, int]]:
+    overlap, forward, pending, backward = {}, set(), [(p, p) for p in component], {}
+    while pending:
+        pair = pending.pop()
+        if pair in forward:
+            continue
+
+        forward.add(pair)
+        for following in _overlapping(automaton, component, overlap, pair):
+            backward.setdefault(following, []).append(pair)
+            pending.append(following)
+
+    reaching, pending = set(), [(p, p) for p in component]
+    while pending:
+        pair = pending.pop()
+        if pair in reaching:
+            continue
+
+        reaching.add(pair)
+        pending.extend(backward.get(pair, ()))
+
+    return forward & reaching
+
+
+def _ambiguous(automaton: _Automaton, component: Set[int]) -> Tuple[bool, Optional[_Loop]]:
+    for p in component:
+        for q, count in automaton.follow[p].items():
+            if count > 1 and q in component:
+                owners = automaton.owners.get((p, q))
+                return True, automaton.loops[max(owners)] if owners else _innermost(automaton, component)
+
+    if any(p != q for p, q in _pairs(automaton, component)):
+        return True, _innermost(automaton, component)
+
+    return False, None
+
+
+def _innermost(automaton: _Automaton, members: Iterable[int]) -> Optional[_Loop]:
+    members = list(members)
+    low, high = min(members), max(members)
+    loops = [loop for loop in automaton.loops if loop.first <= low and high < loop.last]
+
+    return min(loops, key=lambda loop: loop.last - loop.first, default=None)
+
+
+def _chains(automaton: _Automaton, loops: List[Set[int]]) -> Tuple[int, Optional[Tuple[int, int]]]:
+    chars, follow = automaton.chars, automaton.follow
+    looping = [Range([i for p in loop for i in chars[p]]) for loop in loops]
+    longest = [1] * len(loops)
+    ends = [max(loop) for loop in loops]
+    for i in reversed(range(len(loops))):
+        for j in range(len(loops)):
+            if i == j:
+                continue
+
+            common = looping[i] & looping[j]
+            if not common:
+                continue
+
+            seen, pending = set(), [q for p in loops[i] for q in follow[p] if q not in loops[i]]
+            while pending:
+                p = pending.pop()
+                if p in seen or not (chars[p] & common):
+                    continue
+
+                seen.add(p)
+                if p in loops[j]:
+                    if longest[j] + 1 > longest[i]:
+                        longest[i] = longest[j] + 1
+                        ends[i] = ends[j]
+                    break
+
+                pending.extend(follow[p])
+
+    best = max(range(len(loops)), key=lambda i: longest[i], default=None)
+    if best is None or longest[best] < 2:
+        return 1, None
+
+    return longest[best], (min(loops[best]), ends[best])
+
+
+def _measure(node: Node, depth: int = 1) -> Tuple[int, int, int]:
+    if isinstance(node, (CharSet, Anchor, Backref)):
+        return 1, depth, 1
+
+    if isinstance(node, (Alternative, Sequence)):
+        measures = [_measure(item, depth + 1) for item in node.items]
+        states = sum(m[2] for m in measures) + (2 * (len(measures) - 1) if isinstance(node, Alternative) else 0)
+        return sum(m[0] for m in measures) + 1, max(m[1] for m in measures), states
+
+    count, deepest, states = _measure(node.item, depth + 1)
+    if isinstance(node, Group) and node.capturing:
+        states += 2
+    quantifier = node.quantifier
+    if quantifier is None:
+        return count + 1, deepest, states
+
+    lower, upper = quantifier.lower, quantifier.upper
+    states = lower * states + ((states + 2) if upper is None else (upper - lower) * (states + 1))
+
+    return count + 2, deepest, states
+
+
+def analyze_tree(tree: Node, pattern: str = '') -> Report:
+    nodes, depth, states = _measure(tree)
+    automaton = _Automaton()
+    automaton.build(tree)
+
+    loops = []
+    for component in _components(automaton.follow):
+        members = set(component)
+        if len(members) == 1 and component[0] not in automaton.follow[component[0]]:
+            continue
+
+        ambiguous, loop = _ambiguous(automaton, members)
+        if ambiguous:
+            span = loop.span if loop else (0, len(pattern))
+            reason = 'nested quantifiers' if loop and loop.nested else 'ambiguous alternation'
+            return Report(pattern, EXPONENTIAL, reason, pattern[span[0]:span[1]], 0, nodes, depth, states + 3)
+
+        loops.append(members)
+
+    loops.sort(key=min)
+    degree, positions = _chains(automaton, loops)
+    if positions is None:
+        return Report(pattern, LINEAR, None, None, 1, nodes, depth, states + 3)
+
+    first, last = _innermost(automaton, [positions[0]]), _innermost(automaton, [positions[1]])
+    start = first.span[0] if first else 0
+    end = last.span[1] if last else len(pattern)
+
+    return Report(pattern, POLYNOMIAL, 'overlapping adjacent quantifiers', pattern[start:end], degree, nodes, depth,
+                  states + 3)
+
+
+def analyze(pattern: str) -> Report:
+    try:
+        tree = parse(pattern)
+    except Exception as e:
+        return Report(pattern, None, None, None, 0, 0, 0, 0, f'{type(e).__name__}: {e}')
+
+    return analyze_tree(tree, pattern)
+
+
+def analyze_many(patterns: Iterable[str], workers: int = None, chunksize: int = 64) -> Iterator[Report]:
+    if workers == 1:
+        yield from map(analyze, patterns)
+        return
+
+    window = (workers or os.cpu_count() or 1) * chunksize * 4
+    patterns = iter(patterns)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while True:
+            chunk = list(islice(patterns, window))
+            if not chunk:
+                break
+
+            yield from executor.map(analyze, chunk, chunksize=chunksize)
@@ -0,0 +1,284 @@
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from functools import partial
+from itertools import islice
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import TextIO
+from typing import Tuple
+
+from budget import Budget
+from diskcache import DiskCache
+from pipeline import build
+from pipeline import graph_visitor
+from pipeline import parse
+from profiling import Profile
+from rendering import graphviz_version
+from rendering import Image
+from rendering import render
+import svg
+from utils import convert
+
+MAX_NAME = 200
+
+
+class Translation(NamedTuple):
+    pattern: str
+    dot: Optional[str]
+    error: Optional[str]
+    image: Optional[str] = None
+    profile: Optional[Profile] = None
+
+
+class Outcome(NamedTuple):
+    pattern: str
+    path: Optional[str]
+    error: Optional[str]
+
+
+def _record(line: str) -> str:
+    record = json.loads(line)
+    pattern = record['pattern'] if isinstance(record, dict) else record
+    if not isinstance(pattern, str):
+        raise TypeError(f'expected a string pattern, got {type(pattern).__name__}')
+
+    return pattern
+
+
+def read_patterns(file: TextIO, jsonl: bool = False, errors: List[Outcome] = None) -> Iterator[str]:
+    seen = set()
+    for number, line in enumerate(file, 1):
+        line = line.rstrip('\r\n')
+        if not line.strip():
+            continue
+
+        if jsonl:
+            try:
+                pattern = _record(line)
+            except (KeyError, TypeError, ValueError) as e:
+                if errors is not None:
+                    errors.append(Outcome(line, None, f'line {number}: {type(e).__name__}: {e}'))
+                continue
+        else:
+            pattern = line
+
+        if pattern not in seen:
+            seen.add(pattern)
+            yield pattern
+
+
+def filename(pattern: str) -> str:
+    name = re.sub(r'\W', '_', pattern)
+    if name == pattern and len(name) <= MAX_NAME:
+        return name
+
+    return f"{name[:MAX_NAME - 17]}_{hashlib.sha1(pattern.encode()).hexdigest()[:16]}"
+
+
+def cache_keys(
+        cache: DiskCache,
+        pattern: str,
+        fmt: str = 'png',
+        keep_dot: bool = False,
+        engine: str = 'dot',
+        share: bool = False,
+        budget: Budget = None,
+) -> Dict[str, str]:
+    graphviz = graphviz_version() if fmt != 'dot' and engine == 'dot' else None
+    keys = {
+        fmt: cache.key(
+            pattern, fmt, engine=engine if fmt != 'dot' else None, share=share, budget=budget, graphviz=graphviz,
+        ),
+    }
+    if keep_dot and fmt != 'dot':
+        keys['dot'] = cache.key(pattern, 'dot', engine=None, share=share, budget=budget)
+
+    return keys
+
+
+def restore(cache: DiskCache, pattern: str, keys: Dict[str, str], directory: str = '.') -> Optional[Outcome]:
+    if not all(key in cache for key in keys.values()):
+        return None
+
+    paths = {fmt: os.path.join(directory, f'{filename(pattern)}.{fmt}') for fmt in keys}
+    for fmt, key in keys.items():
+        if not cache.copy(key, paths[fmt]):
+            return None
+
+    return Outcome(pattern, paths[next(iter(keys))], None)
+
+
+def translate(
+        pattern: str,
+        engine: str = 'dot',
+        keep_dot: bool = False,
+        profile: bool = False,
+        share: bool = False,
+        budget: Budget = None,
+) -> Translation:
+    if profile:
+        return _profiled(pattern, engine, share, budget)
+
+    try:
+        result = graph_visitor(share, budget=budget).draw(parse(pattern))
+    except Exception as e:
+        return Translation(pattern, None, f'{type(e).__name__}: {e}')
+
+    dot = convert(result, title=re.escape(pattern)) if engine == 'dot' or keep_dot else None
+    image = svg.convert(result, title=pattern) if engine == 'python' else None
+
+    return Translation(pattern, dot, None, image)
+
+
+def _profiled(pattern: str, engine: str, share: bool = False, budget: Budget = None) -> Translation:
+    profile = Profile()
+    try:
+        rendering = build(pattern, profile, share, budget)
+    except Exception as e:
+        return Translation(pattern, None, f'{type(e).__name__}: {e}', profile=profile)
+
+    image = None
+    if engine == 'python':
+        with profile.stage('render'):
+            image = svg.convert(rendering.graph, title=pattern)
+
+    return Translation(pattern, rendering.dot, None, image, profile)
+
+
+def _save(
+        directory: str,
+        pattern: str,
+        fmt: str,
+        data: bytes,
+        cache: Optional[DiskCache],
+        keys: Callable[[str], Dict[str, str]],
+) -> None:
+    with open(os.path.join(directory, f'{filename(pattern)}.{fmt}'), 'wb') as file:
+        file.write(data)
+    if cache is not None:
+        cache.put(keys(pattern)[fmt], data)
+
+
+def _image(translation: Translation, images: Optional[Iterator[Image]]) -> Tuple[Optional[bytes], Optional[str]]:
+    if translation.image is not None:
+        return translation.image.encode(), None
+
+    if images is None:
+        return None, None
+
+    image = next(images)
+
+    return image.data, image.error
+
+
+def emit(
+        translations: List[Translation],
+        directory: str = '.',
+        fmt: str = 'png',
+        keep_dot: bool = False,
+        processes: int = None,
+        batch: int = 8,
+        profile: Profile = None,
+        cache: DiskCache = None,
+        keys: Callable[[str], Dict[str, str]] = None,
+) -> Iterator[Outcome]:
+    translated = [t for t in translations if t.error is None]
+    if keep_dot or fmt == 'dot':
+        for translation in translated:
+            if translation.dot is None:
+                continue
+
+            _save(directory, translation.pattern, 'dot', translation.dot.encode(), cache, keys)
+
+    pending = [t.dot for t in translated if t.image is None]
+    images = render(pending, fmt, processes, batch) if fmt != 'dot' and pending else None
+    if profile is not None and images is not None:
+        with profile.stage('dot'):
+            images = iter(list(images))
+    for translation in translations:
+        data, error = _image(translation, images) if translation.error is None else (None, translation.error)
+        if error is not None:
+            yield Outcome(translation.pattern, None, error)
+            continue
+
+        if data is not None:
+            _save(directory, translation.pattern, fmt, data, cache, keys)
+
+        yield Outcome(translation.pattern, os.path.join(directory, f'{filename(translation.pattern)}.{fmt}'), None)
+
+
+def _restore(
+        cache: DiskCache,
+        chunk: List[str],
+        keys: Callable[[str], Dict[str, str]],
+        directory: str = '.',
+) -> Tuple[List[Outcome], List[str]]:
+    restored, missing = [], []
+    for pattern in chunk:
+        outcome = restore(cache, pattern, keys(pattern), directory)
+        if outcome is None:
+            missing.append(pattern)
+        else:
+            restored.append(outcome)
+
+    return restored, missing
+
+
+def run(
+        patterns: Iterable[str],
+        directory: str = '.',
+        fmt: str = 'png',
+        workers: int = None,
+        chunksize: int = 16,
+        keep_dot: bool = False,
+        processes: int = None,
+        batch: int = 8,
+        engine: str = 'dot',
+        profile: Profile = None,
+        share: bool = False,
+        budget: Budget = None,
+        cache: DiskCache = None,
+) -> Iterator[Outcome]:
+    keys = partial(cache_keys, cache, fmt=fmt, keep_dot=keep_dot, engine=engine, share=share, budget=budget)
+    task = partial(
+        translate,
+        engine=engine,
+        keep_dot=keep_dot,
+        profile=profile is not None,
+        share=share,
+        budget=budget,
+    )
+    window = (workers or os.cpu_count() or 1) * chunksize * 4
+    patterns = iter(patterns)
+    with ExitStack() as stack:
+        executor = None if workers == 1 else stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+        while True:
+            chunk = list(islice(patterns, window))
+            if not chunk:
+                break
+
+            if cache is not None:
+                restored, chunk = _restore(cache, chunk, keys, directory)
+                yield from restored
+
+            if executor is None:
+                translations = [task(pattern) for pattern in chunk]
+            else:
+                translations = list(executor.map(task, chunk, chunksize=chunksize))
+            if profile is not None:
+                for translation in translations:
+                    if translation.profile is not None:
+                        profile.update(translation.profile)
+            yield from emit(translations, directory, fmt, keep_dot, processes, batch, profile, cache, keys)
+
+    if cache is not None:
+        cache.prune()
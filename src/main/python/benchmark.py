@@ -0,0 +1,177 @@
+import gc
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import NamedTuple
+from typing import Tuple
+
+from arpeggio import visit_parse_tree
+
+import svg
+from descent import parse
+from pipeline import parser
+from syntax import SyntaxVisitor
+from utils import convert
+from visitor import GraphVisitor
+
+SIZES = ('small', 'medium', 'huge')
+STAGES = ('parse', 'visit', 'descent', 'draw', 'convert', 'render')
+
+Results = Dict[str, Any]
+
+
+class Regression(NamedTuple):
+    pattern: str
+    stage: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float('inf')
+
+
+def _small() -> Iterator[Tuple[str, str]]:
+    for i, pattern in enumerate((
+            "^(abc)?\\1$",
+            "[^]\\p{L}\\n\\x64-\\x65\\u0066-\\u0067a-bc]+",
+            ".?a*\\w+\\x64{2}\\u0064{0,3}",
+            ".??a*?\\w+?\\x64{2}?\\u0064{0,3}?",
+            "ab+c",
+            "abc|d",
+            ".*?(a|b){0,9}?",
+            "(XYZ)|(123)",
+    )):
+        yield f'sample-{i}', pattern
+
+
+def _structured(rng: random.Random, depth: int = 0) -> str:
+    r = rng.random()
+    if depth > 4 or r < 0.3:
+        result = rng.choice(('a', 'xyz', '\\d', '\\w', '[a-f0-9]', '[^\\s]', '.', '\\.', '\\u00e9'))
+    elif r < 0.5:
+        result = '(' + rng.choice(('', '?:')) + _structured(rng, depth + 1) + ')'
+    elif r < 0.8:
+        result = _structured(rng, depth + 1) + _structured(rng, depth + 1)
+    else:
+        result = _structured(rng, depth + 1) + '|' + _structured(rng, depth + 1)
+    if rng.random() < 0.3 and not result.endswith(('*', '+', '?', '}')):
+        result += rng.choice(('*', '+', '?', '{2}', '{1,3}', '*?'))
+
+    return result
+
+
+def _medium() -> Iterator[Tuple[str, str]]:
+    yield 'email', '[a-zA-Z0-9_.+\\-]+@[a-zA-Z0-9\\-]+\\.[a-zA-Z0-9\\-.]+'
+    yield 'ipv4', '((25[0-5]|2[0-4]\\d|[01]?\\d\\d?)\\.){3}(25[0-5]|2[0-4]\\d|[01]?\\d\\d?)'
+    yield 'url', '(https?|ftp)://[^\\s/$.?#].[^\\s]*(:\\d{1,5})?(/[\\w\\-./]*)?(\\?[\\w=&]*)?'
+    rng = random.Random(14)
+    for i in range(4):
+        yield f'generated-{i}', ''.join(_structured(rng) for _ in range(8))
+
+
+def _huge() -> Iterator[Tuple[str, str]]:
+    yield 'charset', '[' + ''.join(f'\\u{c:04x}-\\u{c + 3:04x}' for c in range(0x100, 0x2100, 8)) + ']+'
+    yield 'nesting', '(?:a' * 40 + ')+' * 40
+    yield 'alternation', '|'.join(f'word{i}' for i in range(1000))
+    yield 'literal', 'abcdefghij' * 500
+    rng = random.Random(41)
+    yield 'generated', ''.join(_structured(rng) for _ in range(120))
+
+
+def corpus(sizes: Tuple[str, ...] = SIZES) -> List[Tuple[str, str]]:
+    sources = {'small': _small, 'medium': _medium, 'huge': _huge}
+
+    return [(f'{size}/{name}', pattern) for size in sizes for name, pattern in sources[size]()]
+
+
+def _stages(pattern: str) -> List[Tuple[str, str, Callable[[Any], Any]]]:
+    return [
+        ('parse', 'pattern', lambda text: parser().parse(text)),
+        ('visit', 'parse', lambda tree: visit_parse_tree(tree, SyntaxVisitor(debug=False))),
+        ('descent', 'pattern', parse),
+        ('draw', 'descent', lambda ast: GraphVisitor().draw(ast)),
+        ('convert', 'draw', lambda graph: convert(graph, title=pattern)),
+        ('render', 'draw', lambda graph: svg.convert(graph, title=pattern)),
+    ]
+
+
+def _timed(stage: Callable[[Any], Any], value: Any, repeat: int, budget: float) -> Tuple[Any, float]:
+    best, spent = float('inf'), 0.0
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = stage(value)
+        elapsed = time.perf_counter() - start
+        best, spent = min(best, elapsed), spent + elapsed
+        if spent > budget:
+            break
+
+    return result, best
+
+
+def _peak(stage: Callable[[Any], Any], value: Any) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        stage(value)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return peak - before
+
+
+def measure(pattern: str, repeat: int = 5, budget: float = 1.0) -> Dict[str, Dict[str, float]]:
+    outputs, result = {'pattern': pattern}, {}
+    for name, source, stage in _stages(pattern):
+        outputs[name], seconds = _timed(stage, outputs[source], repeat, budget)
+        result[name] = {'seconds': seconds, 'peak': _peak(stage, outputs[source])}
+
+    return result
+
+
+def run(sizes: Tuple[str, ...] = SIZES, repeat: int = 5, budget: float = 1.0) -> Results:
+    return {
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'patterns': {name: {'length': len(pattern), 'stages': measure(pattern, repeat, budget)}
+                     for name, pattern in corpus(sizes)},
+    }
+
+
+def compare(
+        baseline: Results,
+        current: Results,
+        threshold: float = 0.2,
+        memory_threshold: float = 0.1,
+        floor: float = 0.5e-3,
+) -> List[Regression]:
+    regressions = []
+    for name, entry in current['patterns'].items():
+        before = baseline['patterns'].get(name)
+        if before is None:
+            continue
+
+        for stage, metrics in entry['stages'].items():
+            old = before['stages'].get(stage)
+            if old is None:
+                continue
+
+            if metrics['seconds'] > old['seconds'] * (1 + threshold) and metrics['seconds'] - old['seconds'] > floor:
+                regressions.append(Regression(name, stage, 'seconds', old['seconds'], metrics['seconds']))
+            if metrics['peak'] > old['peak'] * (1 + memory_threshold) and metrics['peak'] - old['peak'] > 1024:
+                regressions.append(Regression(name, stage, 'peak', old['peak'], metrics['peak']))
+
+    return regressions
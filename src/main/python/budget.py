@@ -0,0 +1,223 @@
+from collections import deque
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+
+from profiling import Profile
+from syntax import Alternative
+from syntax import Atom
+from syntax import CharSet
+from syntax import Group
+from syntax import Node
+from syntax import Sequence
+from syntax import SET
+from utils import add_edge
+from utils import Context
+from utils import Font
+from utils import Graph
+from utils import Range
+from utils import Shape
+from utils import Style
+from visitor import collapsible
+from visitor import GraphVisitor
+
+SUMMARY = 0
+SUMMARY_CAP = 10000
+
+
+class Budget(NamedTuple):
+    max_nodes: int = None
+    max_depth: int = None
+
+
+def amount(value: int) -> str:
+    if value < 1000:
+        return str(value)
+
+    if value < 1000000:
+        return f'{value / 1000:.1f}k'
+
+    return f'{value / 1000000:.1f}M'
+
+
+def children(node: Node) -> List[Node]:
+    if isinstance(node, (Alternative, Sequence)):
+        return node.items
+
+    if isinstance(node, (Atom, Group)):
+        return [node.item]
+
+    return []
+
+
+def whole(node: Node) -> bool:
+    if isinstance(node, Atom):
+        node = node.item
+
+    if isinstance(node, CharSet):
+        return node.kind != SET
+
+    return not isinstance(node, (Alternative, Sequence, Group))
+
+
+def width(node: Node) -> int:
+    if isinstance(node, CharSet):
+        return len(node.classes) + len(node.values.intervals) if node.kind == SET else 0
+
+    return len(children(node))
+
+
+def parts(node: Node) -> Iterator[Tuple[Optional[Node], int]]:
+    if isinstance(node, CharSet):
+        for _ in range(width(node)):
+            yield None, 1
+        return
+
+    running = False
+    for child in children(node):
+        collapsed = isinstance(node, Sequence) and collapsible(child)
+        if collapsed:
+            yield None, 0 if running else 2
+        elif whole(child):
+            yield None, 1 + len(children(child))
+        else:
+            yield child, 1
+        running = collapsed
+
+
+def size(node: Node, cap: int) -> int:
+    total, pending = 1, [node]
+    while pending and total <= cap:
+        for child, cost in parts(pending.pop()):
+            total += cost
+            if child is not None:
+                pending.append(child)
+            if total > cap:
+                break
+
+    return total
+
+
+def deeper(node: Node, limit: int) -> bool:
+    pending = [(node, 0)]
+    while pending:
+        node, depth = pending.pop()
+        if whole(node):
+            continue
+
+        if depth >= limit:
+            return True
+
+        pending.extend((child, depth + 1) for child, _ in parts(node) if child is not None)
+
+    return False
+
+
+def plan(tree: Node, max_nodes: int = None, max_depth: int = None) -> Dict[Node, int]:
+    result = {}
+    remaining = max_nodes - 1 if max_nodes else None
+    pending = deque([(tree, 0)])
+    while pending:
+        node, depth = pending.popleft()
+        needed = size(node, remaining + 1) - 1 if remaining is not None else 0
+        if (remaining is None or needed <= remaining) and (max_depth is None or not deeper(node, max_depth - depth)):
+            remaining = remaining - needed if remaining is not None else None
+            continue
+
+        spent = shown = 0
+        total, opened = width(node), []
+        if max_depth is None or depth < max_depth:
+            for child, cost in parts(node):
+                if remaining is not None and spent + cost + (shown + 1 < total) > remaining:
+                    break
+                spent, shown = spent + cost, shown + 1
+                if child is not None:
+                    opened.append(child)
+
+        if not shown:
+            result[node] = SUMMARY
+            continue
+
+        remaining = remaining - spent - (shown < total) if remaining is not None else None
+        result[node] = shown
+        pending.extend((child, depth + 1) for child in opened)
+
+    return result
+
+
+class BoundedVisitor(GraphVisitor):
+
+    def __init__(self, max_nodes: int = None, max_depth: int = None, profile: Profile = None, context: Context = None):
+        super().__init__(profile, context)
+        self.max_nodes = max_nodes
+        self.max_depth = max_depth
+        self.plan = {}
+
+    def draw(self, node: Node) -> Graph:
+        if self.max_nodes or self.max_depth is not None:
+            self.plan = plan(node, self.max_nodes, self.max_depth)
+        graph = super().draw(node)
+        self.plan = {}
+
+        return graph
+
+    def visit(self, node: Node) -> Graph:
+        shown = self.plan.get(node)
+        if shown == SUMMARY:
+            return self._summary(node)
+
+        if shown is None:
+            return super().visit(node)
+
+        if isinstance(node, CharSet):
+            classes = sorted(node.classes)
+            intervals = node.values.intervals[:max(0, shown - len(classes))]
+            hidden = width(node) - shown
+            truncated = CharSet(node.start, node.end, Range(intervals), node.negated, frozenset(classes[:shown]), SET,
+                                node.text)
+            return self._more(super().visit(truncated), hidden, 'ranges')
+
+        if isinstance(node, (Alternative, Sequence)) and shown < len(node.items):
+            graph = super().visit(type(node)(node.start, node.end, node.items[:shown]))
+            return self._more(graph, len(node.items) - shown, 'branches' if isinstance(node, Alternative) else 'items')
+
+        return super().visit(node)
+
+    def _more(self, graph: Graph, hidden: int, unit: str) -> Graph:
+        if not hidden:
+            return graph
+
+        source = graph['top']
+        more = self.builder.add_node(f'... {amount(hidden)} more {unit}', font=Font.ITALIC, shape=Shape.BOX,
+                                     style=Style.DASHED)
+        graph = self.builder.merge(graph, more)
+
+        return add_edge(source, more['top'], graph)
+
+    def _summary(self, node: Node) -> Graph:
+        if isinstance(node, Alternative):
+            label = f'alternative ({amount(len(node.items))} branches)'
+            return self.builder.add_node(label, font=Font.ITALIC, shape=Shape.DIAMOND, style=Style.ROUNDED)
+
+        if isinstance(node, Sequence):
+            label = f'sequence ({amount(len(node.items))} items)'
+            return self.builder.add_node(label, font=Font.ITALIC, shape=Shape.BOX, style=Style.ROUNDED)
+
+        if isinstance(node, (Atom, Group)):
+            label = 'atom' if isinstance(node, Atom) else 'group' if node.capturing else '?:group'
+            hidden = size(node, SUMMARY_CAP) - 1
+            note = f'{amount(hidden)} nodes' if hidden < SUMMARY_CAP else f'{amount(SUMMARY_CAP)}+ nodes'
+            return self._wrapper(label, node.quantifier, note)
+
+        if isinstance(node, CharSet) and node.kind == SET:
+            return self.builder.add_node(
+                f"{'^' if node.negated else ''}charset ({amount(width(node))} ranges)",
+                font=Font.ITALIC,
+                shape=Shape.TRAPEZIUM,
+                color=self.context.theme.negated if node.negated else None,
+            )
+
+        return super().visit(node)
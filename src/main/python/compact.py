@@ -0,0 +1,212 @@
+import sys
+from array import array
+from collections.abc import Mapping
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import Tuple
+
+from utils import Color
+from utils import Font
+from utils import Graph
+from utils import Line
+from utils import Shape
+from utils import Style
+
+Codes = Tuple[Any, ...]
+
+FONTS = (None, *(f.value for f in Font))
+SHAPES = (None, *(s.value for s in Shape))
+STYLES = (None, *(s.value for s in Style))
+COLORS = (None, *(c.value for c in Color))
+LINES = (None, *(line.value for line in Line))
+
+Fields = Dict[str, Codes]
+
+NODE_FIELDS = {
+    'fontname': FONTS,
+    'shape': SHAPES,
+    'style': STYLES,
+    'color': COLORS,
+}
+
+EDGE_FIELDS = {
+    'fontcolor': COLORS,
+    'shape': LINES,
+    'color': COLORS,
+}
+
+
+def _encode(fields: Fields, content: Dict[str, Any]) -> Tuple[Dict[str, int], Dict[str, Any]]:
+    codes, extras = {}, {}
+    for key, value in content.items():
+        if key == 'label':
+            continue
+        values = fields.get(key, ())
+        if value in values:
+            codes[key] = values.index(value)
+        else:
+            extras[key] = value
+
+    return codes, extras
+
+
+def _decode(fields: Fields, label: str, codes: Tuple[int, ...], extras: Dict[str, Any]) -> Dict[str, Any]:
+    content = {} if label is None else {'label': label}
+    for (name, values), code in zip(fields.items(), codes):
+        if code:
+            content[name] = values[code]
+    content.update(extras)
+
+    return content
+
+
+class CompactGraph(Mapping):
+    __slots__ = (
+        'top', 'idents', 'labels', 'fonts', 'shapes', 'styles', 'colors', 'extras',
+        'offsets', 'targets', 'edge_labels', 'edge_fontcolors', 'edge_lines', 'edge_colors', 'edge_extras',
+        '_index',
+    )
+
+    def __init__(self):
+        self.top = None
+        self.idents = array('q')
+        self.labels = []
+        self.fonts = array('b')
+        self.shapes = array('b')
+        self.styles = array('b')
+        self.colors = array('b')
+        self.extras = {}
+        self.offsets = array('q', [0])
+        self.targets = array('q')
+        self.edge_labels = []
+        self.edge_fontcolors = array('b')
+        self.edge_lines = array('b')
+        self.edge_colors = array('b')
+        self.edge_extras = {}
+        self._index = None
+
+    @classmethod
+    def from_graph(cls, graph: Graph) -> 'CompactGraph':
+        result = cls()
+        result.top = graph.get('top', None)
+        edges = graph.get('edges', {})
+        for ident, node in graph.get('nodes', {}).items():
+            result._add_node(ident, node)
+            for target, edge in edges.get(ident, {}).items():
+                result._add_edge(target, edge)
+            result.offsets.append(len(result.targets))
+
+        return result
+
+    def _add_node(self, ident: int, node: Dict[str, Any]):
+        label = node.get('label', None)
+        codes, extras = _encode(NODE_FIELDS, node)
+        if extras:
+            self.extras[len(self.idents)] = extras
+        self.idents.append(ident)
+        self.labels.append(None if label is None else sys.intern(label))
+        self.fonts.append(codes.get('fontname', 0))
+        self.shapes.append(codes.get('shape', 0))
+        self.styles.append(codes.get('style', 0))
+        self.colors.append(codes.get('color', 0))
+
+    def _add_edge(self, target: int, edge: Dict[str, Any]):
+        label = edge.get('label', None)
+        codes, extras = _encode(EDGE_FIELDS, edge)
+        if extras:
+            self.edge_extras[len(self.targets)] = extras
+        self.targets.append(target)
+        self.edge_labels.append(None if label is None else sys.intern(label))
+        self.edge_fontcolors.append(codes.get('fontcolor', 0))
+        self.edge_lines.append(codes.get('shape', 0))
+        self.edge_colors.append(codes.get('color', 0))
+
+    def position(self, ident: int) -> int:
+        if self._index is None:
+            self._index = {ident: i for i, ident in enumerate(self.idents)}
+
+        return self._index[ident]
+
+    def node(self, i: int) -> Dict[str, Any]:
+        codes = (self.fonts[i], self.shapes[i], self.styles[i], self.colors[i])
+
+        return _decode(NODE_FIELDS, self.labels[i], codes, self.extras.get(i, {}))
+
+    def neighbours(self, i: int) -> Dict[int, Dict[str, Any]]:
+        result = {}
+        for j in range(self.offsets[i], self.offsets[i + 1]):
+            codes = (self.edge_fontcolors[j], self.edge_lines[j], self.edge_colors[j])
+            result[self.targets[j]] = _decode(EDGE_FIELDS, self.edge_labels[j], codes, self.edge_extras.get(j, {}))
+
+        return result
+
+    def to_graph(self) -> Graph:
+        return {
+            'top': self.top,
+            'nodes': dict(self['nodes'].items()),
+            'edges': dict(self['edges'].items()),
+        }
+
+    def __getitem__(self, key: str) -> Any:
+        if key == 'top':
+            return self.top
+
+        if key == 'nodes':
+            return NodesView(self)
+
+        if key == 'edges':
+            return EdgesView(self)
+
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(('top', 'nodes', 'edges'))
+
+    def __len__(self) -> int:
+        return 3
+
+
+class NodesView(Mapping):
+    __slots__ = ('graph',)
+
+    def __init__(self, graph: CompactGraph):
+        self.graph = graph
+
+    def __getitem__(self, ident: int) -> Dict[str, Any]:
+        return self.graph.node(self.graph.position(ident))
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.graph.idents)
+
+    def __len__(self) -> int:
+        return len(self.graph.idents)
+
+
+class EdgesView(Mapping):
+    __slots__ = ('graph',)
+
+    def __init__(self, graph: CompactGraph):
+        self.graph = graph
+
+    def __getitem__(self, source: int) -> Dict[int, Dict[str, Any]]:
+        try:
+            i = self.graph.position(source)
+        except KeyError:
+            raise KeyError(source) from None
+        if self.graph.offsets[i] == self.graph.offsets[i + 1]:
+            raise KeyError(source)
+
+        return self.graph.neighbours(i)
+
+    def __iter__(self) -> Iterator[int]:
+        offsets = self.graph.offsets
+
+        return (ident for i, ident in enumerate(self.graph.idents) if offsets[i] < offsets[i + 1])
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+def compact(graph: Graph) -> CompactGraph:
+    return CompactGraph.from_graph(graph)
@@ -0,0 +1,375 @@
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+from syntax import Alternative
+from syntax import Anchor
+from syntax import ANY
+from syntax import Atom
+from syntax import Backref
+from syntax import CATEGORY
+from syntax import CharSet
+from syntax import CLASS
+from syntax import ESCAPE
+from syntax import Group
+from syntax import Node
+from syntax import Quantifier
+from syntax import Sequence
+from syntax import SET
+from utils import Interval
+from utils import MAX_ORDER
+from utils import order
+from utils import Range
+
+WHITESPACE = frozenset(' \t')
+HEX = frozenset('0123456789abcdefABCDEF')
+LETTERS = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz_')
+SPECIAL = frozenset('$()*+,.?[]\\^{|}')
+ANCHORS = frozenset('ABbGZz')
+CLASSES = frozenset('DdSsWw')
+UNESCAPED = frozenset('ABbDdGSsUuWwxZz')
+ESCAPED_IN_RANGE = frozenset(']tnvfr-')
+NEWLINE = Range.of(ord('\n'))
+CODES = {'x': 2, 'u': 4, 'U': 8}
+
+_literals = {}
+
+
+class ParseError(ValueError):
+
+    def __init__(self, message: str, position: int):
+        super().__init__(f'{message} at position {position}')
+        self.position = position
+
+
+def _literal(code: int) -> Range:
+    value = _literals.get(code)
+    if value is None:
+        value = _literals[code] = Range.of(code)
+
+    return value
+
+
+class _Parser:
+    __slots__ = ('text', 'pos', 'groups')
+
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+        self.groups = 0
+
+    def skip(self) -> int:
+        text, pos = self.text, self.pos
+        while pos < len(text) and text[pos] in WHITESPACE:
+            pos += 1
+        self.pos = pos
+
+        return pos
+
+    def peek(self) -> str:
+        pos = self.skip()
+
+        return self.text[pos] if pos < len(self.text) else ''
+
+    def fail(self, expected: str) -> ParseError:
+        found = self.text[self.pos:self.pos + 10] or 'end of pattern'
+
+        return ParseError(f'Expected {expected}, found {found!r}', self.pos)
+
+    def regex(self) -> Node:
+        node = self.alternative()
+        if self.skip() < len(self.text):
+            raise self.fail("'|' or end of pattern")
+
+        return node
+
+    def alternative(self) -> Node:
+        items = [self.sequence()]
+        while self.peek() == '|':
+            self.pos += 1
+            items.append(self.sequence())
+
+        if len(items) == 1:
+            return items[0]
+
+        return Alternative(items[0].start, items[-1].end, items)
+
+    def sequence(self) -> Node:
+        items = []
+        while True:
+            item = self.match()
+            if item is None:
+                break
+            items.append(item)
+
+        if not items:
+            raise self.fail('an atom, group, anchor or backreference')
+
+        if len(items) == 1:
+            return items[0]
+
+        return Sequence(items[0].start, items[-1].end, items)
+
+    def match(self) -> Optional[Node]:
+        char = self.peek()
+        text, start = self.text, self.pos
+        if char in ('$', '^'):
+            self.pos += 1
+            return Anchor(start, self.pos, char)
+
+        if char == '(':
+            return self.group()
+
+        if char == '\\':
+            following = text[start + 1:start + 2]
+            if following and following in ANCHORS:
+                self.pos += 2
+                return Anchor(start, self.pos, text[start:self.pos])
+
+            if following.isdecimal():
+                end = start + 2
+                while end < len(text) and text[end].isdecimal():
+                    end += 1
+                self.pos = end
+                return Backref(start, end, int(text[start + 1:end]))
+
+        item = self.leaf()
+        if item is None:
+            return None
+
+        quantifier = self.quantifier()
+
+        return Atom(start, quantifier.end if quantifier else item.end, item, quantifier)
+
+    def leaf(self) -> Optional[CharSet]:
+        text, start = self.text, self.pos
+        char = text[start] if start < len(text) else ''
+        if char == '.':
+            self.pos += 1
+            return CharSet(start, self.pos, NEWLINE, True, kind=ANY, text=char)
+
+        if char == '[':
+            return self.character_set()
+
+        if char == '\\':
+            item = self.shorthand()
+            if item is not None:
+                return item
+
+            following = text[start + 1:start + 2]
+            if not following or following in UNESCAPED or following == '\n':
+                raise self.fail('a valid escape')
+
+            self.pos += 2
+            return CharSet(start, self.pos, order(text[start:self.pos]), kind=ESCAPE, text=text[start:self.pos])
+
+        if not char or char in SPECIAL:
+            return None
+
+        self.pos += 1
+
+        return CharSet(start, self.pos, _literal(ord(char)), text=char)
+
+    def shorthand(self) -> Optional[CharSet]:
+        text, start = self.text, self.pos
+        following = text[start + 1:start + 2]
+        if following in ('p', 'P'):
+            end = self.category(start)
+            if end:
+                self.pos = end
+                return CharSet(start, end, Range(), False, frozenset((text[start:end],)), CATEGORY, text[start:end])
+
+        elif following and following in CLASSES:
+            self.pos += 2
+            return CharSet(start, self.pos, order(text[start:self.pos]), kind=CLASS, text=text[start:self.pos])
+
+        else:
+            code = self.code(start)
+            if code is not None:
+                self.pos = code[1]
+                return CharSet(start, self.pos, _literal(code[0]), text=text[start:self.pos])
+
+        return None
+
+    def category(self, start: int) -> int:
+        text = self.text
+        if text[start + 2:start + 3] != '{':
+            return 0
+
+        end = start + 3
+        while end < len(text) and text[end] in LETTERS:
+            end += 1
+
+        return end + 1 if end > start + 3 and text[end:end + 1] == '}' else 0
+
+    def code(self, start: int) -> Optional[Tuple[int, int]]:
+        text = self.text
+        following = text[start + 1:start + 2]
+        size = CODES.get(following, 0)
+        digits = text[start + 2:start + 2 + size]
+        if size and len(digits) == size and all(d in HEX for d in digits) and int(digits, 16) <= MAX_ORDER:
+            return int(digits, 16), start + 2 + size
+
+        return None
+
+    def set_class(self, classes: Set[str], intervals: List[Interval]) -> bool:
+        text = self.text
+        following = text[self.pos + 1:self.pos + 2]
+        end = self.category(self.pos) if following in ('p', 'P') else 0
+        if end:
+            classes.add(text[self.pos:end])
+            self.pos = end
+            return True
+
+        if following and following in CLASSES:
+            intervals.extend(order(text[self.pos:self.pos + 2]))
+            self.pos += 2
+            return True
+
+        return False
+
+    def character_set(self) -> CharSet:
+        text, start = self.text, self.pos
+        self.pos += 1
+        negated = self.peek() == '^'
+        if negated:
+            self.pos += 1
+
+        classes, intervals = set(), []
+        if self.peek() in (']', '-'):
+            intervals.append((ord(text[self.pos]), ord(text[self.pos])))
+            self.pos += 1
+
+        while True:
+            char = self.peek()
+            if char == ']':
+                self.pos += 1
+                break
+
+            if char == '\\' and self.set_class(classes, intervals):
+                continue
+
+            first = self.character()
+            if first is None:
+                raise self.fail("']'")
+
+            if self.peek() != '-':
+                intervals.extend(first)
+                continue
+
+            self.pos += 1
+            self.skip()
+            last = self.character()
+            if last is None:
+                raise self.fail('the end of a character range')
+
+            bounds = [b for c in (first, last) for interval in c for b in interval]
+            intervals.append((min(bounds), max(bounds)))
+
+        return CharSet(start, self.pos, Range(intervals), negated, frozenset(classes), SET)
+
+    def character(self) -> Optional[Range]:
+        text, start = self.text, self.pos
+        char = text[start] if start < len(text) else ''
+        if char == '\\':
+            code = self.code(start)
+            if code is not None:
+                self.pos = code[1]
+                return _literal(code[0])
+
+            following = text[start + 1:start + 2]
+            if following and following in ESCAPED_IN_RANGE:
+                self.pos += 2
+                return order(text[start:self.pos])
+
+        if not char or char in (']', '-'):
+            return None
+
+        self.pos += 1
+
+        return _literal(ord(char))
+
+    def group(self) -> Group:
+        text, start = self.text, self.pos
+        self.pos += 1
+        self.skip()
+        capturing = text[self.pos:self.pos + 2] != '?:'
+        index = None
+        if capturing:
+            self.groups += 1
+            index = self.groups
+        else:
+            self.pos += 2
+
+        item = self.alternative()
+        if self.peek() != ')':
+            raise self.fail("')'")
+
+        self.pos += 1
+        end = self.pos
+        quantifier = self.quantifier()
+        group = Group(start, quantifier.end if quantifier else end, item, capturing, quantifier)
+        group.index = index
+
+        return group
+
+    def quantifier(self) -> Optional[Quantifier]:
+        char = self.peek()
+        start = self.pos
+        if char == '?':
+            bounds = 0, 1, char
+        elif char == '*':
+            bounds = 0, None, char
+        elif char == '+':
+            bounds = 1, None, char
+        elif char == '{':
+            bounds = self.n_times()
+            if bounds is None:
+                self.pos = start
+                return None
+        else:
+            return None
+
+        if char != '{':
+            self.pos += 1
+        end = self.pos
+        greedy = self.peek() != '?'
+        if not greedy:
+            self.pos += 1
+            end = self.pos
+
+        return Quantifier(start, end, bounds[0], bounds[1], greedy, bounds[2])
+
+    def n_times(self) -> Optional[Tuple[int, int, str]]:
+        self.pos += 1
+        numbers = [self.number()]
+        if numbers[0] is None:
+            return None
+
+        if self.peek() == ',':
+            self.pos += 1
+            numbers.append(self.number())
+            if numbers[1] is None:
+                return None
+
+        if self.peek() != '}':
+            return None
+
+        self.pos += 1
+        lower = int(numbers[0])
+
+        return lower, int(numbers[-1]), f"{{{','.join(numbers)}}}"
+
+    def number(self) -> Optional[str]:
+        text, start = self.text, self.skip()
+        end = start
+        while end < len(text) and text[end].isdecimal():
+            end += 1
+        self.pos = end
+
+        return text[start:end] or None
+
+
+def parse(pattern: str) -> Node:
+    return _Parser(pattern).regex()
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Iterator
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+
+RENDERERS = (
+    'batch',
+    'budget',
+    'descent',
+    'grammar',
+    'pipeline',
+    'profiling',
+    'properties',
+    'rendering',
+    'svg',
+    'syntax',
+    'unicode_tables',
+    'utils',
+    'visitor',
+)
+
+
+class CacheStats(NamedTuple):
+    entries: int
+    size: int
+
+
+def source_version() -> str:
+    digest = hashlib.sha1()
+    for name in RENDERERS:
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), f'{name}.py'), 'rb') as file:
+            digest.update(file.read())
+
+    return digest.hexdigest()[:16]
+
+
+VERSION = source_version()
+
+
+class DiskCache:
+
+    def __init__(self, directory: str, max_bytes: Optional[int] = None, version: str = VERSION):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, pattern: str, fmt: str, **options) -> str:
+        content = json.dumps([self.version, pattern, fmt, sorted(options.items())], default=repr)
+
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key[2:])
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+
+        self._touch(path)
+        self.hits += 1
+
+        return data
+
+    def copy(self, key: str, destination: str) -> bool:
+        path = self.path(key)
+        try:
+            shutil.copyfile(path, destination)
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+
+        self._touch(path)
+        self.hits += 1
+
+        return True
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                file.write(data)
+            os.replace(temporary, path)
+        except BaseException:
+            try:
+                os.unlink(temporary)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def entries(self) -> Iterator[Tuple[str, float, int]]:
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir() or len(shard.name) != 2:
+                continue
+
+            for entry in os.scandir(shard.path):
+                if entry.name.startswith('.tmp-'):
+                    continue
+
+                try:
+                    status = entry.stat()
+                except FileNotFoundError:
+                    continue
+
+                yield entry.path, status.st_mtime, status.st_size
+
+    def stats(self) -> CacheStats:
+        entries = size = 0
+        for _, _, length in self.entries():
+            entries += 1
+            size += length
+
+        return CacheStats(entries, size)
+
+    def prune(self, max_bytes: Optional[int] = None) -> int:
+        limit = max_bytes if max_bytes is not None else self.max_bytes
+        if limit is None:
+            return 0
+
+        entries = sorted(self.entries(), key=lambda entry: entry[1])
+        total = sum(length for _, _, length in entries)
+        removed = 0
+        for path, _, length in entries:
+            if total <= limit:
+                break
+
+            try:
+                os.unlink(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            total -= length
+
+        return removed
+
+    @staticmethod
+    def _touch(path: str) -> None:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
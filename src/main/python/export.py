@@ -0,0 +1,380 @@
+import json
+import mmap
+import os
+import struct
+import sys
+import weakref
+from array import array
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import TextIO
+from typing import Tuple
+
+from compact import compact
+from compact import CompactGraph
+from compact import EDGE_FIELDS
+from compact import NODE_FIELDS
+from utils import Graph
+
+VERSION = 1
+MAGIC = b'DRXG'
+END = b'DRXE'
+NONE = 0xFFFFFFFF
+
+HEADER = struct.Struct('<4sHHQ')
+RECORD = struct.Struct('<IIIi')
+TRAILER = struct.Struct('<QQQI4s')
+
+NODE_COLUMNS = (('labels', 'I'), ('extras', 'I'), *((field, 'b') for field in NODE_FIELDS))
+EDGE_COLUMNS = (
+    ('targets', 'I'),
+    ('edge_labels', 'I'),
+    ('edge_extras', 'I'),
+    *((f'edge_{field}', 'b') for field in EDGE_FIELDS),
+)
+
+
+class FormatError(ValueError):
+    pass
+
+
+def _padded(size: int) -> int:
+    return -size % 4
+
+
+class Pool:
+
+    def __init__(self, strings: Iterable[str] = ()):
+        self.strings = []
+        self.ids = {}
+        for string in strings:
+            self.add(string)
+
+    def add(self, string: Optional[str]) -> int:
+        if string is None:
+            return NONE
+
+        ident = self.ids.get(string)
+        if ident is None:
+            ident = self.ids[string] = len(self.strings)
+            self.strings.append(string)
+
+        return ident
+
+    def encode(self) -> bytes:
+        blobs = [string.encode('utf-8', 'surrogatepass') for string in self.strings]
+        offsets = array('Q', [0])
+        for blob in blobs:
+            offsets.append(offsets[-1] + len(blob))
+        if sys.byteorder != 'little':
+            offsets.byteswap()
+
+        return struct.pack('<Q', len(blobs)) + offsets.tobytes() + b''.join(blobs)
+
+
+def tables() -> str:
+    return json.dumps({'nodes': NODE_FIELDS, 'edges': EDGE_FIELDS})
+
+
+def _columns(graph: CompactGraph, pool: Pool) -> Tuple[int, List[array], List[array]]:
+    position = {ident: i for i, ident in enumerate(graph.idents)}
+    extras = [pool.add(json.dumps(graph.extras[i], sort_keys=True)) if i in graph.extras else NONE
+              for i in range(len(graph.idents))]
+    nodes = [
+        array('I', [pool.add(label) for label in graph.labels]),
+        array('I', extras),
+        graph.fonts,
+        graph.shapes,
+        graph.styles,
+        graph.colors,
+        array('I', graph.offsets),
+    ]
+    edge_extras = [pool.add(json.dumps(graph.edge_extras[j], sort_keys=True)) if j in graph.edge_extras else NONE
+                   for j in range(len(graph.targets))]
+    edges = [
+        array('I', [position[target] for target in graph.targets]),
+        array('I', [pool.add(label) for label in graph.edge_labels]),
+        array('I', edge_extras),
+        graph.edge_fontcolors,
+        graph.edge_lines,
+        graph.edge_colors,
+    ]
+
+    return position.get(graph.top, -1), nodes, edges
+
+
+class GraphWriter:
+
+    def __init__(self, path: str, append: bool = False):
+        self.pool = Pool([tables()])
+        self.index = array('Q')
+        exists = append and os.path.exists(path) and os.path.getsize(path) > 0
+        self.file = open(path, 'r+b' if exists else 'wb')
+        if exists:
+            with GraphFile(path) as existing:
+                if existing.tables != tables():
+                    raise FormatError(f'{path} was written with different attribute tables')
+                self.pool = Pool(existing.string(i) for i in range(existing.strings))
+                self.index.extend(existing.offsets)
+                pointer = existing.trailer_offset
+            if not HEADER.unpack_from(self._header())[3]:
+                self._point(pointer)
+            self.file.seek(0, os.SEEK_END)
+        else:
+            self.file.write(HEADER.pack(MAGIC, VERSION, 0, 0))
+
+    def _header(self) -> bytes:
+        self.file.seek(0)
+
+        return self.file.read(HEADER.size)
+
+    def _point(self, trailer_offset: int) -> None:
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, 0, trailer_offset))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def add(self, pattern: str, graph: Graph) -> int:
+        packed = graph if isinstance(graph, CompactGraph) else compact(graph)
+        top, nodes, edges = _columns(packed, self.pool)
+        self.index.append(self.file.tell())
+        chunks = [RECORD.pack(len(packed.idents), len(packed.targets), self.pool.add(pattern), top)]
+        for column in (*nodes, *edges):
+            if sys.byteorder != 'little' and column.itemsize > 1:
+                column = array(column.typecode, column)
+                column.byteswap()
+            data = column.tobytes()
+            chunks.append(data + b'\0' * _padded(len(data)))
+        self.file.write(b''.join(chunks))
+
+        return len(self.index) - 1
+
+    def close(self) -> None:
+        if self.file.closed:
+            return
+
+        pool_offset = self.file.tell()
+        self.file.write(self.pool.encode())
+        pad = -self.file.tell() % 8
+        self.file.write(b'\0' * pad)
+        index_offset = self.file.tell()
+        index = array('Q', self.index)
+        if sys.byteorder != 'little':
+            index.byteswap()
+        self.file.write(index.tobytes())
+        trailer_offset = self.file.tell()
+        self.file.write(TRAILER.pack(pool_offset, index_offset, len(self.index), 0, END))
+        self._point(trailer_offset)
+        self.file.close()
+
+    def __enter__(self) -> 'GraphWriter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _view(buffer: memoryview, offset: int, count: int, typecode: str, views: Dict = None) -> Tuple[Any, int]:
+    size = count * array(typecode).itemsize
+    view = buffer[offset:offset + size].cast(typecode)
+    if sys.byteorder != 'little' and view.itemsize > 1:
+        view = array(typecode, view)
+        view.byteswap()
+    elif views is not None:
+        key = id(view)
+        views[key] = weakref.ref(view, lambda _: views.pop(key, None))
+
+    return view, offset + size + _padded(size)
+
+
+class Strings:
+    __slots__ = ('file', 'ids')
+
+    def __init__(self, file: 'GraphFile', ids: Any):
+        self.file = file
+        self.ids = ids
+
+    def __getitem__(self, i: int) -> Optional[str]:
+        ident = self.ids[i]
+
+        return None if ident == NONE else self.file.string(ident)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class Extras:
+    __slots__ = ('file', 'ids')
+
+    def __init__(self, file: 'GraphFile', ids: Any):
+        self.file = file
+        self.ids = ids
+
+    def get(self, i: int, default: Any = None) -> Any:
+        ident = self.ids[i]
+
+        return default if ident == NONE else json.loads(self.file.string(ident))
+
+    def __contains__(self, i: int) -> bool:
+        return 0 <= i < len(self.ids) and self.ids[i] != NONE
+
+
+class StoredGraph(CompactGraph):
+    __slots__ = ('pattern',)
+
+    def __init__(self, file: 'GraphFile', offset: int):
+        buffer = file.buffer
+        nodes, edges, pattern, top = RECORD.unpack_from(buffer, offset)
+        offset += RECORD.size
+        columns = {}
+        for name, typecode in NODE_COLUMNS:
+            columns[name], offset = _view(buffer, offset, nodes, typecode, file.views)
+        columns['offsets'], offset = _view(buffer, offset, nodes + 1, 'I', file.views)
+        for name, typecode in EDGE_COLUMNS:
+            columns[name], offset = _view(buffer, offset, edges, typecode, file.views)
+
+        self.pattern = file.string(pattern)
+        self.top = None if top < 0 else top
+        self.idents = range(nodes)
+        self.labels = Strings(file, columns['labels'])
+        self.extras = Extras(file, columns['extras'])
+        self.fonts = columns['fontname']
+        self.shapes = columns['shape']
+        self.styles = columns['style']
+        self.colors = columns['color']
+        self.offsets = columns['offsets']
+        self.targets = columns['targets']
+        self.edge_labels = Strings(file, columns['edge_labels'])
+        self.edge_extras = Extras(file, columns['edge_extras'])
+        self.edge_fontcolors = columns['edge_fontcolor']
+        self.edge_lines = columns['edge_shape']
+        self.edge_colors = columns['edge_color']
+        self._index = None
+
+    def position(self, ident: int) -> int:
+        if not isinstance(ident, int) or not 0 <= ident < len(self.idents):
+            raise KeyError(ident)
+
+        return ident
+
+
+class GraphFile:
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self._file.close()
+            raise
+
+        self.buffer = memoryview(self._map)
+        self.views = {}
+        self.offsets = self._string_offsets = None
+        self._cache = {}
+        try:
+            self._load()
+        except BaseException:
+            self.close()
+            raise
+
+    def _load(self) -> None:
+        path = self.path
+        magic, version, _, pointer = HEADER.unpack_from(bytes(self.buffer[:HEADER.size]).ljust(HEADER.size, b'\0'))
+        if magic != MAGIC or len(self.buffer) < HEADER.size + TRAILER.size:
+            raise FormatError(f'{path} is not a graph export')
+
+        if version != VERSION:
+            raise FormatError(f'{path} has layout version {version}, expected {VERSION}')
+
+        self.trailer_offset = pointer or len(self.buffer) - TRAILER.size
+        if self.trailer_offset + TRAILER.size > len(self.buffer):
+            raise FormatError(f'{path} is truncated (trailer at {self.trailer_offset} is past the end)')
+
+        trailer = TRAILER.unpack_from(self.buffer, self.trailer_offset)
+        self.pool_offset, index_offset, count, _, end = trailer
+        if end != END:
+            raise FormatError(f'{path} is truncated (missing trailer)')
+
+        self.offsets, _ = _view(self.buffer, index_offset, count, 'Q')
+        self.strings = struct.unpack_from('<Q', self.buffer, self.pool_offset)[0]
+        self._string_offsets, self._blobs = _view(self.buffer, self.pool_offset + 8, self.strings + 1, 'Q')
+        self.tables = self.string(0)
+        if self.tables != tables():
+            raise FormatError(f'{path} was written with different attribute tables')
+
+    def string(self, ident: int) -> str:
+        string = self._cache.get(ident)
+        if string is None:
+            start, end = self._string_offsets[ident], self._string_offsets[ident + 1]
+            data = self.buffer[self._blobs + start:self._blobs + end]
+            string = self._cache[ident] = str(data, 'utf-8', 'surrogatepass')
+
+        return string
+
+    def pattern(self, i: int) -> str:
+        return self.string(RECORD.unpack_from(self.buffer, self.offsets[i])[2])
+
+    def __getitem__(self, i: int) -> StoredGraph:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+
+        return StoredGraph(self, self.offsets[i])
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __iter__(self) -> Iterator[StoredGraph]:
+        return (self[i] for i in range(len(self)))
+
+    def close(self) -> None:
+        if self._map.closed:
+            return
+
+        self._cache.clear()
+        columns = [reference() for reference in list(self.views.values())]
+        self.views.clear()
+        for view in (*columns, self.offsets, self._string_offsets, self.buffer):
+            if isinstance(view, memoryview):
+                view.release()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> 'GraphFile':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def as_json(pattern: str, graph: Graph) -> Dict[str, Any]:
+    position = {ident: i for i, ident in enumerate(graph['nodes'])}
+    edges = graph['edges']
+
+    return {
+        'pattern': pattern,
+        'top': position.get(graph['top']),
+        'nodes': [dict(node) for node in graph['nodes'].values()],
+        'edges': [[position[source], position[target], dict(edge)]
+                  for source in graph['nodes'] if source in edges
+                  for target, edge in edges[source].items()],
+    }
+
+
+def write_jsonl(items: Iterable[Tuple[str, Graph]], file: TextIO) -> int:
+    count = 0
+    for pattern, graph in items:
+        file.write(json.dumps(as_json(pattern, graph), ensure_ascii=False))
+        file.write('\n')
+        count += 1
+
+    return count
@@ -47,7 +47,7 @@ def character_element():
 
 
 def character_category():
-    return RegExMatch(r'\\p\{[A-Za-z]+\}')
+    return RegExMatch(r'\\[pP]\{[A-Za-z_]+\}')
 
 
 def character_class():
@@ -87,7 +87,7 @@ def n_times():
 
 
 def symbol():
-    return RegExMatch(r'[^$()*+,.?\[\]^{|}]')
+    return RegExMatch(r'[^$()*+,.?\[\]\\^{|}]')
 
 
 def symbol_in_range():
@@ -95,7 +95,7 @@ def symbol_in_range():
 
 
 def escaped():
-    return RegExMatch(r'\\[^ABbDdGSsuWwxZz]')
+    return RegExMatch(r'\\[^ABbDdGSsUuWwxZz]')
 
 
 def escaped_in_range():
@@ -107,4 +107,4 @@ def ascii_code():
 
 
 def unicode():
-    return RegExMatch(r'\\u[0-9a-fA-F]{4}?')
+    return RegExMatch(r'\\u[0-9a-fA-F]{4}|\\U(?:000[0-9a-fA-F]|0010)[0-9a-fA-F]{4}')
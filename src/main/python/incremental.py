@@ -0,0 +1,117 @@
+import re
+from collections import Counter
+from typing import Dict
+from typing import FrozenSet
+from typing import NamedTuple
+from typing import Tuple
+
+from pipeline import parse
+from pipeline import Rendering
+from syntax import Alternative
+from syntax import Atom
+from syntax import Group
+from syntax import Node
+from syntax import Sequence
+from syntax import walk
+from utils import convert
+from utils import Graph
+from visitor import GraphVisitor
+
+CACHED = (Alternative, Sequence, Group, Atom)
+
+Key = Tuple[str, str, int]
+
+
+class Changes(NamedTuple):
+    added: FrozenSet[int]
+    removed: FrozenSet[int]
+
+
+def keys(tree: Node, pattern: str) -> Dict[Node, Key]:
+    result, seen = {}, Counter()
+    for node in walk(tree):
+        if isinstance(node, CACHED):
+            content = type(node).__name__, pattern[node.start:node.end]
+            result[node] = (*content, seen[content])
+            seen[content] += 1
+
+    return result
+
+
+def diff(before: Graph, after: Graph) -> Changes:
+    old, new = before['nodes'].keys(), after['nodes'].keys()
+
+    return Changes(frozenset(new - old), frozenset(old - new))
+
+
+class IncrementalVisitor(GraphVisitor):
+
+    def __init__(self):
+        super().__init__()
+        self.cache = {}
+        self.keys = {}
+        self.touched = []
+        self.hits = 0
+        self.misses = 0
+
+    def draw(self, node: Node, pattern: str = None) -> Graph:
+        self.keys = keys(node, pattern) if pattern is not None else {}
+        self.touched = []
+        self.hits = self.misses = 0
+        graph = self.builder.build(self.visit(node))
+
+        live = set(self.touched)
+        self.cache = {key: entry for key, entry in self.cache.items() if key in live}
+        self.builder.nodes = graph['nodes'].copy()
+        self.builder.edges = graph['edges'].copy()
+
+        return graph
+
+    def visit(self, node: Node) -> Graph:
+        key = self.keys.get(node)
+        if key is None:
+            return super().visit(node)
+
+        entry = self.cache.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.touched.extend(entry[1])
+            self.touched.append(key)
+            return entry[0]
+
+        self.misses += 1
+        start = len(self.touched)
+        graph = super().visit(node)
+        self.cache[key] = graph, self.touched[start:]
+        self.touched.append(key)
+
+        return graph
+
+
+class IncrementalRenderer:
+
+    def __init__(self, using: str = None):
+        self.using = using
+        self.visitor = IncrementalVisitor()
+        self.previous = None
+
+    def render(self, pattern: str) -> Rendering:
+        tree = parse(pattern, using=self.using)
+        graph = self.visitor.draw(tree, pattern)
+        self.previous = graph
+
+        return Rendering(tree, graph, convert(graph, title=re.escape(pattern)))
+
+    def update(self, pattern: str) -> Tuple[Rendering, Changes]:
+        before = self.previous or {'nodes': {}}
+        rendering = self.render(pattern)
+
+        return rendering, diff(before, rendering.graph)
+
+    def reset(self) -> None:
+        self.visitor = IncrementalVisitor()
+        self.previous = None
+
+    @property
+    def stats(self) -> Tuple[int, int]:
+        return self.visitor.hits, self.visitor.misses
@@ -0,0 +1,253 @@
+from typing import Any
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+from pipeline import parse
+from properties import characters
+from properties import unknown
+from syntax import Alternative
+from syntax import Anchor
+from syntax import Atom
+from syntax import Backref
+from syntax import CharSet
+from syntax import Group
+from syntax import Node
+from syntax import Quantifier
+from syntax import Sequence
+from syntax import walk
+from utils import WORD
+
+MATCH, SET, SPLIT, JMP, LOOP, SAVE, ASSERT = range(7)
+
+Instruction = Tuple[Any, ...]
+Captures = Tuple[Optional[int], ...]
+
+
+class Unsupported(ValueError):
+    pass
+
+
+def emit(node: Node, program: List[Instruction]) -> None:
+    if isinstance(node, CharSet):
+        values = characters(node)
+        if values is None:
+            raise Unsupported(f"Category {', '.join(unknown(node))} is not supported (at {node.start})")
+
+        program.append((SET, values, node.negated))
+
+    elif isinstance(node, Anchor):
+        if node.kind == '\\G':
+            raise Unsupported(f"Anchor {node.kind} is not supported (at {node.start})")
+
+        program.append((ASSERT, node.kind))
+
+    elif isinstance(node, Backref):
+        raise Unsupported(f"Backreference \\{node.number} cannot be matched in linear time (at {node.start})")
+
+    elif isinstance(node, Sequence):
+        for item in node.items:
+            emit(item, program)
+
+    elif isinstance(node, Alternative):
+        _alternative(node, program)
+
+    elif node.quantifier is not None:
+        _repeat(node, node.quantifier, program)
+
+    else:
+        _once(node, program)
+
+
+def _alternative(node: Alternative, program: List[Instruction]) -> None:
+    jumps = []
+    for item in node.items[:-1]:
+        split = len(program)
+        program.append(None)
+        emit(item, program)
+        jumps.append(len(program))
+        program.append(None)
+        program[split] = (SPLIT, split + 1, len(program))
+    emit(node.items[-1], program)
+    for jump in jumps:
+        program[jump] = (JMP, len(program))
+
+
+def _once(node: Union[Atom, Group], program: List[Instruction]) -> None:
+    if isinstance(node, Atom) or node.index is None:
+        emit(node.item, program)
+    else:
+        program.append((SAVE, 2 * node.index))
+        emit(node.item, program)
+        program.append((SAVE, 2 * node.index + 1))
+
+
+def _repeat(node: Union[Atom, Group], quantifier: Quantifier, program: List[Instruction]) -> None:
+    lower, upper, greedy = quantifier.lower, quantifier.upper, quantifier.greedy
+    for _ in range(lower):
+        _once(node, program)
+
+    if upper is None:
+        start = len(program)
+        program.append(None)
+        _once(node, program)
+        program.append((LOOP, start, len(program) + 1))
+        program[start] = (SPLIT, start + 1, len(program)) if greedy else (SPLIT, len(program), start + 1)
+    else:
+        splits = []
+        for _ in range(upper - lower):
+            splits.append(len(program))
+            program.append(None)
+            _once(node, program)
+        for split in splits:
+            program[split] = (SPLIT, split + 1, len(program)) if greedy else (SPLIT, len(program), split + 1)
+
+
+def _is_word(string: str, i: int) -> bool:
+    return 0 <= i < len(string) and ord(string[i]) in WORD
+
+
+def _holds(kind: str, string: str, i: int) -> bool:
+    if kind in ('^', '\\A'):
+        return i == 0
+
+    if kind == '$':
+        return i == len(string) or (i == len(string) - 1 and string[i] == '\n')
+
+    if kind in ('\\Z', '\\z'):
+        return i == len(string)
+
+    if kind == '\\b':
+        return _is_word(string, i - 1) != _is_word(string, i)
+
+    if kind == '\\B':
+        return _is_word(string, i - 1) == _is_word(string, i)
+
+    raise Unsupported(f"Anchor {kind} is not supported")
+
+
+class Match:
+    __slots__ = ('string', 'captures')
+
+    def __init__(self, string: str, captures: Captures):
+        self.string = string
+        self.captures = captures
+
+    def span(self, group: int = 0) -> Tuple[int, int]:
+        start, end = self.captures[2 * group], self.captures[2 * group + 1]
+        if start is None or end is None:
+            return -1, -1
+
+        return start, end
+
+    def start(self, group: int = 0) -> int:
+        return self.span(group)[0]
+
+    def end(self, group: int = 0) -> int:
+        return self.span(group)[1]
+
+    def group(self, group: int = 0) -> Optional[str]:
+        start, end = self.span(group)
+
+        return None if start < 0 else self.string[start:end]
+
+    def groups(self) -> Tuple[Optional[str], ...]:
+        return tuple(self.group(i) for i in range(1, len(self.captures) // 2))
+
+    def __repr__(self) -> str:
+        return f"<Match span={self.span()} match={self.group()!r}>"
+
+
+class Pattern:
+    __slots__ = ('pattern', 'program', 'size')
+
+    def __init__(self, pattern: str, program: List[Instruction], size: int):
+        self.pattern = pattern
+        self.program = program
+        self.size = size
+
+    def _add(self, threads: list, visited: set, pc: int, captures: Captures, string: str, i: int) -> None:
+        program = self.program
+        pending = [(pc, captures)]
+        while pending:
+            pc, captures = pending.pop()
+            if pc in visited:
+                continue
+
+            visited.add(pc)
+            instruction = program[pc]
+            op = instruction[0]
+            if op == JMP:
+                pending.append((instruction[1], captures))
+            elif op == LOOP:
+                pending.append((instruction[2] if instruction[1] in visited else instruction[1], captures))
+            elif op == SPLIT:
+                pending.append((instruction[2], captures))
+                pending.append((instruction[1], captures))
+            elif op == SAVE:
+                n = instruction[1]
+                pending.append((pc + 1, captures[:n] + (i,) + captures[n + 1:]))
+            elif op == ASSERT:
+                if _holds(instruction[1], string, i):
+                    pending.append((pc + 1, captures))
+            else:
+                threads.append((pc, captures))
+
+    def _run(self, string: str, pos: int, anchored: bool, full: bool) -> Optional[Match]:
+        program, length = self.program, len(string)
+        initial = (None,) * self.size
+        matched = None
+        threads = []
+        self._add(threads, set(), 0, initial, string, pos)
+        i = pos
+        while True:
+            following, visited = [], set()
+            char = ord(string[i]) if i < length else None
+            for pc, captures in threads:
+                instruction = program[pc]
+                if instruction[0] == MATCH:
+                    if full and i != length:
+                        continue
+
+                    matched = captures
+                    break
+
+                if char is not None and (char in instruction[1]) != instruction[2]:
+                    self._add(following, visited, pc + 1, captures, string, i + 1)
+
+            if i >= length:
+                break
+
+            i += 1
+            if matched is None and not anchored:
+                self._add(following, visited, 0, initial, string, i)
+            elif not following:
+                break
+
+            threads = following
+
+        return None if matched is None else Match(string, matched)
+
+    def match(self, string: str, pos: int = 0) -> Optional[Match]:
+        return self._run(string, pos, True, False)
+
+    def fullmatch(self, string: str, pos: int = 0) -> Optional[Match]:
+        return self._run(string, pos, True, True)
+
+    def search(self, string: str, pos: int = 0) -> Optional[Match]:
+        return self._run(string, pos, False, False)
+
+
+def build(tree: Node, pattern: str = None) -> Pattern:
+    groups = sum(1 for node in walk(tree) if isinstance(node, Group) and node.capturing)
+    program = [(SAVE, 0)]
+    emit(tree, program)
+    program.append((SAVE, 1))
+    program.append((MATCH,))
+
+    return Pattern(pattern, program, 2 * (groups + 1))
+
+
+def compile(pattern: str) -> Pattern:
+    return build(parse(pattern), pattern)
@@ -0,0 +1,179 @@
+import os
+import re
+from collections import OrderedDict
+from threading import local
+from threading import Lock
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+
+from arpeggio import ParserPython
+from arpeggio import visit_parse_tree
+
+from budget import BoundedVisitor
+from budget import Budget
+import descent
+from grammar import regex
+from profiling import count_tree
+from profiling import Profile
+from syntax import Node
+from syntax import SyntaxVisitor
+from utils import convert
+from utils import Graph
+from visitor import GraphVisitor
+from visitor import SharingVisitor
+
+PARSERS = ('descent', 'arpeggio')
+PARSER_VARIABLE = 'DOTREGEX_PARSER'
+
+_local = local()
+
+
+def parser() -> ParserPython:
+    if getattr(_local, 'parser', None) is None:
+        _local.parser = ParserPython(regex, ws='\t ', debug=False)
+
+    return _local.parser
+
+
+def parse(pattern: str, using: str = None) -> Node:
+    using = using or os.environ.get(PARSER_VARIABLE, PARSERS[0])
+    if using == 'descent':
+        return descent.parse(pattern)
+
+    if using == 'arpeggio':
+        return visit_parse_tree(parser().parse(pattern), SyntaxVisitor(debug=False))
+
+    raise ValueError(f"Unknown parser {using!r} (expected one of {', '.join(PARSERS)})")
+
+
+class Rendering(NamedTuple):
+    tree: Node
+    graph: Graph
+    dot: str
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: Optional[int]
+    currsize: int
+
+
+def graph_visitor(share: bool = False, profile: Profile = None, budget: Budget = None) -> GraphVisitor:
+    if budget is not None:
+        if share:
+            raise ValueError('Structural sharing cannot be combined with a render budget')
+
+        return BoundedVisitor(budget.max_nodes, budget.max_depth, profile)
+
+    return SharingVisitor(profile) if share else GraphVisitor(profile)
+
+
+def build(pattern: str, profile: Profile = None, share: bool = False, budget: Budget = None) -> Rendering:
+    if profile is not None:
+        return _profiled(pattern, profile, share=share, budget=budget)
+
+    tree = parse(pattern)
+    graph = graph_visitor(share, budget=budget).draw(tree)
+
+    return Rendering(tree, graph, convert(graph, title=re.escape(pattern)))
+
+
+def _profiled(
+        pattern: str,
+        profile: Profile,
+        using: str = None,
+        share: bool = False,
+        budget: Budget = None,
+) -> Rendering:
+    using = using or os.environ.get(PARSER_VARIABLE, PARSERS[0])
+    if using == 'arpeggio':
+        with profile.stage('parse'):
+            tree = parser().parse(pattern)
+        with profile.stage('visit'):
+            tree = visit_parse_tree(tree, SyntaxVisitor(debug=False))
+    else:
+        with profile.stage('parse'):
+            tree = parse(pattern, using=using)
+    count_tree(tree, profile)
+
+    with profile.stage('draw'):
+        graph = graph_visitor(share, profile, budget).draw(tree)
+    with profile.stage('convert'):
+        dot = convert(graph, title=re.escape(pattern))
+
+    return Rendering(tree, graph, dot)
+
+
+def profile(
+        pattern: str,
+        using: str = None,
+        memory: bool = True,
+        share: bool = False,
+        budget: Budget = None,
+) -> Tuple[Rendering, Profile]:
+    result = Profile(memory=memory)
+
+    return _profiled(pattern, result, using, share, budget), result
+
+
+class RenderCache:
+
+    def __init__(self, maxsize: Optional[int] = 1024):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = Lock()
+
+    def get(self, pattern: str) -> Rendering:
+        with self.lock:
+            rendering = self.entries.get(pattern)
+            if rendering is not None:
+                self.entries.move_to_end(pattern)
+                self.hits += 1
+                return rendering
+
+            self.misses += 1
+
+        rendering = build(pattern)
+        with self.lock:
+            if self.maxsize is None or self.maxsize > 0:
+                self.entries[pattern] = rendering
+                self.entries.move_to_end(pattern)
+                self._evict()
+
+        return rendering
+
+    def resize(self, maxsize: Optional[int]) -> None:
+        with self.lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self) -> CacheInfo:
+        with self.lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self.entries))
+
+    def _evict(self) -> None:
+        while self.maxsize is not None and len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+
+cache = RenderCache()
+
+
+def render(pattern: str) -> Rendering:
+    return cache.get(pattern)
+
+
+def cache_info() -> CacheInfo:
+    return cache.info()
@@ -0,0 +1,119 @@
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import NamedTuple
+
+from syntax import CharSet
+from syntax import LITERAL
+from syntax import Node
+from syntax import walk
+from utils import Builder
+from utils import Context
+from utils import Graph
+
+COUNTERS = ('syntax_nodes', 'nodes', 'merges', 'copied', 'code_points')
+
+
+class Stage(NamedTuple):
+    calls: int
+    seconds: float
+    peak: int
+
+
+class Profile:
+    __slots__ = ('stages', 'counters', 'memory')
+
+    def __init__(self, memory: bool = True):
+        self.stages = {}
+        self.counters = Counter()
+        self.memory = memory
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = self.memory and not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        if self.memory:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] - before if self.memory else 0
+            if started:
+                tracemalloc.stop()
+            self.record(name, seconds, peak)
+
+    def record(self, name: str, seconds: float, peak: int = 0, calls: int = 1) -> None:
+        stage = self.stages.get(name)
+        if stage is None:
+            self.stages[name] = Stage(calls, seconds, peak)
+        else:
+            self.stages[name] = Stage(stage.calls + calls, stage.seconds + seconds, max(stage.peak, peak))
+
+    def count(self, name: str, amount: int = 1) -> None:
+        self.counters[name] += amount
+
+    def update(self, other: 'Profile') -> 'Profile':
+        for name, stage in other.stages.items():
+            self.record(name, stage.seconds, stage.peak, stage.calls)
+        self.counters.update(other.counters)
+
+        return self
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'stages': {name: stage._asdict() for name, stage in self.stages.items()},
+            'counters': {name: self.counters[name] for name in (*COUNTERS, *sorted(self.counters.keys() - COUNTERS))},
+        }
+
+    def format(self) -> str:
+        lines = [f"{'stage':10} {'calls':>7} {'total (ms)':>11} {'mean (ms)':>10} {'peak (KiB)':>11}"]
+        for name, stage in self.stages.items():
+            total, peak = stage.seconds * 1000, stage.peak / 1024
+            lines.append(f'{name:10} {stage.calls:7d} {total:11.2f} {total / stage.calls:10.3f} {peak:11.1f}')
+        lines.append('')
+        for name, value in self.as_dict()['counters'].items():
+            lines.append(f'{name:12} {value:>10}')
+
+        return '\n'.join(lines)
+
+
+class ProfiledBuilder(Builder):
+    __slots__ = ('profile',)
+
+    def __init__(self, profile: Profile, context: Context = None):
+        super().__init__(context)
+        self.profile = profile
+
+    def add_node(self, label: str, **params: Any) -> Graph:
+        self.profile.counters['nodes'] += 1
+
+        return super().add_node(label, **params)
+
+    def merge(self, graph1: Graph, graph2: Graph) -> Graph:
+        self.profile.counters['merges'] += 1
+
+        return super().merge(graph1, graph2)
+
+    def build(self, graph: Graph) -> Graph:
+        result = super().build(graph)
+        self.profile.counters['copied'] += len(result['nodes']) + len(result['edges'])
+
+        return result
+
+
+def count_tree(tree: Node, profile: Profile) -> None:
+    nodes = points = 0
+    for node in walk(tree):
+        nodes += 1
+        if isinstance(node, CharSet) and node.kind != LITERAL:
+            points += len(node.values)
+    profile.count('syntax_nodes', nodes)
+    profile.count('code_points', points)
@@ -0,0 +1,241 @@
+import re
+import unicodedata
+import warnings
+from functools import lru_cache
+from itertools import groupby
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+
+from syntax import CharSet
+from utils import decode
+from utils import Interval
+from utils import MAX_ORDER
+from utils import Range
+
+CATEGORY = re.compile(r'^\\([pP])\{([A-Za-z_]+)\}$')
+
+GROUPS = {
+    'L': ('Lu', 'Ll', 'Lt', 'Lm', 'Lo'),
+    'LC': ('Lu', 'Ll', 'Lt'),
+    'M': ('Mn', 'Mc', 'Me'),
+    'N': ('Nd', 'Nl', 'No'),
+    'P': ('Pc', 'Pd', 'Ps', 'Pe', 'Pi', 'Pf', 'Po'),
+    'S': ('Sm', 'Sc', 'Sk', 'So'),
+    'Z': ('Zs', 'Zl', 'Zp'),
+    'C': ('Cc', 'Cf', 'Cs', 'Co', 'Cn'),
+}
+
+NAMES = {
+    'Letter': 'L',
+    'Cased_Letter': 'LC',
+    'Uppercase_Letter': 'Lu',
+    'Lowercase_Letter': 'Ll',
+    'Titlecase_Letter': 'Lt',
+    'Modifier_Letter': 'Lm',
+    'Other_Letter': 'Lo',
+    'Mark': 'M',
+    'Combining_Mark': 'M',
+    'Nonspacing_Mark': 'Mn',
+    'Spacing_Mark': 'Mc',
+    'Enclosing_Mark': 'Me',
+    'Number': 'N',
+    'Decimal_Number': 'Nd',
+    'Digit': 'Nd',
+    'Letter_Number': 'Nl',
+    'Other_Number': 'No',
+    'Punctuation': 'P',
+    'Connector_Punctuation': 'Pc',
+    'Dash_Punctuation': 'Pd',
+    'Open_Punctuation': 'Ps',
+    'Close_Punctuation': 'Pe',
+    'Initial_Punctuation': 'Pi',
+    'Final_Punctuation': 'Pf',
+    'Other_Punctuation': 'Po',
+    'Symbol': 'S',
+    'Math_Symbol': 'Sm',
+    'Currency_Symbol': 'Sc',
+    'Modifier_Symbol': 'Sk',
+    'Other_Symbol': 'So',
+    'Separator': 'Z',
+    'Space_Separator': 'Zs',
+    'Line_Separator': 'Zl',
+    'Paragraph_Separator': 'Zp',
+    'Other': 'C',
+    'Control': 'Cc',
+    'Format': 'Cf',
+    'Surrogate': 'Cs',
+    'Private_Use': 'Co',
+    'Unassigned': 'Cn',
+}
+
+SPECIAL = {
+    'Any': Range.span(0, MAX_ORDER),
+    'ASCII': Range.span(0, 0x7F),
+}
+
+
+def _key(name: str) -> str:
+    return re.sub(r'[\s_-]', '', name).lower()
+
+
+def encode(intervals: Iterable[Interval]) -> str:
+    tokens, previous = [], 0
+    for start, last in intervals:
+        tokens.append(_base36(start - previous))
+        tokens.append(_base36(last - start))
+        previous = last + 1
+
+    return ' '.join(tokens)
+
+
+def _base36(value: int) -> str:
+    digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+    result = digits[value % 36]
+    while value >= 36:
+        value //= 36
+        result = digits[value % 36] + result
+
+    return result
+
+
+def _runs(values: Iterable[str]) -> Dict[str, List[Interval]]:
+    result, start = {}, 0
+    for value, run in groupby(values):
+        length = sum(1 for _ in run)
+        result.setdefault(value, []).append((start, start + length - 1))
+        start += length
+
+    return result
+
+
+def _scripts(lines: Iterable[str]) -> Dict[str, List[Interval]]:
+    result = {}
+    for line in lines:
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+
+        codes, name = (part.strip() for part in line.split(';'))
+        first, _, last = codes.partition('..')
+        result.setdefault(name, []).append((int(first, 16), int(last or first, 16)))
+
+    covered = Range(interval for intervals in result.values() for interval in intervals)
+    result['Unknown'] = list(~covered)
+
+    return result
+
+
+def _table(name: str, tables: Dict[str, List[Interval]]) -> List[str]:
+    lines = [f'{name} = {{']
+    for key, intervals in sorted(tables.items()):
+        text = encode(Range(intervals))
+        chunks = [text[i:i + 96] for i in range(0, len(text), 96)] or ['']
+        if len(chunks) == 1:
+            lines.append(f"    '{key}': '{chunks[0]}',")
+            continue
+
+        lines.append(f"    '{key}': (")
+        lines.extend(f"        '{chunk}'" for chunk in chunks)
+        lines.append('    ),')
+    lines.append('}')
+
+    return lines
+
+
+def generate(scripts: Iterable[str] = None) -> str:
+    categories = _runs(unicodedata.category(chr(value)) for value in range(MAX_ORDER + 1))
+    classes = {
+        'digit': _runs(chr(value).isdecimal() for value in range(MAX_ORDER + 1))[True],
+        'space': _runs(chr(value).isspace() for value in range(MAX_ORDER + 1))[True],
+        'word': _runs(chr(value).isalnum() or chr(value) == '_' for value in range(MAX_ORDER + 1))[True],
+    }
+    lines = [
+        '# Generated by src/main/scripts/unicoderegex.py from unicodedata and Scripts.txt: do not edit.',
+        f"UNICODE_VERSION = '{unicodedata.unidata_version}'",
+        '',
+        *_table('CATEGORIES', categories),
+        '',
+        *_table('CLASSES', classes),
+        '',
+        *_table('SCRIPTS', _scripts(scripts) if scripts is not None else {}),
+    ]
+
+    return '\n'.join(lines) + '\n'
+
+
+@lru_cache(maxsize=None)
+def _names() -> Dict[str, str]:
+    import unicode_tables
+
+    if unicode_tables.UNICODE_VERSION != unicodedata.unidata_version:
+        warnings.warn(
+            f'unicode_tables.py was generated for Unicode {unicode_tables.UNICODE_VERSION} but this Python uses '
+            f'{unicodedata.unidata_version}: \\p{{...}} may disagree with re (regenerate with unicoderegex.py)',
+            RuntimeWarning,
+        )
+    names = {_key(name): ('SPECIAL', name) for name in SPECIAL}
+    names.update((_key(name), ('SCRIPTS', name)) for name in unicode_tables.SCRIPTS)
+    names.update((_key(name), ('GROUPS', name)) for name in GROUPS)
+    names.update((_key(name), ('CATEGORIES', name)) for name in unicode_tables.CATEGORIES)
+    names.update((_key(name), ('GROUPS' if short in GROUPS else 'CATEGORIES', short)) for name, short in NAMES.items())
+    names[_key('Assigned')] = ('GROUPS', 'Assigned')
+
+    return names
+
+
+@lru_cache(maxsize=None)
+def _table_range(table: str, name: str) -> Range:
+    import unicode_tables
+
+    if table == 'SPECIAL':
+        return SPECIAL[name]
+
+    if table == 'GROUPS':
+        if name == 'Assigned':
+            return ~_table_range('CATEGORIES', 'Cn')
+
+        result = Range()
+        for member in GROUPS[name]:
+            result |= _table_range('CATEGORIES', member)
+        return result
+
+    return decode(''.join(getattr(unicode_tables, table)[name]))
+
+
+def lookup(name: str) -> Optional[Range]:
+    names = _names()
+    entry = names.get(_key(name))
+    if entry is None and _key(name).startswith('is'):
+        entry = names.get(_key(name)[2:])
+
+    return _table_range(*entry) if entry is not None else None
+
+
+def category(text: str) -> Optional[Range]:
+    match = CATEGORY.match(text)
+    if match is None:
+        return None
+
+    values = lookup(match.group(2))
+    if values is None:
+        return None
+
+    return ~values if match.group(1) == 'P' else values
+
+
+def characters(node: CharSet) -> Optional[Range]:
+    values = node.values
+    for class_ in node.classes:
+        chars = category(class_)
+        if chars is None:
+            return None
+
+        values |= chars
+
+    return values
+
+
+def unknown(node: CharSet) -> List[str]:
+    return sorted(class_ for class_ in node.classes if category(class_) is None)
@@ -0,0 +1,103 @@
+import os
+import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+
+FORMATS = ('png', 'svg', 'pdf')
+
+TERMINATORS = {
+    'png': b'IEND\xaeB`\x82',
+    'svg': b'</svg>\n',
+}
+
+SIGNATURES = {
+    'png': b'\x89PNG',
+    'svg': b'<?xml',
+}
+
+
+class Image(NamedTuple):
+    data: Optional[bytes]
+    error: Optional[str]
+
+
+@lru_cache(maxsize=None)
+def graphviz_version(program: str = 'dot') -> Optional[str]:
+    try:
+        done = subprocess.run([program, '-V'], capture_output=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+
+    return (done.stderr or done.stdout).decode(errors='replace').strip() or None
+
+
+def split(output: bytes, fmt: str) -> List[bytes]:
+    terminator = TERMINATORS[fmt]
+    parts, start = [], 0
+    while True:
+        end = output.find(terminator, start)
+        if end < 0:
+            break
+
+        end += len(terminator)
+        parts.append(output[start:end])
+        start = end
+
+    return parts
+
+
+def invoke(dots: List[str], fmt: str = 'png', program: str = 'dot', timeout: float = None) -> List[Image]:
+    try:
+        done = subprocess.run(
+            [program, f'-T{fmt}'], input=''.join(dots).encode(), capture_output=True, timeout=timeout,
+        )
+    except subprocess.TimeoutExpired:
+        if len(dots) > 1:
+            return [image for dot in dots for image in invoke([dot], fmt, program, timeout)]
+
+        return [Image(None, f'{program} timed out after {timeout:g}s')]
+    except OSError as e:
+        return [Image(None, f'{type(e).__name__}: {e}')] * len(dots)
+
+    if done.returncode == 0:
+        parts = [done.stdout] if len(dots) == 1 else split(done.stdout, fmt)
+        if len(parts) == len(dots) and all(p.lstrip().startswith(SIGNATURES.get(fmt, b'')) for p in parts):
+            return [Image(part, None) for part in parts]
+
+    if len(dots) > 1:
+        return [image for dot in dots for image in invoke([dot], fmt, program, timeout)]
+
+    message = done.stderr.decode(errors='replace').strip()
+
+    return [Image(None, message or f'{program} exited with status {done.returncode}')]
+
+
+def render(
+        dots: Iterable[str],
+        fmt: str = 'png',
+        processes: int = None,
+        batch: int = 8,
+        program: str = 'dot',
+) -> Iterator[Image]:
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format: {fmt} (expected one of {', '.join(FORMATS)})")
+
+    processes = processes or os.cpu_count() or 1
+    size = batch if fmt in TERMINATORS else 1
+    dots = iter(dots)
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=processes) as executor:
+        for chunk in iter(lambda: list(islice(dots, size)), []):
+            pending.append(executor.submit(invoke, chunk, fmt, program))
+            if len(pending) >= 2 * processes:
+                yield from pending.popleft().result()
+
+        while pending:
+            yield from pending.popleft().result()
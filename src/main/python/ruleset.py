@@ -0,0 +1,344 @@
+from typing import Dict
+from typing import FrozenSet
+from typing import Iterable
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+from matcher import ASSERT
+from matcher import emit
+from matcher import Instruction
+from matcher import JMP
+from matcher import LOOP
+from matcher import MATCH
+from matcher import SAVE
+from matcher import SET
+from matcher import SPLIT
+from matcher import Unsupported
+from pipeline import parse
+from utils import WORD
+
+Ids = FrozenSet[int]
+
+MAX_SEEDS = 1 << 14
+MAX_REACHES = 1 << 16
+THRASH_RATIO = 10
+MAX_THRASHES = 3
+
+
+class RuleError(ValueError):
+
+    def __init__(self, index: int, pattern: str, error: Exception):
+        super().__init__(f"Rule {index} ({pattern!r}): {type(error).__name__}: {error}")
+        self.index = index
+        self.pattern = pattern
+        self.error = error
+
+
+class Position(NamedTuple):
+    start: bool
+    before: bool
+    after: bool
+    end: bool
+    newline: bool
+
+
+class CacheStats(NamedTuple):
+    states: int
+    transitions: int
+    flushes: int
+    fallback: bool
+
+
+class State:
+    __slots__ = ('pcs', 'start', 'word', 'moves', 'last', 'final')
+
+    def __init__(self, pcs: FrozenSet[int], start: bool, word: bool):
+        self.pcs = pcs
+        self.start = start
+        self.word = word
+        self.moves = {}
+        self.last = None
+        self.final = None
+
+    def key(self) -> Tuple[FrozenSet[int], bool, bool]:
+        return self.pcs, self.start, self.word
+
+
+Step = Tuple[State, Ids]
+
+
+def _holds(kind: str, position: Position) -> bool:
+    if kind in ('^', '\\A'):
+        return position.start
+
+    if kind == '$':
+        return position.end or position.newline
+
+    if kind in ('\\Z', '\\z'):
+        return position.end
+
+    if kind == '\\b':
+        return position.before != position.after
+
+    if kind == '\\B':
+        return position.before == position.after and not (position.start and position.end)
+
+    raise Unsupported(f"Anchor {kind} is not supported")
+
+
+class RuleSet:
+    __slots__ = (
+        'patterns', 'program', 'starts', 'cache_size', 'openings', 'states', 'seeds', 'size', 'flushes', 'initial',
+        'scanned', 'mark', 'thrashes', 'fallback', 'literals', 'others', 'sets', 'accepts', 'reaches',
+    )
+
+    def __init__(self, patterns: List[str], program: List[Instruction], starts: List[int], cache_size: int):
+        self.patterns = patterns
+        self.program = program
+        self.starts = starts
+        self.cache_size = cache_size
+        self.openings: Dict[Position, Tuple[List[int], Set[int]]] = {}
+        self.states: Dict[Tuple[FrozenSet[int], bool, bool], State] = {}
+        self.seeds: Dict[Tuple[Position, Optional[int]], Tuple[FrozenSet[int], Ids]] = {}
+        self.size = 0
+        self.flushes = 0
+        self.scanned = 0
+        self.mark = 0
+        self.thrashes = 0
+        self.fallback = False
+        self.literals: Dict[int, Set[int]] = {}
+        self.others: List[int] = []
+        self.accepts: Dict[int, FrozenSet[int]] = {}
+        self.reaches: Dict[Tuple[int, Position], Tuple[FrozenSet[int], Ids]] = {}
+        for pc, instruction in enumerate(program):
+            if instruction[0] != SET:
+                continue
+
+            intervals = list(instruction[1])
+            if not instruction[2] and len(intervals) == 1 and intervals[0][0] == intervals[0][1]:
+                self.literals.setdefault(intervals[0][0], set()).add(pc)
+            else:
+                self.others.append(pc)
+        self.sets = frozenset(self.others).union(*self.literals.values())
+        self.initial = self._state(frozenset(), True, False)
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def _closure(self, pcs: Iterable[int], position: Position) -> Tuple[List[int], Set[int]]:
+        program = self.program
+        threads, ids, visited = [], set(), set()
+        pending = list(pcs)
+        while pending:
+            pc = pending.pop()
+            if pc in visited:
+                continue
+
+            visited.add(pc)
+            instruction = program[pc]
+            op = instruction[0]
+            if op == JMP:
+                pending.append(instruction[1])
+            elif op == SPLIT or op == LOOP:
+                pending.append(instruction[2])
+                pending.append(instruction[1])
+            elif op == SAVE:
+                pending.append(pc + 1)
+            elif op == ASSERT:
+                if _holds(instruction[1], position):
+                    pending.append(pc + 1)
+            elif op == MATCH:
+                ids.add(instruction[1])
+            else:
+                threads.append(pc)
+
+        return threads, ids
+
+    def _reach(self, pc: int, position: Position) -> Tuple[FrozenSet[int], Ids]:
+        reach = self.reaches.get((pc, position))
+        if reach is None:
+            threads, ids = self._closure((pc,), position)
+            reach = frozenset(threads), frozenset(ids)
+            if len(self.reaches) >= MAX_REACHES:
+                self.reaches.clear()
+            self.reaches[(pc, position)] = reach
+
+        return reach
+
+    def _expand(self, pcs: FrozenSet[int], position: Position) -> Tuple[Set[int], Set[int]]:
+        threads, ids = set(pcs & self.sets), set()
+        for pc in pcs - self.sets:
+            reached, matched = self._reach(pc, position)
+            threads |= reached
+            if matched:
+                ids |= matched
+
+        return threads, ids
+
+    def _accepted(self, code: int) -> FrozenSet[int]:
+        accepted = self.accepts.get(code)
+        if accepted is None:
+            program = self.program
+            others = (pc for pc in self.others if (code in program[pc][1]) != program[pc][2])
+            accepted = frozenset(self.literals.get(code, ())).union(others)
+            if len(self.accepts) >= MAX_SEEDS:
+                self.accepts.clear()
+            self.accepts[code] = accepted
+
+        return accepted
+
+    def _consume(self, threads: Iterable[int], code: int) -> Set[int]:
+        return {pc + 1 for pc in self._accepted(code).intersection(threads)}
+
+    def _seed(self, position: Position, code: Optional[int]) -> Tuple[FrozenSet[int], Ids]:
+        seed = self.seeds.get((position, code))
+        if seed is None:
+            opening = self.openings.get(position)
+            if opening is None:
+                opening = self.openings[position] = self._closure(self.starts, position)
+
+            threads, ids = opening
+            pcs = self._consume(threads, code) if code is not None else ()
+            seed = frozenset(pcs), frozenset(ids)
+            if len(self.seeds) >= MAX_SEEDS:
+                self.seeds.clear()
+            self.seeds[(position, code)] = seed
+
+        return seed
+
+    def _state(self, pcs: FrozenSet[int], start: bool, word: bool) -> State:
+        state = self.states.get((pcs, start, word))
+        if state is None:
+            state = State(pcs, start, word)
+            self.states[state.key()] = state
+
+        return state
+
+    def _flush(self, *keep: State) -> None:
+        for state in self.states.values():
+            state.moves.clear()
+            state.last = None
+        self.states = {}
+        self.size = 0
+        self.flushes += 1
+        self.thrashes = self.thrashes + 1 if self.scanned - self.mark < THRASH_RATIO * self.cache_size else 0
+        self.mark = self.scanned
+        self.fallback = self.thrashes >= MAX_THRASHES
+        for state in (self.initial, *keep):
+            self.states[state.key()] = state
+
+    def _transition(
+            self,
+            pcs: FrozenSet[int],
+            start: bool,
+            word: bool,
+            char: str,
+            newline: bool = False,
+    ) -> Tuple[FrozenSet[int], bool, Ids]:
+        code = ord(char)
+        after = code in WORD
+        position = Position(start, word, after, False, newline)
+        threads, ids = self._expand(pcs, position)
+        seeded_pcs, seeded = self._seed(position, code)
+
+        return seeded_pcs.union(self._consume(threads, code)), after, (frozenset(ids) | seeded if ids else seeded)
+
+    def _accepting(self, pcs: FrozenSet[int], start: bool, word: bool) -> Ids:
+        position = Position(start, word, False, True, False)
+        _, ids = self._expand(pcs, position)
+        _, seeded = self._seed(position, None)
+
+        return frozenset(ids) | seeded
+
+    def _step(self, state: State, char: str, newline: bool = False) -> Step:
+        pcs, word, ids = self._transition(state.pcs, state.start, state.word, char, newline)
+        target = self._state(pcs, False, word)
+        if self.size >= self.cache_size:
+            self._flush(state, target)
+        self.size += 1
+
+        return target, ids
+
+    def _advance(self, state: State, char: str) -> Step:
+        step = self._step(state, char)
+        state.moves[char] = step
+
+        return step
+
+    def _last(self, state: State) -> Step:
+        state.last = self._step(state, '\n', newline=True)
+
+        return state.last
+
+    def _final(self, state: State) -> Ids:
+        state.final = self._accepting(state.pcs, state.start, state.word)
+
+        return state.final
+
+    def _simulate(self, text: str) -> Set[int]:
+        found, total = set(), len(self.patterns)
+        pcs, start, word = frozenset(), True, False
+        body = text[:-1] if text.endswith('\n') else text
+        for char in body:
+            pcs, word, ids = self._transition(pcs, start, word, char)
+            start = False
+            if ids:
+                found |= ids
+                if len(found) == total:
+                    return found
+
+        if len(body) < len(text):
+            pcs, word, ids = self._transition(pcs, start, word, '\n', newline=True)
+            start = False
+            found |= ids
+        found |= self._accepting(pcs, start, word)
+
+        return found
+
+    def scan(self, text: str) -> Set[int]:
+        self.scanned += len(text)
+        if self.fallback:
+            return self._simulate(text)
+
+        found, total = set(), len(self.patterns)
+        state = self.initial
+        body = text[:-1] if text.endswith('\n') else text
+        for char in body:
+            state, ids = state.moves.get(char) or self._advance(state, char)
+            if ids:
+                found |= ids
+                if len(found) == total:
+                    return found
+
+        if len(body) < len(text):
+            state, ids = state.last or self._last(state)
+            found |= ids
+        found |= state.final if state.final is not None else self._final(state)
+
+        return found
+
+    def matches(self, text: str) -> List[str]:
+        return [self.patterns[index] for index in sorted(self.scan(text))]
+
+    def stats(self) -> CacheStats:
+        transitions = sum(len(state.moves) + (state.last is not None) for state in self.states.values())
+
+        return CacheStats(len(self.states), transitions, self.flushes, self.fallback)
+
+
+def compile(patterns: Iterable[str], cache_size: int = 1 << 16) -> RuleSet:
+    patterns = list(patterns)
+    program, starts = [], []
+    for index, pattern in enumerate(patterns):
+        starts.append(len(program))
+        try:
+            emit(parse(pattern), program)
+        except Exception as e:
+            raise RuleError(index, pattern, e) from e
+
+        program.append((MATCH, index))
+
+    return RuleSet(patterns, program, starts, cache_size)
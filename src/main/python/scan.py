@@ -0,0 +1,319 @@
+import ast
+import hashlib
+import os
+import re
+import tokenize
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from functools import partial
+from itertools import islice
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+from analysis import analyze_tree
+from batch import emit
+from batch import Translation
+from pipeline import graph_visitor
+from pipeline import parse
+from syntax import CharSet
+from syntax import Node
+from syntax import walk
+from utils import convert
+from utils import Range
+
+FLAGS = {
+    'compile': 1,
+    'search': 2,
+    'match': 2,
+    'fullmatch': 2,
+    'findall': 2,
+    'finditer': 2,
+    'split': 3,
+    'sub': 4,
+    'subn': 4,
+}
+NAMES = {
+    'A': 'ASCII',
+    'I': 'IGNORECASE',
+    'L': 'LOCALE',
+    'M': 'MULTILINE',
+    'S': 'DOTALL',
+    'T': 'TEMPLATE',
+    'U': 'UNICODE',
+    'X': 'VERBOSE',
+    'DEBUG': 'DEBUG',
+    'NOFLAG': None,
+}
+NAMES.update({name: name for name in list(NAMES.values()) if name is not None})
+LETTERS = {
+    'ASCII': 'a',
+    'IGNORECASE': 'i',
+    'LOCALE': 'L',
+    'MULTILINE': 'm',
+    'DOTALL': 's',
+    'UNICODE': 'u',
+    'VERBOSE': 'x',
+}
+MAX_FOLDED = 0x400
+MODULES = frozenset(('re',))
+IMPORTS = re.compile(rf"^[ \t]*(?:import|from)[ \t][^\n]*\b(?:{'|'.join(MODULES)})\b", re.MULTILINE)
+SKIPPED = frozenset(('__pycache__', 'node_modules', 'site-packages', 'venv'))
+
+
+class Site(NamedTuple):
+    path: str
+    line: int
+    column: int
+    call: str
+    pattern: str
+    flags: Optional[str] = None
+    modes: Optional[Tuple[str, ...]] = ()
+
+
+class Finding(NamedTuple):
+    translation: Translation
+    nodes: int
+    complexity: Optional[str]
+
+
+def ident(pattern: str, modes: Optional[Tuple[str, ...]] = ()) -> str:
+    key = f"{pattern}\0{','.join(modes)}" if modes else pattern
+
+    return hashlib.sha1(key.encode('utf-8', 'surrogatepass')).hexdigest()[:16]
+
+
+def display(pattern: str, modes: Optional[Tuple[str, ...]] = ()) -> str:
+    letters = ''.join(LETTERS.get(mode, '') for mode in modes or ())
+
+    return f'(?{letters}){pattern}' if letters else pattern
+
+
+def sources(roots: Iterable[str]) -> Iterator[str]:
+    for root in roots:
+        if os.path.isfile(root):
+            yield root
+            continue
+
+        for directory, subdirectories, files in os.walk(root):
+            subdirectories[:] = sorted(d for d in subdirectories if not d.startswith('.') and d not in SKIPPED)
+            for name in sorted(files):
+                if name.endswith('.py'):
+                    yield os.path.join(directory, name)
+
+
+def _literal(node: ast.AST) -> Optional[str]:
+    if isinstance(node, ast.Constant):
+        if isinstance(node.value, str):
+            return node.value
+
+        if isinstance(node.value, bytes):
+            return node.value.decode('latin-1')
+
+        return None
+
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+        left, right = _literal(node.left), _literal(node.right)
+        if left is not None and right is not None:
+            return left + right
+
+    return None
+
+
+def _argument(call: ast.Call, position: int, name: str) -> Optional[ast.AST]:
+    if len(call.args) > position:
+        return call.args[position]
+
+    return next((keyword.value for keyword in call.keywords if keyword.arg == name), None)
+
+
+def _modes(node: Optional[ast.AST], modules: Set[str], constants: Dict[str, str]) -> Optional[Tuple[str, ...]]:
+    if node is None:
+        return ()
+
+    if isinstance(node, ast.Constant) and node.value == 0:
+        return ()
+
+    if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) and node.value.id in modules:
+        name = NAMES.get(node.attr, '')
+    elif isinstance(node, ast.Name):
+        name = constants.get(node.id, '')
+    elif isinstance(node, ast.BinOp) and isinstance(node.op, (ast.BitOr, ast.Add)):
+        left, right = _modes(node.left, modules, constants), _modes(node.right, modules, constants)
+        return tuple(sorted(set(left) | set(right))) if left is not None and right is not None else None
+    else:
+        return None
+
+    if name == '':
+        return None
+
+    return (name,) if name is not None else ()
+
+
+def _names(tree: ast.AST) -> Tuple[Set[str], Dict[str, str], Dict[str, str], List[ast.Call]]:
+    modules, functions, constants, calls = set(), {}, {}, []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call):
+            calls.append(node)
+        elif isinstance(node, ast.Import):
+            modules.update(alias.asname or alias.name for alias in node.names if alias.name in MODULES)
+        elif isinstance(node, ast.ImportFrom) and node.module in MODULES and not node.level:
+            functions.update((alias.asname or alias.name, alias.name) for alias in node.names if alias.name in FLAGS)
+            constants.update((alias.asname or alias.name, NAMES[alias.name]) for alias in node.names
+                             if alias.name in NAMES)
+
+    return modules, functions, constants, calls
+
+
+def extract(path: str) -> Tuple[List[Site], Optional[str]]:
+    try:
+        with tokenize.open(path) as file:
+            source = file.read()
+        if not IMPORTS.search(source):
+            return [], None
+
+        tree = ast.parse(source, filename=path)
+    except (OSError, SyntaxError, UnicodeDecodeError, ValueError) as e:
+        return [], f'{type(e).__name__}: {e}'
+
+    modules, functions, constants, calls = _names(tree)
+    sites = []
+    for call in calls:
+        func = call.func
+        if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name) and func.value.id in modules:
+            name = func.attr if func.attr in FLAGS else None
+        else:
+            name = functions.get(func.id) if isinstance(func, ast.Name) else None
+        argument = _argument(call, 0, 'pattern') if name is not None else None
+        pattern = _literal(argument) if argument is not None else None
+        if pattern is None:
+            continue
+
+        flags = _argument(call, FLAGS[name], 'flags')
+        segment = ast.get_source_segment(source, flags) if flags is not None else None
+        modes = _modes(flags, modules, constants)
+        sites.append(Site(path, call.lineno, call.col_offset, name, pattern, segment, modes))
+    sites.sort(key=lambda site: (site.line, site.column))
+
+    return sites, None
+
+
+def verbose(pattern: str) -> str:
+    result, i, charset = [], 0, False
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            result.append(pattern[i:i + 2])
+            i += 2
+            continue
+
+        if charset:
+            charset = char != ']' or pattern[i - 1] == '[' or pattern[i - 2:i] == '[^'
+            if char.isspace():
+                char = f'\\x{ord(char):02x}' if ord(char) < 0x100 else f'\\u{ord(char):04x}'
+        elif char == '[':
+            charset = True
+        elif char == '#':
+            i = pattern.find('\n', i)
+            i = len(pattern) if i < 0 else i
+            continue
+        elif char.isspace():
+            i += 1
+            continue
+
+        result.append(char)
+        i += 1
+
+    return ''.join(result)
+
+
+def _cases(value: int) -> Iterator[int]:
+    char = chr(value)
+    for variant in (char.lower(), char.upper(), char.swapcase()):
+        if len(variant) == 1:
+            yield ord(variant)
+
+
+def ignore_case(tree: Node) -> Node:
+    for node in walk(tree):
+        if isinstance(node, CharSet):
+            values = [case for start, last in node.values if last - start < MAX_FOLDED
+                      for value in range(start, last + 1) for case in _cases(value)]
+            node.values = node.values | Range.of(*values)
+
+    return tree
+
+
+def examine(pattern: str, modes: Optional[Tuple[str, ...]] = (), render: bool = False) -> Finding:
+    name = display(pattern, modes)
+    modes = modes or ()
+    try:
+        text = verbose(pattern) if 'VERBOSE' in modes else pattern
+        tree = parse(text)
+        if 'IGNORECASE' in modes:
+            ignore_case(tree)
+        graph = graph_visitor().draw(tree)
+    except Exception as e:
+        return Finding(Translation(name, None, f'{type(e).__name__}: {e}'), 0, None)
+
+    dot = convert(graph, title=re.escape(name)) if render else None
+    complexity = analyze_tree(tree, text).complexity
+
+    return Finding(Translation(name, dot, None), len(graph['nodes']), complexity)
+
+
+def scan(
+        roots: Iterable[str],
+        directory: str = None,
+        fmt: str = 'dot',
+        workers: int = None,
+        chunksize: int = 64,
+        processes: int = None,
+) -> Iterator[Dict[str, Any]]:
+    task = partial(examine, render=directory is not None)
+    window = (workers or os.cpu_count() or 1) * chunksize * 4
+    seen = set()
+    paths = sources(roots)
+    with ExitStack() as stack:
+        executor = None if workers == 1 else stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+        mapped = map if executor is None else partial(executor.map, chunksize=chunksize)
+        while True:
+            chunk = list(islice(paths, window))
+            if not chunk:
+                break
+
+            fresh = []
+            for path, (sites, error) in zip(chunk, mapped(extract, chunk)):
+                if error is not None:
+                    yield {'kind': 'error', 'path': path, 'error': error}
+                for site in sites:
+                    key = ident(site.pattern, site.modes)
+                    if key not in seen:
+                        seen.add(key)
+                        fresh.append(site)
+                    yield {'kind': 'site', 'id': key, **site._asdict()}
+
+            findings = list(mapped(task, [site.pattern for site in fresh], [site.modes for site in fresh]))
+            outcomes = None
+            if directory is not None:
+                outcomes = emit([finding.translation for finding in findings], directory, fmt, processes=processes)
+            for site, finding in zip(fresh, findings):
+                translation = finding.translation
+                outcome = next(outcomes) if outcomes is not None else None
+                yield {
+                    'kind': 'pattern',
+                    'id': ident(site.pattern, site.modes),
+                    'pattern': site.pattern,
+                    'modes': site.modes,
+                    'ok': translation.error is None,
+                    'error': outcome.error if outcome is not None else translation.error,
+                    'nodes': finding.nodes,
+                    'complexity': finding.complexity,
+                    'path': outcome.path if outcome is not None else None,
+                }
@@ -0,0 +1,337 @@
+import asyncio
+import hashlib
+import json
+import os
+from collections import Counter
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+from urllib.parse import parse_qs
+from urllib.parse import urlsplit
+
+import svg
+from budget import Budget
+from pipeline import build
+from rendering import invoke
+
+CONTENT_TYPES = {
+    'svg': 'image/svg+xml',
+    'png': 'image/png',
+    'pdf': 'application/pdf',
+    'dot': 'text/vnd.graphviz; charset=utf-8',
+}
+
+REASONS = {
+    200: 'OK',
+    304: 'Not Modified',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+    414: 'URI Too Long',
+    431: 'Request Header Fields Too Large',
+    500: 'Internal Server Error',
+    502: 'Bad Gateway',
+}
+
+MAX_BODY = 1 << 20
+MAX_HEADERS = 100
+DEFAULT_BUDGET = Budget(max_nodes=2000)
+DOT_TIMEOUT = 10.0
+LINGER = 1.0
+
+Response = Tuple[int, Dict[str, str], bytes]
+
+
+class Job(NamedTuple):
+    pattern: str
+    fmt: str = 'svg'
+    engine: str = 'dot'
+    share: bool = False
+    budget: Optional[Budget] = None
+
+
+class Output(NamedTuple):
+    data: bytes
+    etag: str
+
+
+class RenderError(Exception):
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def translate(job: Job) -> Tuple[str, Optional[str]]:
+    try:
+        rendering = build(job.pattern, share=job.share, budget=job.budget)
+    except Exception as e:
+        raise RenderError(400, f'{type(e).__name__}: {e}')
+
+    image = svg.convert(rendering.graph, title=job.pattern) if job.engine == 'python' else None
+
+    return rendering.dot, image
+
+
+def _flag(query: Dict[str, list], name: str) -> bool:
+    return query.get(name, ['0'])[-1].lower() in ('', '1', 'true', 'yes')
+
+
+def _number(query: Dict[str, list], name: str) -> Optional[int]:
+    value = query.get(name, [None])[-1]
+    if value is None:
+        return None
+
+    if not value.isdecimal():
+        raise RenderError(400, f'{name} must be a non-negative integer')
+
+    return int(value)
+
+
+def parse_job(query: Dict[str, list], body: Optional[bytes], default: Budget = None) -> Job:
+    pattern = body.decode('utf-8', errors='replace') if body is not None else query.get('pattern', [None])[-1]
+    if pattern is None:
+        raise RenderError(400, "Missing 'pattern'")
+
+    fmt = query.get('format', ['svg'])[-1]
+    if fmt not in CONTENT_TYPES:
+        raise RenderError(400, f"Unsupported format {fmt!r} (expected one of {', '.join(CONTENT_TYPES)})")
+
+    engine = query.get('engine', ['dot'])[-1]
+    if engine not in ('dot', 'python') or engine == 'python' and fmt not in ('svg', 'dot'):
+        raise RenderError(400, "engine must be 'dot', or 'python' with format svg")
+
+    max_nodes, max_depth = _number(query, 'max_nodes'), _number(query, 'max_depth')
+    budget = Budget(max_nodes, max_depth) if max_nodes is not None or max_depth is not None else None
+    share = _flag(query, 'share')
+    if share and budget is not None:
+        raise RenderError(400, 'share cannot be combined with max_nodes or max_depth')
+
+    if budget is None and not share:
+        budget = default
+
+    return Job(pattern, fmt, engine, share, budget)
+
+
+def _text(status: int, message: str) -> Response:
+    return status, {'Content-Type': 'text/plain; charset=utf-8'}, f'{message}\n'.encode()
+
+
+class RenderServer:
+
+    def __init__(
+            self,
+            workers: int = None,
+            dot_processes: int = None,
+            cache_size: int = 1024,
+            max_age: int = 86400,
+            program: str = 'dot',
+            budget: Optional[Budget] = DEFAULT_BUDGET,
+            dot_timeout: Optional[float] = DOT_TIMEOUT,
+    ):
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.dots = ThreadPoolExecutor(max_workers=dot_processes or os.cpu_count() or 1)
+        self.cache_size = cache_size
+        self.max_age = max_age
+        self.program = program
+        self.budget = budget
+        self.dot_timeout = dot_timeout
+        self.cache = OrderedDict()
+        self.pending = {}
+        self.stats = Counter()
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8000) -> asyncio.AbstractServer:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, translate, Job('(a|b)*c'))
+
+        return await asyncio.start_server(self.handle, host, port)
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False)
+        self.dots.shutdown(wait=False)
+
+    async def render(self, job: Job) -> Output:
+        output = self.cache.get(job)
+        if output is not None:
+            self.cache.move_to_end(job)
+            self.stats['hits'] += 1
+            return output
+
+        task = self.pending.get(job)
+        if task is None:
+            self.stats['renders'] += 1
+            task = self.pending[job] = asyncio.ensure_future(self._render(job))
+            task.add_done_callback(partial(self._done, job))
+        else:
+            self.stats['coalesced'] += 1
+
+        return await asyncio.shield(task)
+
+    def _done(self, job: Job, task: asyncio.Future) -> None:
+        del self.pending[job]
+        if task.cancelled() or task.exception() is not None:
+            return
+
+        if self.cache_size > 0:
+            self.cache[job] = task.result()
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+    async def _render(self, job: Job) -> Output:
+        loop = asyncio.get_running_loop()
+        dot, image = await loop.run_in_executor(self.executor, translate, job)
+        if job.fmt == 'dot':
+            data = dot.encode()
+        elif image is not None:
+            data = image.encode()
+        else:
+            self.stats['dot'] += 1
+            call = partial(invoke, [dot], job.fmt, self.program, self.dot_timeout)
+            result = (await loop.run_in_executor(self.dots, call))[0]
+            if result.error is not None:
+                raise RenderError(502, result.error)
+            data = result.data
+
+        return Output(data, f'"{hashlib.sha1(data).hexdigest()}"')
+
+    async def respond(self, method: str, target: str, headers: Dict[str, str], body: bytes) -> Response:
+        try:
+            return await self._respond(method, target, headers, body)
+        except Exception as e:
+            self.stats['errors'] += 1
+            return _text(500, f'{type(e).__name__}: {e}')
+
+    async def _respond(self, method: str, target: str, headers: Dict[str, str], body: bytes) -> Response:
+        url = urlsplit(target)
+        query = parse_qs(url.query, keep_blank_values=True)
+        if url.path == '/health':
+            return 200, {'Content-Type': 'text/plain'}, b'ok\n'
+
+        if url.path == '/stats':
+            stats = {**self.stats, 'cached': len(self.cache), 'in_flight': len(self.pending)}
+            return 200, {'Content-Type': 'application/json'}, json.dumps(stats).encode()
+
+        if url.path != '/render':
+            return 404, {'Content-Type': 'text/plain'}, b'Not found\n'
+
+        if method not in ('GET', 'HEAD', 'POST'):
+            return 405, {'Content-Type': 'text/plain', 'Allow': 'GET, HEAD, POST'}, b'Method not allowed\n'
+
+        try:
+            output = await self.render(parse_job(query, body if method == 'POST' else None, self.budget))
+        except RenderError as e:
+            self.stats['errors'] += 1
+            return _text(e.status, str(e))
+
+        fmt = query.get('format', ['svg'])[-1]
+        cache = {'Cache-Control': f'public, max-age={self.max_age}', 'ETag': output.etag}
+        if output.etag in (tag.strip() for tag in headers.get('if-none-match', '').split(',')):
+            return 304, cache, b''
+
+        return 200, {'Content-Type': CONTENT_TYPES[fmt], **cache}, output.data
+
+    @staticmethod
+    async def _headers(reader: asyncio.StreamReader) -> Dict[str, str]:
+        headers = {}
+        for _ in range(MAX_HEADERS + 1):
+            try:
+                header = await reader.readline()
+            except ValueError:
+                raise RenderError(431, 'Header line too long')
+
+            if not header.strip():
+                break
+            name, _, value = header.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        return headers
+
+    async def _head(self, reader: asyncio.StreamReader) -> Optional[Tuple[List[str], Dict[str, str]]]:
+        try:
+            line = await reader.readline()
+        except ValueError:
+            raise RenderError(414, 'Request line too long')
+
+        if not line.strip():
+            return None
+
+        parts = line.decode('latin-1').split()
+        headers = await self._headers(reader)
+        if len(parts) != 3 or not headers.get('content-length', '0').isdecimal():
+            raise RenderError(400, 'Malformed request')
+
+        if len(headers) > MAX_HEADERS:
+            raise RenderError(431, 'Too many headers')
+
+        if int(headers.get('content-length', '0')) > MAX_BODY:
+            raise RenderError(413, 'Pattern too large')
+
+        return parts, headers
+
+    @staticmethod
+    async def _linger(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        if writer.can_write_eof():
+            writer.write_eof()
+        discarded = 0
+        try:
+            while discarded <= MAX_BODY:
+                chunk = await asyncio.wait_for(reader.read(1 << 16), LINGER)
+                if not chunk:
+                    break
+
+                discarded += len(chunk)
+        except asyncio.TimeoutError:
+            pass
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        rejected = False
+        try:
+            while True:
+                try:
+                    head = await self._head(reader)
+                except RenderError as e:
+                    parts, response, keep, rejected = [], _text(e.status, str(e)), False, True
+                else:
+                    if head is None:
+                        break
+
+                    parts, headers = head
+                    body = await reader.readexactly(int(headers.get('content-length', '0')))
+                    response = await self.respond(parts[0], parts[1], headers, body)
+                    keep = parts[2] == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+
+                status, fields, payload = response
+                head = [f'HTTP/1.1 {status} {REASONS[status]}', f'Content-Length: {len(payload)}']
+                head.extend(f'{name}: {value}' for name, value in fields.items())
+                head.append('Connection: keep-alive' if keep else 'Connection: close')
+                writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1'))
+                if parts[:1] != ['HEAD'] and status != 304:
+                    writer.write(payload)
+                await writer.drain()
+                if not keep:
+                    break
+
+            if rejected:
+                await self._linger(reader, writer)
+
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+
+        finally:
+            writer.close()
+
+
+async def serve(host: str = '127.0.0.1', port: int = 8000, **options) -> None:
+    server = RenderServer(**options)
+    try:
+        listener = await server.start(host, port)
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
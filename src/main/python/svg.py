@@ -0,0 +1,324 @@
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import TextIO
+from typing import Tuple
+from xml.sax.saxutils import escape
+from xml.sax.saxutils import quoteattr
+
+from utils import Font
+from utils import Graph
+from utils import Shape
+from utils import Style
+
+FONT_SIZE = 14
+CHAR_WIDTH = 7.5
+NODE_WIDTH = 54
+NODE_HEIGHT = 36
+NODE_PADDING = 16
+NODE_SEP = 18
+RANK_SEP = 36
+LOOP = 28
+MARGIN = 8
+TITLE_HEIGHT = 24
+PERIPHERY = 6
+
+
+class _Node:
+    __slots__ = (
+        'ident', 'content', 'edge', 'parent', 'children', 'number', 'depth', 'width', 'loops',
+        'x', 'mod', 'thread', 'ancestor', 'change', 'shift',
+    )
+
+    def __init__(self, ident: int, content: Dict[str, Any], parent: Optional['_Node'], number: int, depth: int):
+        self.ident = ident
+        self.content = content
+        self.edge = {}
+        self.parent = parent
+        self.children = []
+        self.number = number
+        self.depth = depth
+        self.width = _width(content)
+        self.loops = []
+        self.x = 0.0
+        self.mod = 0.0
+        self.thread = None
+        self.ancestor = self
+        self.change = 0.0
+        self.shift = 0.0
+
+    def left(self) -> Optional['_Node']:
+        return self.children[0] if self.children else self.thread
+
+    def right(self) -> Optional['_Node']:
+        return self.children[-1] if self.children else self.thread
+
+    def left_brother(self) -> Optional['_Node']:
+        return self.parent.children[self.number - 1] if self.parent and self.number else None
+
+    def leftmost_sibling(self) -> Optional['_Node']:
+        return self.parent.children[0] if self.parent and self.number else None
+
+    def span(self) -> float:
+        return self.width + (2 * LOOP if self.loops else 0)
+
+
+def _width(content: Dict[str, Any]) -> float:
+    width = max(NODE_WIDTH, len(content.get('label', '')) * CHAR_WIDTH + NODE_PADDING)
+    if content.get('shape') == Shape.DIAMOND.value:
+        width *= 1.5
+    elif content.get('shape') == Shape.TRAPEZIUM.value:
+        width += NODE_PADDING
+
+    return width
+
+
+def _separation(left: _Node, right: _Node) -> float:
+    return (left.span() + right.span()) / 2 + NODE_SEP
+
+
+def _tree(graph: Graph) -> Tuple[Optional[_Node], List[_Node], List[Tuple[int, int, Dict[str, Any]]]]:
+    nodes, edges, top = graph.get('nodes', {}), graph.get('edges', {}), graph.get('top', None)
+    if top is None or top not in nodes:
+        return None, [], []
+
+    root = _Node(top, nodes[top], None, 0, 0)
+    placed, extra, pending = {top: root}, [], [root]
+    while pending:
+        node = pending.pop()
+        for target, edge in edges.get(node.ident, {}).items():
+            if target == node.ident:
+                node.loops.append(edge)
+            elif target in placed or target not in nodes:
+                extra.append((node.ident, target, edge))
+            else:
+                child = _Node(target, nodes[target], node, len(node.children), node.depth + 1)
+                child.edge = edge
+                node.children.append(child)
+                placed[target] = child
+                pending.append(child)
+
+    return root, list(placed.values()), extra
+
+
+def _first_walk(node: _Node) -> None:
+    brother = node.left_brother()
+    if not node.children:
+        node.x = brother.x + _separation(brother, node) if brother else 0.0
+        return
+
+    default = node.children[0]
+    for child in node.children:
+        _first_walk(child)
+        default = _apportion(child, default)
+    _execute_shifts(node)
+
+    midpoint = (node.children[0].x + node.children[-1].x) / 2
+    if brother:
+        node.x = brother.x + _separation(brother, node)
+        node.mod = node.x - midpoint
+    else:
+        node.x = midpoint
+
+
+def _apportion(node: _Node, default: _Node) -> _Node:
+    brother = node.left_brother()
+    if brother is None:
+        return default
+
+    inner_right = outer_right = node
+    inner_left, outer_left = brother, node.leftmost_sibling()
+    shift_inner_right = shift_outer_right = node.mod
+    shift_inner_left, shift_outer_left = inner_left.mod, outer_left.mod
+    while inner_left.right() and inner_right.left():
+        inner_left, inner_right = inner_left.right(), inner_right.left()
+        outer_left, outer_right = outer_left.left(), outer_right.right()
+        outer_right.ancestor = node
+        shift = (inner_left.x + shift_inner_left) - (inner_right.x + shift_inner_right)
+        shift += _separation(inner_left, inner_right)
+        if shift > 0:
+            ancestor = inner_left.ancestor if inner_left.ancestor.parent is node.parent else default
+            _move_subtree(ancestor, node, shift)
+            shift_inner_right += shift
+            shift_outer_right += shift
+        shift_inner_left += inner_left.mod
+        shift_inner_right += inner_right.mod
+        shift_outer_left += outer_left.mod
+        shift_outer_right += outer_right.mod
+
+    if inner_left.right() and not outer_right.right():
+        outer_right.thread = inner_left.right()
+        outer_right.mod += shift_inner_left - shift_outer_right
+    else:
+        if inner_right.left() and not outer_left.left():
+            outer_left.thread = inner_right.left()
+            outer_left.mod += shift_inner_right - shift_outer_left
+        default = node
+
+    return default
+
+
+def _move_subtree(left: _Node, right: _Node, shift: float) -> None:
+    subtrees = right.number - left.number
+    right.change -= shift / subtrees
+    right.shift += shift
+    left.change += shift / subtrees
+    right.x += shift
+    right.mod += shift
+
+
+def _execute_shifts(node: _Node) -> None:
+    shift = change = 0.0
+    for child in reversed(node.children):
+        child.x += shift
+        child.mod += shift
+        change += child.change
+        shift += child.shift + change
+
+
+def _second_walk(root: _Node) -> None:
+    pending = [(root, 0.0)]
+    while pending:
+        node, offset = pending.pop()
+        node.x += offset
+        for child in node.children:
+            pending.append((child, offset + node.mod))
+
+
+def layout(graph: Graph) -> Tuple[List[_Node], List[Tuple[int, int, Dict[str, Any]]]]:
+    root, nodes, extra = _tree(graph)
+    if root is not None:
+        _first_walk(root)
+        _second_walk(root)
+
+    return nodes, extra
+
+
+def _attributes(content: Dict[str, Any]) -> str:
+    color = content.get('color', 'black')
+    style = content.get('style')
+    fill = 'none'
+    if style == Style.FILLED.value:
+        fill = content.get('fillcolor', content.get('color', 'lightgrey'))
+    result = f'fill={quoteattr(fill)} stroke={quoteattr(color)}'
+    if style == Style.DASHED.value:
+        result += ' stroke-dasharray="5,2"'
+    elif style == Style.ROUNDED.value:
+        result += ' stroke-linejoin="round"'
+
+    return result
+
+
+def _shape(content: Dict[str, Any], x: float, y: float, width: float, height: float = NODE_HEIGHT) -> str:
+    shape = content.get('shape', Shape.ELLIPSE.value)
+    left, right = x - width / 2, x + width / 2
+    top, bottom = y - height / 2, y + height / 2
+    attributes = _attributes(content)
+    if shape == Shape.BOX.value:
+        rounded = ' rx="6"' if content.get('style') == Style.ROUNDED.value else ''
+        return f'<rect x="{left:.1f}" y="{top:.1f}" width="{width:.1f}" height="{height}"{rounded} {attributes}/>'
+
+    if shape == Shape.DIAMOND.value:
+        points = f'{x:.1f},{top:.1f} {right:.1f},{y:.1f} {x:.1f},{bottom:.1f} {left:.1f},{y:.1f}'
+        return f'<polygon points="{points}" {attributes}/>'
+
+    if shape == Shape.TRAPEZIUM.value:
+        inset = NODE_PADDING
+        points = f'{left + inset:.1f},{top:.1f} {right - inset:.1f},{top:.1f}' \
+                 f' {right:.1f},{bottom:.1f} {left:.1f},{bottom:.1f}'
+        return f'<polygon points="{points}" {attributes}/>'
+
+    return f'<ellipse cx="{x:.1f}" cy="{y:.1f}" rx="{width / 2:.1f}" ry="{height / 2}" {attributes}/>'
+
+
+def _text(label: str, x: float, y: float, font: str = Font.NORMAL.value, color: str = None) -> str:
+    italic = ' font-style="italic"' if 'italic' in font else ''
+    fill = f' fill={quoteattr(color)}' if color else ''
+
+    return f'<text x="{x:.1f}" y="{y:.1f}" text-anchor="middle" dominant-baseline="central"' \
+           f' font-family="Times,serif" font-size="{FONT_SIZE}"{italic}{fill}>{escape(label)}</text>'
+
+
+def _marker(color: str) -> str:
+    return f'arrow-{color}'
+
+
+def _loop(edge: Dict[str, Any], start: float, y: float) -> Iterator[str]:
+    color = edge.get('color', 'black')
+    reach = start + LOOP
+    yield f'<path d="M{start:.1f},{y - 6:.1f} C{reach:.1f},{y - 24:.1f} {reach:.1f},{y + 24:.1f}' \
+          f' {start:.1f},{y + 6:.1f}" fill="none" stroke={quoteattr(color)}' \
+          f' marker-end="url(#{_marker(color)})"/>\n'
+    if 'label' in edge:
+        yield _text(edge['label'], reach, y - 20, color=edge.get('fontcolor')) + '\n'
+
+
+def _node(node: _Node, x: float, y: float) -> Iterator[str]:
+    yield _shape(node.content, x, y, node.width) + '\n'
+    if int(node.content.get('peripheries', 1)) > 1:
+        outline = {k: v for k, v in node.content.items() if k != 'style' or v != Style.FILLED.value}
+        yield _shape(outline, x, y, node.width - PERIPHERY, NODE_HEIGHT - PERIPHERY) + '\n'
+    yield _text(node.content.get('label', ''), x, y, node.content.get('fontname', Font.NORMAL.value)) + '\n'
+
+
+def stream(graph: Graph, title: str = None) -> Iterator[str]:
+    nodes, extra = layout(graph)
+    offset = TITLE_HEIGHT if title is not None else 0
+    left = min((n.x - n.span() / 2 for n in nodes), default=0.0) - MARGIN
+    right = max((n.x + n.span() / 2 for n in nodes), default=0.0) + MARGIN
+    depth = max((n.depth for n in nodes), default=0)
+    width = right - left
+    height = offset + (depth + 1) * NODE_HEIGHT + depth * RANK_SEP + 2 * MARGIN
+
+    def position(node: _Node) -> Tuple[float, float]:
+        return node.x - left, offset + MARGIN + node.depth * (NODE_HEIGHT + RANK_SEP) + NODE_HEIGHT / 2
+
+    colors = {n.edge.get('color', 'black') for n in nodes} | \
+             {e.get('color', 'black') for n in nodes for e in n.loops} | \
+             {e.get('color', 'black') for _, _, e in extra}
+    yield f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}" height="{height:.0f}"' \
+          f' viewBox="0 0 {width:.1f} {height:.1f}">\n'
+    yield '<defs>\n'
+    for color in sorted(colors):
+        yield f'<marker id="{_marker(color)}" viewBox="0 0 10 10" refX="10" refY="5" markerWidth="8"' \
+              f' markerHeight="8" orient="auto"><path d="M0,0 L10,5 L0,10 z" fill={quoteattr(color)}/></marker>\n'
+    yield '</defs>\n'
+    if title is not None:
+        yield _text(str(title), width / 2, TITLE_HEIGHT / 2 + MARGIN / 2) + '\n'
+
+    placed = {}
+    for node in nodes:
+        x, y = position(node)
+        placed[node.ident] = (x, y)
+        for child in node.children:
+            cx, cy = position(child)
+            color = child.edge.get('color', 'black')
+            yield f'<line x1="{x:.1f}" y1="{y + NODE_HEIGHT / 2:.1f}" x2="{cx:.1f}" y2="{cy - NODE_HEIGHT / 2:.1f}"' \
+                  f' stroke={quoteattr(color)} marker-end="url(#{_marker(color)})"/>\n'
+            if 'label' in child.edge:
+                yield _text(child.edge['label'], (x + cx) / 2, (y + cy) / 2, color=child.edge.get('fontcolor')) + '\n'
+
+        for edge in node.loops:
+            yield from _loop(edge, x + node.width / 2, y)
+
+    for source, target, edge in extra:
+        (x1, y1), (x2, y2) = placed[source], placed[target]
+        color = edge.get('color', 'black')
+        yield f'<line x1="{x1:.1f}" y1="{y1 + NODE_HEIGHT / 2:.1f}" x2="{x2:.1f}" y2="{y2 - NODE_HEIGHT / 2:.1f}"' \
+              f' stroke={quoteattr(color)} stroke-dasharray="2,2" marker-end="url(#{_marker(color)})"/>\n'
+
+    for node in nodes:
+        yield from _node(node, *placed[node.ident])
+
+    yield '</svg>\n'
+
+
+def write(graph: Graph, file: TextIO, title: str = None) -> None:
+    for chunk in stream(graph, title=title):
+        file.write(chunk)
+
+
+def convert(graph: Graph, title: str = None) -> str:
+    return ''.join(stream(graph, title=title))
@@ -0,0 +1,260 @@
+from typing import Any
+from typing import FrozenSet
+from typing import Iterator
+from typing import List
+from typing import Optional
+
+from arpeggio import PTNodeVisitor
+
+from utils import order
+from utils import Range
+
+LITERAL = 'literal'
+ESCAPE = 'escape'
+CLASS = 'class'
+CATEGORY = 'category'
+ANY = 'any'
+SET = 'set'
+
+
+class Node:
+    __slots__ = ('start', 'end')
+
+    def __init__(self, start: int, end: int):
+        self.start = start
+        self.end = end
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f'{k}={getattr(self, k)!r}' for c in type(self).__mro__[:-2] for k in c.__slots__)
+
+        return f'{type(self).__name__}({fields})'
+
+
+class Alternative(Node):
+    __slots__ = ('items',)
+
+    def __init__(self, start: int, end: int, items: List[Node]):
+        super().__init__(start, end)
+        self.items = items
+
+
+class Sequence(Node):
+    __slots__ = ('items',)
+
+    def __init__(self, start: int, end: int, items: List[Node]):
+        super().__init__(start, end)
+        self.items = items
+
+
+class Quantifier(Node):
+    __slots__ = ('lower', 'upper', 'greedy', 'text')
+
+    def __init__(self, start: int, end: int, lower: int, upper: Optional[int], greedy: bool, text: str):
+        super().__init__(start, end)
+        self.lower = lower
+        self.upper = upper
+        self.greedy = greedy
+        self.text = text
+
+
+class CharSet(Node):
+    __slots__ = ('values', 'negated', 'classes', 'kind', 'text')
+
+    def __init__(
+            self,
+            start: int,
+            end: int,
+            values: Range,
+            negated: bool = False,
+            classes: FrozenSet[str] = frozenset(),
+            kind: str = LITERAL,
+            text: str = None,
+    ):
+        super().__init__(start, end)
+        self.values = values
+        self.negated = negated
+        self.classes = classes
+        self.kind = kind
+        self.text = text
+
+
+class Atom(Node):
+    __slots__ = ('item', 'quantifier')
+
+    def __init__(self, start: int, end: int, item: CharSet, quantifier: Quantifier = None):
+        super().__init__(start, end)
+        self.item = item
+        self.quantifier = quantifier
+
+
+class Group(Node):
+    __slots__ = ('item', 'capturing', 'quantifier', 'index')
+
+    def __init__(self, start: int, end: int, item: Node, capturing: bool = True, quantifier: Quantifier = None):
+        super().__init__(start, end)
+        self.item = item
+        self.capturing = capturing
+        self.quantifier = quantifier
+        self.index = None
+
+
+class Anchor(Node):
+    __slots__ = ('kind',)
+
+    def __init__(self, start: int, end: int, kind: str):
+        super().__init__(start, end)
+        self.kind = kind
+
+
+class Backref(Node):
+    __slots__ = ('number',)
+
+    def __init__(self, start: int, end: int, number: int):
+        super().__init__(start, end)
+        self.number = number
+
+
+def walk(node: Node) -> Iterator[Node]:
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        yield node
+        if isinstance(node, (Alternative, Sequence)):
+            pending.extend(reversed(node.items))
+        elif isinstance(node, (Atom, Group)):
+            if node.quantifier is not None:
+                pending.append(node.quantifier)
+            pending.append(node.item)
+
+
+class Visitor:
+
+    def visit(self, node: Node) -> Any:
+        return getattr(self, f'visit_{type(node).__name__.lower()}')(node)
+
+
+# noinspection PyMethodMayBeStatic
+class SyntaxVisitor(PTNodeVisitor):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.groups = []
+
+    def visit_regex(self, node, children) -> Any:
+        captures = sorted((g for g in self.groups if g.capturing), key=lambda g: g.start)
+        for i, group in enumerate(captures):
+            group.index = i + 1
+        self.groups = []
+
+        return children[0]
+
+    def visit_alternative(self, node, children) -> Any:
+        if len(children) == 1:
+            return children[0]
+
+        return Alternative(node.position, node.position_end, list(children))
+
+    def visit_sequence(self, node, children) -> Any:
+        if len(children) == 1:
+            return children[0]
+
+        return Sequence(node.position, node.position_end, list(children))
+
+    def visit_match(self, node, children) -> Any:
+        return children[0]
+
+    def visit_anchor(self, node, children) -> Any:
+        return Anchor(node.position, node.position_end, node.value)
+
+    def visit_backref(self, node, children) -> Any:
+        return Backref(node.position, node.position_end, int(node.value[1:]))
+
+    def visit_atom(self, node, children) -> Any:
+        return Atom(node.position, node.position_end, children[0], children[1] if len(children) > 1 else None)
+
+    def visit_character_any(self, node, children) -> Any:
+        return CharSet(node.position, node.position_end, Range.of(ord('\n')), True, kind=ANY, text=node.value)
+
+    def visit_character_set(self, node, children) -> Any:
+        negated = children[0] == '^'
+        if negated:
+            children = children[1:]
+
+        classes, intervals = set(), []
+        for child in children:
+            if isinstance(child, str):
+                intervals.append((ord(child), ord(child)))
+            elif isinstance(child, Range):
+                intervals.extend(child)
+            elif child.kind == CATEGORY:
+                classes |= child.classes
+            else:
+                intervals.extend(child.values)
+
+        return CharSet(node.position, node.position_end, Range(intervals), negated, frozenset(classes), SET)
+
+    def visit_character_element(self, node, children) -> Any:
+        return children[0]
+
+    def visit_character_category(self, node, children) -> Any:
+        return CharSet(node.position, node.position_end, Range(), False, frozenset((node.value,)), CATEGORY, node.value)
+
+    def visit_character_class(self, node, children) -> Any:
+        return CharSet(node.position, node.position_end, order(node.value), kind=CLASS, text=node.value)
+
+    def visit_character_range(self, node, children) -> Any:
+        bounds = [b for c in children for interval in c for b in interval]
+
+        return Range.span(min(bounds), max(bounds))
+
+    def visit_character(self, node, children) -> Any:
+        return children[0].values if isinstance(children[0], CharSet) else children[0]
+
+    def visit_group(self, node, children) -> Any:
+        capturing = children[0] != '?:'
+        if not capturing:
+            children = children[1:]
+
+        quantifier = children[1] if len(children) > 1 else None
+        group = Group(node.position, node.position_end, children[0], capturing, quantifier)
+        self.groups.append(group)
+
+        return group
+
+    def visit_quantifier(self, node, children) -> Any:
+        lower, upper, text = children[0]
+        greedy = not (len(children) > 1 and children[-1] == '?')
+
+        return Quantifier(node.position, node.position_end, lower, upper, greedy, text)
+
+    def visit_zero_or_one(self, node, children) -> Any:
+        return 0, 1, '?'
+
+    def visit_zero_or_more(self, node, children) -> Any:
+        return 0, None, '*'
+
+    def visit_one_or_more(self, node, children) -> Any:
+        return 1, None, '+'
+
+    def visit_n_times(self, node, children) -> Any:
+        lower = int(children[0])
+
+        return lower, int(children[1]) if len(children) > 1 else lower, f"{{{','.join(children)}}}"
+
+    def visit_symbol(self, node, children) -> Any:
+        return CharSet(node.position, node.position_end, Range.of(ord(node.value)), text=node.value)
+
+    def visit_symbol_in_range(self, node, children) -> Any:
+        return Range.of(ord(node.value))
+
+    def visit_escaped(self, node, children) -> Any:
+        return CharSet(node.position, node.position_end, order(node.value), kind=ESCAPE, text=node.value)
+
+    def visit_escaped_in_range(self, node, children) -> Any:
+        return order(node.value)
+
+    def visit_ascii_code(self, node, children) -> Any:
+        return CharSet(node.position, node.position_end, Range.of(int(node.value[2:], 16)), text=node.value)
+
+    def visit_unicode(self, node, children) -> Any:
+        return CharSet(node.position, node.position_end, Range.of(int(node.value[2:], 16)), text=node.value)
@@ -1,39 +1,145 @@
 import itertools
 import json
 import re
-from copy import deepcopy
+from bisect import bisect_right
 from enum import Enum
 from typing import Any
 from typing import Dict
-from typing import Set
+from typing import Iterable
+from typing import Iterator
+from typing import NamedTuple
+from typing import TextIO
+from typing import Tuple
 
-Range = Set[int]
+import unicode_tables
 
-unicode = re.compile(r'^\\u([0-9A-Fa-f]{4})$')
+MAX_ORDER = 0x10FFFF
+
+Interval = Tuple[int, int]
+
+
+class Range:
+    __slots__ = ('intervals', '_starts')
+
+    def __init__(self, intervals: Iterable[Interval] = ()):
+        merged = []
+        for start, last in sorted(intervals):
+            if start > last:
+                start, last = last, start
+            if merged and start <= merged[-1][1] + 1:
+                if last > merged[-1][1]:
+                    merged[-1] = (merged[-1][0], last)
+            else:
+                merged.append((start, last))
+        self.intervals = tuple(merged)
+        self._starts = None
+
+    @classmethod
+    def of(cls, *values: int) -> 'Range':
+        return cls((v, v) for v in values)
+
+    @classmethod
+    def span(cls, start: int, last: int) -> 'Range':
+        return cls([(start, last)])
+
+    def __iter__(self) -> Iterator[Interval]:
+        return iter(self.intervals)
+
+    def __len__(self) -> int:
+        return sum(last - start + 1 for start, last in self.intervals)
+
+    def __bool__(self) -> bool:
+        return bool(self.intervals)
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, Range) and self.intervals == other.intervals
+
+    def __hash__(self) -> int:
+        return hash(self.intervals)
+
+    def __repr__(self) -> str:
+        return f"Range({list(self.intervals)!r})"
+
+    def __contains__(self, value: int) -> bool:
+        if self._starts is None:
+            self._starts = [start for start, _ in self.intervals]
+        i = bisect_right(self._starts, value) - 1
+
+        return i >= 0 and value <= self.intervals[i][1]
+
+    def __or__(self, other: 'Range') -> 'Range':
+        return Range(self.intervals + other.intervals)
+
+    def __and__(self, other: 'Range') -> 'Range':
+        result = []
+        i, j = 0, 0
+        while i < len(self.intervals) and j < len(other.intervals):
+            (a, b), (c, d) = self.intervals[i], other.intervals[j]
+            start, last = max(a, c), min(b, d)
+            if start <= last:
+                result.append((start, last))
+            if b < d:
+                i += 1
+            else:
+                j += 1
+
+        return Range(result)
+
+    def __invert__(self) -> 'Range':
+        result = []
+        start = 0
+        for lower, upper in self.intervals:
+            if lower > start:
+                result.append((start, lower - 1))
+            start = upper + 1
+        if start <= MAX_ORDER:
+            result.append((start, MAX_ORDER))
+
+        return Range(result)
+
+    def __sub__(self, other: 'Range') -> 'Range':
+        return self & ~other
+
+    def __le__(self, other: 'Range') -> bool:
+        return (self & other) == self
+
+    def __ge__(self, other: 'Range') -> bool:
+        return other <= self
+
+
+def decode(text: str) -> Range:
+    intervals, previous = [], 0
+    numbers = [int(token, 36) for token in text.split()]
+    for gap, length in zip(numbers[::2], numbers[1::2]):
+        start = previous + gap
+        intervals.append((start, start + length))
+        previous = start + length + 1
+
+    return Range(intervals)
+
+
+unicode = re.compile(r'^\\(?:u([0-9A-Fa-f]{4})|U([0-9A-Fa-f]{8}))$')
 ascii_code = re.compile(r'^\\x([0-9A-Fa-f]{2})$')
 escape = re.compile(r'^\\(.)$')
 
-DIGIT = {i for i in range(ord('0'), ord('9') + 1)}
-BUT_DIGIT = {i for i in range(0, 65536)} - DIGIT
+DIGIT = decode(''.join(unicode_tables.CLASSES['digit']))
+BUT_DIGIT = ~DIGIT
 
-SPACE = {ord('\t'), ord('\n'), ord('\v'), ord('\f'), ord('\r'), ord(' ')}
-BUT_SPACE = {i for i in range(0, 65536)} - SPACE
+SPACE = decode(''.join(unicode_tables.CLASSES['space']))
+BUT_SPACE = ~SPACE
 
-UPPERCASE = {i for i in range(ord('A'), ord('A') + 1)}
-LOWERCASE = {i for i in range(ord('a'), ord('z') + 1)}
-UNDERSCORE = {ord('_')}
-WORD = {*UPPERCASE, *LOWERCASE, *DIGIT, *UNDERSCORE}
-BUT_WORD = {i for i in range(0, 65536)} - WORD
+WORD = decode(''.join(unicode_tables.CLASSES['word']))
+BUT_WORD = ~WORD
 
 
 def order(char: str) -> Range:
     match = unicode.match(char)
     if match:
-        return {int(match.group(1), 16)}
+        return Range.of(int(match.group(1) or match.group(2), 16))
 
     match = ascii_code.match(char)
     if match:
-        return {int(match.group(1), 16)}
+        return Range.of(int(match.group(1), 16))
 
     match = escape.match(char)
     if match and match.group(1) == 'd':
@@ -55,33 +161,33 @@ def order(char: str) -> Range:
         return BUT_WORD
 
     if match and match.group(1) == 't':
-        return {ord('\t')}
+        return Range.of(ord('\t'))
 
     if match and match.group(1) == 'n':
-        return {ord('\n')}
+        return Range.of(ord('\n'))
 
     if match and match.group(1) == 'v':
-        return {ord('\v')}
+        return Range.of(ord('\v'))
 
     if match and match.group(1) == 'f':
-        return {ord('\f')}
+        return Range.of(ord('\f'))
 
     if match and match.group(1) == 'r':
-        return {ord('\r')}
+        return Range.of(ord('\r'))
 
     if match and match.group(1) == ' ':
-        return {ord(' ')}
+        return Range.of(ord(' '))
 
     if match and match.group(1) == ']':
-        return {ord(']')}
+        return Range.of(ord(']'))
 
     if match and match.group(1) == '-':
-        return {ord('-')}
+        return Range.of(ord('-'))
 
     if match:
-        return {ord(match.group(1))}
+        return Range.of(ord(match.group(1)))
 
-    return {ord(char)}
+    return Range.of(ord(char))
 
 
 def normal(value: int) -> str:
@@ -144,6 +250,27 @@ NEGATED = Color.RED
 REPEATED = Color.GREEN
 
 
+class Theme(NamedTuple):
+    greedy: Color = GREEDY
+    negated: Color = NEGATED
+    repeated: Color = REPEATED
+
+
+class Context:
+    __slots__ = ('theme', 'start', 'ids')
+
+    def __init__(self, theme: Theme = Theme(), start: int = 0):
+        self.theme = theme
+        self.start = start
+        self.ids = itertools.count(start)
+
+    def ident(self) -> int:
+        return next(self.ids)
+
+    def fresh(self) -> 'Context':
+        return Context(self.theme, self.start)
+
+
 def empty() -> Graph:
     return {
         'top': None,
@@ -159,12 +286,13 @@ def add_node(
         shape: Shape = None,
         style: Style = None,
         color: Color = None,
+        context: Context = None,
         **params: Any,
 ) -> Graph:
     if graph is None:
         graph = empty()
 
-    ident = next(counter)
+    ident = next(counter) if context is None else context.ident()
     nodes = graph.setdefault('nodes', {})
     node = nodes.setdefault(ident, {'label': label})
     if font:
@@ -216,50 +344,86 @@ def set_top(
     return graph
 
 
-def merge(
-        graph1: Graph,
-        graph2: Graph,
-) -> Graph:
-    top = max([i for i in {g.get('top', None) for g in (graph1, graph2)} if i], default=None)
+class Builder:
+    __slots__ = ('nodes', 'edges', 'context')
 
-    nodes = deepcopy(graph1.get('nodes', {}))
-    for ident, content in graph2.get('nodes', {}).items():
-        node = nodes.setdefault(ident, {})
-        for key, value in content.items():
-            node[key] = value
+    def __init__(self, context: Context = None):
+        self.nodes = {}
+        self.edges = {}
+        self.context = context if context is not None else Context()
 
-    edges = deepcopy(graph1.get('edges', {}))
-    for source, neighbours in graph2.get('edges', {}).items():
-        for target, content in neighbours.items():
-            edge = edges.setdefault(source, {}).setdefault(target, {})
-            for key, value in content.items():
-                edge[key] = value
+    def add_node(self, label: str, **params: Any) -> Graph:
+        graph = add_node(label, {'top': None, 'nodes': self.nodes, 'edges': self.edges}, context=self.context, **params)
+        graph['order'] = [graph['top']]
 
-    return {
-        'top': top,
-        'nodes': nodes,
-        'edges': edges,
-    }
+        return graph
 
+    def merge(self, graph1: Graph, graph2: Graph) -> Graph:
+        graph1['top'] = max([i for i in {g.get('top', None) for g in (graph1, graph2)} if i is not None], default=None)
+        graph1['order'].append(graph2['order'])
 
-def convert(graph: Graph, title: str = None) -> str:
-    lines = []
+        return graph1
+
+    def build(self, graph: Graph) -> Graph:
+        nodes, edges = {}, {}
+        pending = [iter(graph['order'])]
+        while pending:
+            for ident in pending[-1]:
+                if isinstance(ident, list):
+                    pending.append(iter(ident))
+                    break
+                if ident not in nodes:
+                    nodes[ident] = self.nodes[ident]
+                    if ident in self.edges:
+                        edges[ident] = self.edges[ident]
+            else:
+                pending.pop()
+
+        return {
+            'top': graph['top'],
+            'nodes': nodes,
+            'edges': edges,
+        }
+
+
+def _params(content: Dict[str, Any], cache: Dict[Any, str]) -> str:
+    parts = []
+    for key, value in content.items():
+        if key == 'label':
+            parts.append(f'label={json.dumps(value)}')
+            continue
+
+        part = cache.get((key, value))
+        if part is None:
+            part = cache[key, value] = f'{key}={json.dumps(value)}'
+        parts.append(part)
+
+    return ' '.join(parts)
+
+
+def stream(graph: Graph, title: str = None) -> Iterator[str]:
+    cache = {}
+    edges = graph.get('edges', {})
+    yield "digraph regex_graph {\n"
     for source, node in graph.get('nodes', {}).items():
-        params = ' '.join(f'{k}={json.dumps(v)}' for k, v in node.items())
-        lines.append(f"\t{source} [{params}];")
+        yield f"\t{source} [{_params(node, cache)}];\n"
 
-        neighbours = graph.get('edges', {}).get(source, {})
-        for target, edge in neighbours.items():
+        for target, edge in edges.get(source, {}).items():
             if not edge:
-                lines.append(f"\t{source} -> {target};")
+                yield f"\t{source} -> {target};\n"
             else:
-                params = ' '.join(f'{k}={json.dumps(v)}' for k, v in edge.items())
-                lines.append(f"\t{source} -> {target} [{params}];")
+                yield f"\t{source} -> {target} [{_params(edge, cache)}];\n"
+
+        yield "\n"
+    yield f"\tlabel=\"{title}\";\n"
+    yield "\tlabelloc=\"t\";\n"
+    yield "\tfontname=\"times\";\n}\n"
 
-        lines.append('')
-    if 'title':
-        lines.append(f"\tlabel=\"{title}\";")
-        lines.append(f"\tlabelloc=\"t\";")
-    lines = '\n'.join(lines)
 
-    return f"digraph regex_graph {{\n{lines}\n\tfontname=\"times\";\n}}\n"
+def write(graph: Graph, file: TextIO, title: str = None) -> None:
+    for chunk in stream(graph, title=title):
+        file.write(chunk)
+
+
+def convert(graph: Graph, title: str = None) -> str:
+    return ''.join(stream(graph, title=title))
@@ -1,162 +1,213 @@
+from functools import partial
 from typing import Any
-
-from arpeggio import PTNodeVisitor
-
+from typing import Callable
+from typing import Dict
+from typing import Hashable
+from typing import Optional
+from typing import Tuple
+
+from profiling import Profile
+from profiling import ProfiledBuilder
+from properties import category
+from syntax import Alternative
+from syntax import Anchor
+from syntax import Atom
+from syntax import Backref
+from syntax import CharSet
+from syntax import ESCAPE
+from syntax import Group
+from syntax import LITERAL
+from syntax import Node
+from syntax import Quantifier
+from syntax import Sequence
+from syntax import SET
+from syntax import SyntaxVisitor
+from syntax import Visitor
 from utils import add_edge
-from utils import add_node
+from utils import Builder
 from utils import BUT_DIGIT
 from utils import BUT_SPACE
 from utils import BUT_WORD
+from utils import Context
 from utils import DIGIT
 from utils import Font
-from utils import GREEDY
+from utils import Graph
 from utils import Line
-from utils import merge
-from utils import NEGATED
 from utils import normal
-from utils import order
-from utils import REPEATED
 from utils import Shape
 from utils import SPACE
 from utils import Style
+from utils import Theme
 from utils import WORD
 
+SHARED = '2'
+SHAREABLE = (Alternative, Sequence, Group, Atom)
 
-# noinspection PyMethodMayBeStatic
-class RegExVisitor(PTNodeVisitor):
 
-    def visit_regex(self, node, children) -> Any:
-        return children[0]
+def _quantifier(quantifier: Quantifier, theme: Theme = Theme()) -> Dict[str, Any]:
+    if quantifier.text == '?':
+        params = {'label': '?', 'style': Style.DASHED}
+    elif quantifier.text == '*':
+        params = {'label': '*', 'style': Style.DASHED, 'line': Line.DOT, 'color': theme.repeated}
+    elif quantifier.text == '+':
+        params = {'label': '+', 'line': Line.DOT, 'color': theme.repeated}
+    else:
+        repeated = quantifier.upper > 1 or quantifier.lower > 1
+        params = {
+            'label': quantifier.text,
+            'style': Style.DASHED if quantifier.lower == 0 else None,
+            'line': Line.DOT if repeated else None,
+            'color': theme.repeated if repeated else None,
+        }
+
+    if not quantifier.greedy:
+        params['label'] += '?'
+        params['color'] = theme.greedy
+
+    return params
+
+
+def _leaf(charset: CharSet) -> Tuple[str, Optional[Style]]:
+    if charset.kind == LITERAL:
+        return normal(next(iter(charset.values))[0]), None
+
+    if charset.kind == ESCAPE:
+        return charset.text, None
+
+    return charset.text, Style.FILLED
+
+
+def collapsible(node: Node) -> bool:
+    return isinstance(node, Atom) and node.quantifier is None and node.item.kind != SET
+
 
-    def visit_alternative(self, node, children) -> Any:
-        if len(children) == 1:
-            return children[0]
+class GraphVisitor(Visitor):
 
-        graph = add_node('alternative', font=Font.ITALIC, shape=Shape.DIAMOND, style=Style.ROUNDED)
+    def __init__(self, profile: Profile = None, context: Context = None):
+        self.profile = profile
+        self.context = context if context is not None else Context()
+        self.builder = self._builder()
+
+    def _builder(self) -> Builder:
+        return Builder(self.context) if self.profile is None else ProfiledBuilder(self.profile, self.context)
+
+    def draw(self, node: Node) -> Graph:
+        graph = self.builder.build(self.visit(node))
+        self.context = self.context.fresh()
+        self.builder = self._builder()
+
+        return graph
+
+    def visit_alternative(self, node: Alternative) -> Graph:
+        children = [self.visit(item) for item in node.items]
+        graph = self.builder.add_node('alternative', font=Font.ITALIC, shape=Shape.DIAMOND, style=Style.ROUNDED)
         for child in children:
-            graph = merge(graph, child)
+            graph = self.builder.merge(graph, child)
             graph = add_edge(graph['top'], child['top'], graph)
 
         return graph
 
-    def visit_sequence(self, node, children) -> Any:
-        if len(children) == 1:
-            return children[0]
-
-        graph = add_node('sequence', font=Font.ITALIC, shape=Shape.BOX, style=Style.ROUNDED)
+    def visit_sequence(self, node: Sequence) -> Graph:
+        children = [None if collapsible(item) else self.visit(item) for item in node.items]
+        graph = self.builder.add_node('sequence', font=Font.ITALIC, shape=Shape.BOX, style=Style.ROUNDED)
         source = graph['top']
 
         label, style = None, None
-        for child in children:
-            target = child['top']
-            root = child['nodes'][target]
-
-            if root['label'] == 'atom':
-                ident = next((k for k in child['edges'][target]), None)
-                atom = child['nodes'][ident]
+        for item, child in zip(node.items, children):
+            if child is None:
+                text, filled = _leaf(item.item)
                 if label is None:
-                    label = atom['label']
-                    style = Style.FILLED if 'style' in atom else None
+                    label, style = text, filled
                 else:
-                    label = label + atom['label']
-                    style = style and (Style.FILLED if 'style' in atom else None)
+                    label, style = label + text, style and filled
 
             else:
                 if label is not None:
-                    node = add_node(label, shape=Shape.BOX, style=style)
-                    tgt = node['top']
-                    node = merge(node, add_node('atom', font=Font.ITALIC, shape=Shape.ELLIPSE))
-                    src = node['top']
-                    node = add_edge(src, tgt, node)
-
-                    graph = merge(graph, node)
-                    graph = add_edge(source, src, graph)
+                    graph = self._run(graph, source, label, style)
                     label, style = None, None
 
-                graph = merge(graph, child)
-                graph = add_edge(source, target, graph)
+                graph = self.builder.merge(graph, child)
+                graph = add_edge(source, child['top'], graph)
 
         if label is not None:
-            node = add_node(label, shape=Shape.BOX, style=style)
-            tgt = node['top']
-            node = merge(node, add_node('atom', font=Font.ITALIC, shape=Shape.ELLIPSE))
-            src = node['top']
-            node = add_edge(src, tgt, node)
+            graph = self._run(graph, source, label, style)
+
+        return graph
 
-            graph = merge(graph, node)
-            graph = add_edge(source, src, graph)
+    def _run(self, graph: Graph, source: int, label: str, style: Optional[Style]) -> Graph:
+        node = self._collapsed(label, style)
+        graph = self.builder.merge(graph, node)
 
-            # graph = merge(graph, child)
-            # graph = add_edge(source, target, graph)
+        return add_edge(source, node['top'], graph)
 
-        return graph
+    def _collapsed(self, label: str, style: Optional[Style]) -> Graph:
+        node = self.builder.add_node(label, shape=Shape.BOX, style=style)
+        tgt = node['top']
+        wrapper = self.builder.add_node('atom', font=Font.ITALIC, shape=Shape.ELLIPSE)
+        node = self.builder.merge(node, wrapper)
+        src = node['top']
+
+        return add_edge(src, tgt, node)
 
-    def visit_match(self, node, children) -> Any:
-        return children[0]
+    def visit_anchor(self, node: Anchor) -> Graph:
+        return self.builder.add_node(node.kind, shape=Shape.BOX, style=Style.FILLED)
 
-    def visit_anchor(self, node, children) -> Any:
-        return add_node(node.value, shape=Shape.BOX, style=Style.FILLED)
+    def visit_backref(self, node: Backref) -> Graph:
+        return self.builder.add_node(f'\\{node.number}', shape=Shape.BOX, style=Style.FILLED)
 
-    def visit_backref(self, node, children) -> Any:
-        return add_node(node.value, shape=Shape.BOX, style=Style.FILLED)
+    def visit_atom(self, node: Atom) -> Graph:
+        return self._quantified('atom', node.quantifier, self.visit(node.item))
 
-    def visit_atom(self, node, children) -> Any:
+    def visit_group(self, node: Group) -> Graph:
+        return self._quantified('group' if node.capturing else '?:group', node.quantifier, self.visit(node.item))
+
+    def _quantified(self, label: str, quantifier: Optional[Quantifier], child: Graph) -> Graph:
+        graph = self._wrapper(label, quantifier)
+        source, target = graph['top'], child['top']
+        graph = self.builder.merge(graph, child)
+
+        return add_edge(source, target, graph)
+
+    def _wrapper(self, label: str, quantifier: Optional[Quantifier], note: str = None) -> Graph:
+        quantifier = _quantifier(quantifier, self.context.theme) if quantifier else {}
         params = {
-            'label': f"atom{children[1]['label'] if len(children) > 1 else ''}",
+            'label': f"{label}{quantifier.get('label', '')}{f' ({note})' if note else ''}",
             'font': Font.ITALIC,
             'shape': Shape.ELLIPSE,
         }
-        if len(children) > 1:
-            for key, value in children[1].items():
-                if key not in ('label', 'line') and value is not None:
-                    params[key] = value
-        graph = add_node(**params)
-        if len(children) > 1 and 'line' in children[1]:
-            params = {k: v for k, v in children[1].items() if k != 'style' and v is not None}
+        for key, value in quantifier.items():
+            if key not in ('label', 'line') and value is not None:
+                params[key] = value
+        graph = self.builder.add_node(**params)
+        if 'line' in quantifier:
+            params = {k: v for k, v in quantifier.items() if k != 'style' and v is not None}
             graph = add_edge(graph['top'], graph['top'], graph, **params)
 
-        source, target = graph['top'], children[0]['top']
-        graph = merge(graph, children[0])
-        graph = add_edge(source, target, graph, )
-
         return graph
 
-    def visit_character_any(self, node, children) -> Any:
-        return add_node(node.value, shape=Shape.BOX, style=Style.FILLED)
-
-    def visit_character_set(self, node, children) -> Any:
-        negated = children[0] == '^'
-        if negated:
-            children = children[1:]
-
-        classes, values = set(), set()
-        if children[0] in ['-', ']']:
-            values.add(ord(children[0]))
-            children = children[1:]
-        for child in children:
-            if isinstance(child, dict):
-                ident = child['top']
-                label = child['nodes'][ident]['label']
-                try:
-                    values.update(order(label))
-                except TypeError:
-                    classes.add(label)
-            else:
-                values.update(child)
+    def visit_charset(self, node: CharSet) -> Graph:
+        if node.kind != SET:
+            label, style = _leaf(node)
+            return self.builder.add_node(label, shape=Shape.BOX, style=style)
 
-        graph = add_node(
-            f"{'^' if negated else ''}charset",
+        graph = self.builder.add_node(
+            f"{'^' if node.negated else ''}charset",
             font=Font.ITALIC,
             shape=Shape.TRAPEZIUM,
-            color=NEGATED if negated else None,
+            color=self.context.theme.negated if node.negated else None,
         )
         source = graph['top']
 
-        for class_ in sorted(classes):
-            child = add_node(class_, shape=Shape.BOX, style=Style.FILLED)
-            graph = merge(graph, child)
+        values = node.values
+        for class_ in sorted(node.classes):
+            child = self.builder.add_node(class_, shape=Shape.BOX, style=Style.FILLED)
+            graph = self.builder.merge(graph, child)
             graph = add_edge(source, child['top'], graph)
+            covered = category(class_)
+            if covered is not None:
+                values -= covered
 
+        symbols, rest = [], values
         for group, symbol in [
             (BUT_SPACE, '\\S'),
             (BUT_DIGIT, '\\D'),
@@ -165,126 +216,96 @@ class RegExVisitor(PTNodeVisitor):
             (DIGIT, '\\d'),
             (SPACE, '\\s'),
         ]:
-            if group in values:
-                child = add_node(symbol, shape=Shape.BOX, style=Style.FILLED)
-                graph = merge(graph, child)
-                graph = add_edge(source, child['top'], graph)
-                values -= group
-
-        start, last = None, None
-        for value in sorted(values):
-            if last is None:
-                start, last = value, value
-            elif value == last + 1:
-                last = value
-            else:
-                label = normal(start) if last == start else f"{normal(start)}-{normal(last)}"
-                child = add_node(label, shape=Shape.BOX)
-                graph = merge(graph, child)
-                graph = add_edge(source, child['top'], graph)
-                start, last = None, None
+            if group <= rest:
+                symbols.append(symbol)
+                rest -= group
+        if len(symbols) + len(rest.intervals) > len(values.intervals) + 1:
+            symbols, rest = [], values
+
+        for symbol in symbols:
+            child = self.builder.add_node(symbol, shape=Shape.BOX, style=Style.FILLED)
+            graph = self.builder.merge(graph, child)
+            graph = add_edge(source, child['top'], graph)
 
-        if last is not None:
+        for start, last in rest:
             label = normal(start) if last == start else f"{normal(start)}-{normal(last)}"
-            child = add_node(label, shape=Shape.BOX)
-            graph = merge(graph, child)
+            child = self.builder.add_node(label, shape=Shape.BOX)
+            graph = self.builder.merge(graph, child)
             graph = add_edge(source, child['top'], graph)
 
         return graph
 
-    def visit_character_element(self, node, children) -> Any:
-        return children[0]
 
-    def visit_character_category(self, node, children) -> Any:
-        return add_node(node.value, shape=Shape.BOX, style=Style.FILLED)
+class SharingVisitor(GraphVisitor):
 
-    def visit_character_class(self, node, children) -> Any:
-        return add_node(node.value, shape=Shape.BOX, style=Style.FILLED)
+    def __init__(self, profile: Profile = None, context: Context = None):
+        super().__init__(profile, context)
+        self.table = {}
+        self.ids = {}
+        self.interned = {}
+        self.siblings = [set()]
 
-    def visit_character_range(self, node, children) -> Any:
-        values = sorted({v for c in children for v in c})
+    def draw(self, node: Node) -> Graph:
+        graph = super().draw(node)
+        self.table, self.ids, self.interned, self.siblings = {}, {}, {}, [set()]
 
-        return {i for i in range(values[0], values[-1] + 1)}
+        return graph
 
-    def visit_character(self, node, children) -> Any:
-        ident = children[0]['top']
-        char = children[0]['nodes'][ident]['label']
-        if char == '" "':
-            char = ' '
+    def visit(self, node: Node) -> Graph:
+        if not isinstance(node, SHAREABLE):
+            return super().visit(node)
 
-        return order(char)
+        return self._shared(self._intern(node), partial(GraphVisitor.visit, self, node))
 
-    def visit_group(self, node, children) -> Any:
-        params = {
-            'label': f"group{children[1]['label'] if len(children) > 1 else ''}",
-            'font': Font.ITALIC,
-            'shape': Shape.ELLIPSE,
-        }
-        if len(children) > 1:
-            for key, value in children[1].items():
-                if key not in ('label', 'line') and value is not None:
-                    params[key] = value
-        graph = add_node(**params)
-        if len(children) > 1 and 'line' in children[1]:
-            params = {k: v for k, v in children[1].items() if k != 'style' and v is not None}
-            graph = add_edge(graph['top'], graph['top'], graph, **params)
+    def _collapsed(self, label: str, style: Optional[Style]) -> Graph:
+        return self._shared(('run', label, style), partial(GraphVisitor._collapsed, self, label, style))
 
-        source, target = graph['top'], children[0]['top']
-        graph = merge(graph, children[0])
-        graph = add_edge(source, target, graph, )
+    def _shared(self, key: Hashable, build: Callable[[], Graph]) -> Graph:
+        siblings = self.siblings[-1]
+        graph = self.interned.get(key)
+        if graph is not None and graph['top'] not in siblings:
+            self.builder.nodes[graph['top']]['peripheries'] = SHARED
+        else:
+            self.siblings.append(set())
+            graph = build()
+            self.siblings.pop()
+            self.interned.setdefault(key, graph)
+        siblings.add(graph['top'])
 
         return graph
 
-    def visit_quantifier(self, node, children) -> Any:
-        if len(children) > 1 and children[-1] == '?':
-            children[0]['label'] += '?'
-            children[0]['color'] = GREEDY
+    def _intern(self, node: Optional[Node]) -> int:
+        if node is None:
+            return -1
 
-        return children[0]
+        ident = self.ids.get(node)
+        if ident is not None:
+            return ident
 
-    def visit_zero_or_one(self, node, children) -> Any:
-        return {
-            'label': '?',
-            'style': Style.DASHED,
-        }
+        if isinstance(node, (Alternative, Sequence)):
+            parts = (type(node), *(self._intern(item) for item in node.items))
+        elif isinstance(node, (Atom, Group)):
+            capturing = node.capturing if isinstance(node, Group) else None
+            parts = (type(node), capturing, self._intern(node.item), self._intern(node.quantifier))
+        elif isinstance(node, Quantifier):
+            parts = (Quantifier, node.lower, node.upper, node.greedy, node.text)
+        elif isinstance(node, CharSet):
+            text = None if node.kind in (LITERAL, SET) else node.text
+            parts = (CharSet, node.kind, node.negated, node.values, node.classes, text)
+        elif isinstance(node, Anchor):
+            parts = (Anchor, node.kind)
+        else:
+            parts = (type(node), node.number)
+        ident = self.ids[node] = self.table.setdefault(parts, len(self.table))
 
-    def visit_zero_or_more(self, node, children) -> Any:
-        return {
-            'label': '*',
-            'style': Style.DASHED,
-            'line': Line.DOT,
-            'color': REPEATED,
-        }
+        return ident
 
-    def visit_one_or_more(self, node, children) -> Any:
-        return {
-            'label': '+',
-            'line': Line.DOT,
-            'color': REPEATED,
-        }
 
-    def visit_n_times(self, node, children) -> Any:
-        return {
-            'label': f"{{{','.join(children)}}}",
-            'style': Style.DASHED if int(children[0]) == 0 else None,
-            'line': Line.DOT if len(children) > 1 and int(children[1]) > 1 or int(children[0]) > 1 else None,
-            'color': REPEATED if len(children) > 1 and int(children[1]) > 1 or int(children[0]) > 1 else None,
-        }
-
-    def visit_symbol(self, node, children) -> Any:
-        return add_node(normal(ord(node.value)), shape=Shape.BOX)
-
-    def visit_symbol_in_range(self, node, children) -> Any:
-        return add_node(normal(ord(node.value)), shape=Shape.BOX)
+class RegExVisitor(SyntaxVisitor):
 
-    def visit_escaped(self, node, children) -> Any:
-        return add_node(node.value, shape=Shape.BOX)
+    def __init__(self, *args, context: Context = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.context = context
 
-    def visit_escaped_in_range(self, node, children) -> Any:
-        return add_node(node.value, shape=Shape.BOX)
-
-    def visit_ascii_code(self, node, children) -> Any:
-        return add_node(normal(int(node.value[2:], 16)), shape=Shape.BOX)
-
-    def visit_unicode(self, node, children) -> Any:
-        return add_node(normal(int(node.value[2:], 16)), shape=Shape.BOX)
+    def visit_regex(self, node, children) -> Any:
+        return GraphVisitor(context=self.context).draw(super().visit_regex(node, children))
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import sys
+
+from analysis import analyze_many
+from analysis import EXPONENTIAL
+from analysis import POLYNOMIAL
+from batch import read_patterns
+from pipeline import PARSER_VARIABLE
+from pipeline import PARSERS
+
+SEVERITY = {None: 0, POLYNOMIAL: 1, EXPONENTIAL: 2}
+
+
+def main(argv=None) -> int:
+    arguments = argparse.ArgumentParser(description='Flag regular expressions prone to catastrophic backtracking.')
+    arguments.add_argument('input', help="file with one pattern per line, '-' for stdin")
+    arguments.add_argument('--jsonl', action='store_true', help='input lines are JSON strings or {"pattern": ...}')
+    arguments.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    arguments.add_argument('--chunk-size', type=int, default=64, help='patterns per worker task')
+    arguments.add_argument('--fail-on', choices=(POLYNOMIAL, EXPONENTIAL), default=None,
+                           help='exit with 1 if any pattern is at least this complex or cannot be analyzed')
+    arguments.add_argument('--parser', choices=PARSERS, default=None,
+                           help=f'pattern parser (default: ${PARSER_VARIABLE} or {PARSERS[0]})')
+    args = arguments.parse_args(argv)
+    if args.parser:
+        os.environ[PARSER_VARIABLE] = args.parser
+
+    threshold = SEVERITY[args.fail_on] if args.fail_on else None
+    failed = False
+    errors = []
+    file = sys.stdin if args.input == '-' else open(args.input)
+    with file:
+        patterns = read_patterns(file, jsonl=args.jsonl, errors=errors)
+        for report in analyze_many(patterns, workers=args.workers, chunksize=args.chunk_size):
+            print(json.dumps(report._asdict()))
+            if threshold is not None and (report.error is not None or SEVERITY.get(report.complexity, 0) >= threshold):
+                failed = True
+    for error in errors:
+        print(f'failed\t{error.pattern}\t{error.error}', file=sys.stderr)
+
+    return 1 if failed or errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import sys
+
+from benchmark import compare
+from benchmark import Results
+from benchmark import run
+from benchmark import SIZES
+from benchmark import STAGES
+
+
+def load(path: str) -> Results:
+    with open(path) as file:
+        return json.load(file)
+
+
+def table(results: Results) -> None:
+    print(f"{'pattern':24} {'length':>7} " + ' '.join(f'{stage:>10}' for stage in STAGES))
+    for name, entry in results['patterns'].items():
+        cells = (entry['stages'].get(stage) for stage in STAGES)
+        timings = ' '.join(f"{cell['seconds'] * 1000:8.2f}ms" if cell else f"{'-':>10}" for cell in cells)
+        print(f"{name:24} {entry['length']:7d} {timings}")
+
+
+def report(baseline: Results, current: Results, threshold: float, memory_threshold: float, floor: float) -> int:
+    regressions = compare(baseline, current, threshold=threshold, memory_threshold=memory_threshold, floor=floor)
+    for r in regressions:
+        if r.metric == 'seconds':
+            change = f'{r.baseline * 1000:.2f}ms -> {r.current * 1000:.2f}ms'
+        else:
+            change = f'{r.baseline / 1024:.1f}KiB -> {r.current / 1024:.1f}KiB'
+        print(f'REGRESSION {r.pattern} {r.stage} {r.metric}: {change} ({r.ratio:.2f}x)')
+    print(f'{len(regressions)} regressions')
+
+    return 1 if regressions else 0
+
+
+def main(argv=None) -> int:
+    arguments = argparse.ArgumentParser(description='Benchmark each stage of the pipeline on a fixed corpus.')
+    commands = arguments.add_subparsers(dest='command', required=True)
+
+    running = commands.add_parser('run', help='time and measure every stage, optionally against a baseline')
+    running.add_argument('--output', default=None, help='JSON file to store the results in')
+    running.add_argument('--size', choices=SIZES, action='append', default=None, help='corpus sizes (default: all)')
+    running.add_argument('--repeat', type=int, default=5, help='runs per stage, the best one is kept')
+    running.add_argument('--budget', type=float, default=1.0, help='seconds after which a stage stops repeating')
+    running.add_argument('--baseline', default=None, help='JSON results to compare against')
+
+    comparing = commands.add_parser('compare', help='flag regressions between two stored results')
+    comparing.add_argument('baseline', help='JSON results of the reference run')
+    comparing.add_argument('current', help='JSON results of the run to check')
+
+    for command in (running, comparing):
+        command.add_argument('--threshold', type=float, default=0.2, help='tolerated relative slowdown')
+        command.add_argument('--memory-threshold', type=float, default=0.1, help='tolerated relative peak increase')
+        command.add_argument('--floor', type=float, default=0.5e-3, help='ignore slowdowns shorter than this (seconds)')
+    args = arguments.parse_args(argv)
+
+    if args.command == 'compare':
+        return report(load(args.baseline), load(args.current), args.threshold, args.memory_threshold, args.floor)
+
+    results = run(tuple(args.size or SIZES), repeat=args.repeat, budget=args.budget)
+    table(results)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    if not args.baseline:
+        return 0
+
+    return report(load(args.baseline), results, args.threshold, args.memory_threshold, args.floor)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
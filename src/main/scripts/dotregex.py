@@ -1,16 +1,47 @@
 #!/usr/bin/env python3
+import argparse
 import os
-import re
+import sys
+from itertools import chain
 
-from arpeggio import ParserPython
-from arpeggio import visit_parse_tree
+from batch import filename
+from batch import read_patterns
+from batch import run
+from budget import Budget
+from diskcache import DiskCache
+from pipeline import build
+from pipeline import PARSER_VARIABLE
+from pipeline import PARSERS
+from profiling import Profile
+from rendering import FORMATS
+from rendering import render
 
-from grammar import regex
-from utils import convert
-from visitor import RegExVisitor
 
-if __name__ == '__main__':
-    parser = ParserPython(regex, ws='\t ', debug=False)
+def positive(text: str) -> int:
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f'expected a positive integer, got {text}')
+
+    return value
+
+
+def natural(text: str) -> int:
+    value = int(text)
+    if value < 0:
+        raise argparse.ArgumentTypeError(f'expected a non-negative integer, got {text}')
+
+    return value
+
+
+def demo(
+        profile: Profile = None,
+        share: bool = False,
+        budget: Budget = None,
+        directory: str = '.',
+        fmt: str = 'png',
+        keep_dot: bool = False,
+):
+    names, dots = [], []
     for test_expr in (
             "^(abc)?\\1$",
             "[^]\\p{L}\\n\\x64-\\x65\\u0066-\\u0067a-bc]+",
@@ -27,14 +58,110 @@ if __name__ == '__main__':
         print(test_expr)
         print('-' * len(test_expr))
         print()
-        parse_tree = parser.parse(test_expr)
-        result = visit_parse_tree(parse_tree, RegExVisitor(debug=False))
-        content = convert(result, title=re.escape(test_expr))
-        safe = re.sub(r'\W', '_', test_expr)
-        with open(f'{safe}.dot', 'w') as file:
-            file.write(content)
-        os.system(f'dot -Tpng -o{safe}.png {safe}.dot')
+        content = build(test_expr, profile, share, budget).dot
+        safe = os.path.join(directory, filename(test_expr))
+        if keep_dot or fmt == 'dot':
+            with open(f'{safe}.dot', 'w') as file:
+                file.write(content)
+        names.append(safe)
+        dots.append(content)
         print(content)
         print('\n' * 3)
 
+    images = render(dots, fmt) if fmt != 'dot' else []
+    if profile is not None:
+        with profile.stage('dot'):
+            images = list(images)
+    for safe, image in zip(names, images):
+        if image.error is None:
+            with open(f'{safe}.{fmt}', 'wb') as file:
+                file.write(image.data)
+        else:
+            print(f'{safe}.{fmt}: {image.error}', file=sys.stderr)
+
     print('Done.')
+
+
+def main(argv=None) -> int:
+    arguments = argparse.ArgumentParser(description='Render regular expressions as Graphviz diagrams.')
+    arguments.add_argument('input', nargs='?', help="file with one pattern per line, '-' for stdin")
+    arguments.add_argument('--jsonl', action='store_true', help='input lines are JSON strings or {"pattern": ...}')
+    arguments.add_argument('--output', default='.', help='directory for the generated files')
+    arguments.add_argument('--format', choices=(*FORMATS, 'dot'), default='png',
+                           help="output format ('dot' skips Graphviz)")
+    arguments.add_argument('--engine', choices=('dot', 'python'), default='dot',
+                           help="'python' draws svg in-process without Graphviz")
+    arguments.add_argument('--keep-dot', action='store_true', help='also write the intermediate .dot files')
+    arguments.add_argument('--workers', type=positive, default=None, help='worker processes (default: CPU count)')
+    arguments.add_argument('--chunk-size', type=positive, default=16, help='patterns per worker task')
+    arguments.add_argument('--dot-processes', type=positive, default=None,
+                           help='concurrent dot processes (default: CPU count)')
+    arguments.add_argument('--dot-batch', type=positive, default=8, help='graphs piped into one dot process')
+    arguments.add_argument('--parser', choices=PARSERS, default=None,
+                           help=f'pattern parser (default: ${PARSER_VARIABLE} or {PARSERS[0]})')
+    arguments.add_argument('--share', action='store_true',
+                           help='draw repeated subexpressions once, as shared nodes with a double outline')
+    arguments.add_argument('--max-nodes', type=natural, default=None,
+                           help='summarize subtrees so that each diagram has at most this many nodes (0: unbounded)')
+    arguments.add_argument('--max-depth', type=natural, default=None,
+                           help='summarize subtrees nested deeper than this many levels')
+    arguments.add_argument('--cache', default=None,
+                           help='directory of previously rendered diagrams; unchanged patterns are copied from it')
+    arguments.add_argument('--cache-size', type=positive, default=1024,
+                           help='megabytes kept in --cache, least recently used entries are evicted first')
+    arguments.add_argument('--profile', action='store_true',
+                           help='print per-stage timings, memory peaks and counters on stderr')
+    args = arguments.parse_args(argv)
+    if args.parser:
+        os.environ[PARSER_VARIABLE] = args.parser
+    if args.engine == 'python' and args.format != 'svg':
+        arguments.error("--engine python only supports --format svg")
+    budget = None
+    if args.max_nodes is not None or args.max_depth is not None:
+        if args.share:
+            arguments.error("--share cannot be combined with --max-nodes or --max-depth")
+        budget = Budget(args.max_nodes, args.max_depth)
+
+    profile = Profile() if args.profile else None
+    os.makedirs(args.output, exist_ok=True)
+    if args.input is None:
+        demo(profile, args.share, budget, args.output, args.format, args.keep_dot)
+        if profile is not None:
+            print(profile.format(), file=sys.stderr)
+        return 0
+
+    cache = DiskCache(args.cache, args.cache_size << 20) if args.cache else None
+    file = sys.stdin if args.input == '-' else open(args.input)
+    failures = 0
+    errors = []
+    with file:
+        patterns = read_patterns(file, jsonl=args.jsonl, errors=errors)
+        outcomes = run(
+            patterns,
+            directory=args.output,
+            fmt=args.format,
+            workers=args.workers,
+            chunksize=args.chunk_size,
+            keep_dot=args.keep_dot,
+            processes=args.dot_processes,
+            batch=args.dot_batch,
+            engine=args.engine,
+            profile=profile,
+            share=args.share,
+            budget=budget,
+            cache=cache,
+        )
+        for outcome in chain(outcomes, errors):
+            if outcome.error is None:
+                print(f'ok\t{outcome.pattern}\t{outcome.path}')
+            else:
+                failures += 1
+                print(f'failed\t{outcome.pattern}\t{outcome.error}', file=sys.stderr)
+    if profile is not None:
+        print(profile.format(), file=sys.stderr)
+
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+import argparse
+import sys
+from typing import Iterable
+from typing import Iterator
+from typing import Tuple
+
+from batch import read_patterns
+from export import GraphFile
+from export import GraphWriter
+from export import write_jsonl
+from pipeline import graph_visitor
+from pipeline import parse
+from utils import Graph
+
+
+def draw(patterns: Iterable[str]) -> Iterator[Tuple[str, Graph]]:
+    visitor = graph_visitor()
+    for pattern in patterns:
+        try:
+            yield pattern, visitor.draw(parse(pattern))
+        except Exception as e:
+            print(f'failed\t{pattern}\t{type(e).__name__}: {e}', file=sys.stderr)
+
+
+def main(argv=None) -> int:
+    arguments = argparse.ArgumentParser(description='Export the graphs of regular expressions for later analysis.')
+    arguments.add_argument('input', help="file with one pattern per line, '-' for stdin, or an export with --dump")
+    arguments.add_argument('--output', default='-', help="output file, '-' for stdout (JSON lines only)")
+    arguments.add_argument('--jsonl', action='store_true', help='write JSON lines instead of the binary layout')
+    arguments.add_argument('--append', action='store_true', help='add the patterns to an existing binary export')
+    arguments.add_argument('--dump', action='store_true', help='convert a binary export to JSON lines')
+    args = arguments.parse_args(argv)
+    if not (args.jsonl or args.dump) and args.output == '-':
+        arguments.error('the binary layout needs an --output file')
+
+    if args.dump:
+        output = sys.stdout if args.output == '-' else open(args.output, 'w')
+        with GraphFile(args.input) as exported, output:
+            write_jsonl(((graph.pattern, graph) for graph in exported), output)
+        return 0
+
+    file = sys.stdin if args.input == '-' else open(args.input)
+    with file:
+        graphs = draw(read_patterns(file))
+        if args.jsonl:
+            output = sys.stdout if args.output == '-' else open(args.output, 'a' if args.append else 'w')
+            with output:
+                count = write_jsonl(graphs, output)
+        else:
+            with GraphWriter(args.output, append=args.append) as writer:
+                start = len(writer.index)
+                for pattern, graph in graphs:
+                    writer.add(pattern, graph)
+                count = len(writer.index) - start
+    print(f'{count} patterns exported', file=sys.stderr)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
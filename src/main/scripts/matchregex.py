@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+import subprocess
+import sys
+import time
+from typing import Optional
+
+import matcher
+
+PROBE = "import re, sys, time; p = re.compile(sys.argv[1]); s = sys.argv[2]; t = time.perf_counter(); " \
+        "p.search(s); print(time.perf_counter() - t)"
+
+
+def backtracking(pattern: str, text: str, budget: float) -> Optional[float]:
+    try:
+        done = subprocess.run(
+            [sys.executable, '-c', PROBE, pattern, text],
+            capture_output=True, text=True, check=True, timeout=budget + 1,
+        )
+    except subprocess.TimeoutExpired:
+        return None
+
+    return float(done.stdout)
+
+
+def pike(pattern: matcher.Pattern, text: str) -> float:
+    start = time.perf_counter()
+    pattern.search(text)
+
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+    print(f"{'pattern':<16} {'n':>6} {'re (s)':>10} {'pike (s)':>10}")
+    for test_expr, subject, sizes in (
+            ("(a+)+b", 'a', (10, 20, 25, 30, 1000, 10000)),
+            ("(a|aa)+c", 'a', (10, 20, 30, 40, 1000, 10000)),
+            ("(a|a)*b", 'a', (10, 20, 25, 30, 1000, 10000)),
+            ("(\\w+\\d+)+x", '1', (10, 20, 25, 30, 1000, 10000)),
+            ("(a?){n}a{n}", 'a', (10, 20, 25, 30)),
+            ("[a-z]+@[a-z]+", 'a', (10, 1000, 10000)),
+    ):
+        timed_out = False
+        for n in sizes:
+            expr = test_expr.replace('{n}', f'{{{n}}}')
+            text = subject * n
+            elapsed = pike(matcher.compile(expr), text)
+            slow = None if timed_out else backtracking(expr, text, budget)
+            timed_out = timed_out or slow is None
+            shown = f'>{budget:.0f}' if slow is None else f'{slow:.4f}'
+            print(f"{test_expr:<16} {n:>6} {shown:>10} {elapsed:10.4f}")
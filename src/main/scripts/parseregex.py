@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+import random
+import sys
+import time
+from typing import Any
+
+from pipeline import parse
+from utils import Range
+
+PIECES = (
+    *'ab.|()[]^-\\*+?{},$ 0123x\t\né٣',
+    '\\d', '\\w', '\\s', '\\x41', '\\u0062', '\\u12', '\\p{L}', '\\pL', '\\p{', '\\1', '(?:', '{2}', '{1,3}', '\\b',
+    '\\t', '\\]', '\\-',
+)
+
+LEAVES = (
+    'a', 'b', '.', '\\d', '[a-c]', '[^x\\]y]', '[]a]', '[-b]', '\\x41', '\\u00e9', '\\p{Lu}', '[\\w\\p{N}-]', '\\.',
+    ' ', '[ a - c ]', '\\b', '^', '$', '\\1',
+)
+
+QUANTIFIERS = ('*', '+', '?', '{2}', '{1,3}', '*?', '{0, 2}?', ' +', '{2', '{,3}')
+
+
+def noise(rng: random.Random) -> str:
+    return ''.join(rng.choice(PIECES) for _ in range(rng.randint(1, 12)))
+
+
+def structured(rng: random.Random, depth: int = 0) -> str:
+    r = rng.random()
+    if depth > 3 or r < 0.4:
+        result = rng.choice(LEAVES)
+    elif r < 0.6:
+        result = '(' + rng.choice(('', '?:', ' ?:')) + structured(rng, depth + 1) + ')'
+    elif r < 0.8:
+        result = structured(rng, depth + 1) + structured(rng, depth + 1)
+    else:
+        result = structured(rng, depth + 1) + '|' + structured(rng, depth + 1)
+    if rng.random() < 0.3:
+        result += rng.choice(QUANTIFIERS)
+
+    return result
+
+
+def dump(node: Any) -> Any:
+    if node is None or isinstance(node, (int, str, frozenset)):
+        return node
+
+    if isinstance(node, list):
+        return [dump(item) for item in node]
+
+    if isinstance(node, Range):
+        return tuple(node)
+
+    return type(node).__name__, *((k, dump(getattr(node, k))) for c in type(node).__mro__[:-1] for k in c.__slots__)
+
+
+def outcome(pattern: str, using: str) -> Any:
+    try:
+        return dump(parse(pattern, using=using))
+    except Exception:
+        return None
+
+
+def timed(pattern: str, using: str, runs: int) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        parse(pattern, using=using)
+
+    return (time.perf_counter() - start) / runs
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    rng = random.Random(int(sys.argv[2]) if len(sys.argv) > 2 else 0)
+    mismatches = accepted = 0
+    for i in range(count):
+        pattern = noise(rng) if i % 2 else structured(rng)
+        expected, actual = outcome(pattern, 'arpeggio'), outcome(pattern, 'descent')
+        if expected != actual:
+            mismatches += 1
+            print(f'mismatch {pattern!r}\n  arpeggio {expected}\n  descent  {actual}')
+        elif expected is not None:
+            accepted += 1
+    print(f'{count} patterns, {accepted} accepted by both, {mismatches} mismatches')
+    print()
+
+    print(f"{'length':>8} {'arpeggio (ms)':>14} {'descent (ms)':>13} {'speedup':>8}")
+    for test_expr in (
+            '(ab|cd)+[^\\d\\s]x{2,3}',
+            '|'.join(f'(ab[c-f]x{i}+|\\d{{2,3}}y)' for i in range(100)),
+            'a' * 5000,
+    ):
+        runs = max(1, 2000 // len(test_expr))
+        slow, fast = timed(test_expr, 'arpeggio', runs), timed(test_expr, 'descent', runs)
+        print(f"{len(test_expr):8d} {slow * 1000:14.2f} {fast * 1000:13.3f} {slow / fast:7.1f}x")
+
+    sys.exit(1 if mismatches else 0)
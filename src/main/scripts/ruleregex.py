@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+import argparse
+import random
+import re
+import sys
+import time
+from typing import List
+from typing import Set
+from typing import Tuple
+
+import ruleset
+from batch import read_patterns
+
+LEVELS = ('DEBUG', 'INFO', 'WARN', 'ERROR')
+METHODS = ('GET', 'POST', 'PUT', 'DELETE')
+
+
+def vocabulary(rng: random.Random, size: int) -> List[str]:
+    return [''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(3, 9))) for _ in range(size)]
+
+
+def generate_rules(rng: random.Random, words: List[str], count: int) -> List[str]:
+    shapes = (
+        lambda: f'^{rng.choice(LEVELS)}\\ \\[{rng.choice(words)}\\]',
+        lambda: f'{rng.choice(METHODS)}\\ /{rng.choice(words)}/\\w+\\.(?:js|css|png)',
+        lambda: f'user={rng.choice(words)}\\b',
+        lambda: f'status=(?:{rng.randint(100, 599)}|{rng.randint(100, 599)})',
+        lambda: f'timeout\\ after\\ \\d+ms\\ in\\ {rng.choice(words)}',
+        lambda: f'{rng.choice(words)}[-_]{rng.choice(words)}=\\d{{2,4}}',
+        lambda: f'from\\ (?:\\d{{1,3}}\\.){{3}}{rng.randint(0, 255)}$',
+    )
+
+    return [rng.choice(shapes)() for _ in range(count)]
+
+
+def generate_lines(rng: random.Random, words: List[str], count: int) -> List[str]:
+    return [
+        f'{rng.choice(LEVELS)} [{rng.choice(words)}] {rng.choice(METHODS)} /{rng.choice(words)}/{rng.choice(words)}.js '
+        f'status={rng.randint(100, 599)} user={rng.choice(words)} {rng.choice(words)}_{rng.choice(words)}='
+        f'{rng.randint(1, 9999)} took {rng.randint(1, 999)}ms from 10.0.{rng.randint(0, 255)}.{rng.randint(0, 255)}'
+        for _ in range(count)
+    ]
+
+
+def loop(patterns: List[str], texts: List[str]) -> Tuple[float, List[Set[int]]]:
+    compiled = [re.compile(pattern) for pattern in patterns]
+    start = time.perf_counter()
+    found = [{index for index, pattern in enumerate(compiled) if pattern.search(text)} for text in texts]
+
+    return time.perf_counter() - start, found
+
+
+def automaton(rules: ruleset.RuleSet, texts: List[str]) -> Tuple[float, List[Set[int]]]:
+    start = time.perf_counter()
+    found = [rules.scan(text) for text in texts]
+
+    return time.perf_counter() - start, found
+
+
+def main(argv=None) -> int:
+    arguments = argparse.ArgumentParser(description='Compare one combined automaton with a loop of re.search calls.')
+    arguments.add_argument('--rules', default=None, help="file with one pattern per line (default: generated rules)")
+    arguments.add_argument('--text', default=None, help="file with one input per line, '-' for stdin "
+                                                        "(default: generated log lines)")
+    arguments.add_argument('--count', type=int, action='append', default=None,
+                           help='number of generated rules (repeatable, default: 10, 100, 1000, 3000)')
+    arguments.add_argument('--lines', type=int, default=2000, help='number of generated log lines')
+    arguments.add_argument('--cache-size', type=int, default=1 << 16, help='cached DFA transitions before a flush')
+    arguments.add_argument('--seed', type=int, default=0, help='random seed of the generated rules and lines')
+    args = arguments.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    words = vocabulary(rng, 500)
+    if args.text is None:
+        texts = generate_lines(rng, words, args.lines)
+    else:
+        file = sys.stdin if args.text == '-' else open(args.text)
+        with file:
+            texts = [line.rstrip('\n') for line in file]
+    if args.rules is None:
+        sets = [generate_rules(rng, words, count) for count in args.count or (10, 100, 1000, 3000)]
+    else:
+        with open(args.rules) as file:
+            sets = [list(read_patterns(file))]
+
+    mismatches = 0
+    print(f"{'rules':>6} {'lines':>6} {'re (s)':>9} {'warm-up (s)':>12} {'dfa (s)':>9} {'speed-up':>9} "
+          f"{'states':>7} {'flushes':>8} {'mode':>5}")
+    for patterns in sets:
+        slow, expected = loop(patterns, texts)
+        combined = ruleset.compile(patterns, cache_size=args.cache_size)
+        warm, found = automaton(combined, texts)
+        fast, found = automaton(combined, texts)
+        mismatches += sum(1 for a, b in zip(expected, found) if a != b)
+        stats = combined.stats()
+        print(f"{len(patterns):>6} {len(texts):>6} {slow:9.3f} {warm:12.3f} {fast:9.3f} {slow / fast:8.1f}x "
+              f"{stats.states:>7} {stats.flushes:>8} {'nfa' if stats.fallback else 'dfa':>5}")
+    if mismatches:
+        print(f'{mismatches} lines matched different rules', file=sys.stderr)
+
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
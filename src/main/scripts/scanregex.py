@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import sys
+
+from pipeline import PARSER_VARIABLE
+from pipeline import PARSERS
+from rendering import FORMATS
+from scan import scan
+
+
+def main(argv=None) -> int:
+    arguments = argparse.ArgumentParser(description='Find, parse and draw the regular expressions of a source tree.')
+    arguments.add_argument('roots', nargs='+', help='directories (or Python files) to scan')
+    arguments.add_argument('--output', default=None, help='directory for the diagrams (default: do not draw)')
+    arguments.add_argument('--format', choices=(*FORMATS, 'dot'), default='dot',
+                           help="diagram format ('dot' skips Graphviz)")
+    arguments.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    arguments.add_argument('--chunk-size', type=int, default=64, help='files or patterns per worker task')
+    arguments.add_argument('--dot-processes', type=int, default=None,
+                           help='concurrent dot processes (default: CPU count)')
+    arguments.add_argument('--parser', choices=PARSERS, default=None,
+                           help=f'pattern parser (default: ${PARSER_VARIABLE} or {PARSERS[0]})')
+    args = arguments.parse_args(argv)
+    if args.parser:
+        os.environ[PARSER_VARIABLE] = args.parser
+    if args.output is not None:
+        os.makedirs(args.output, exist_ok=True)
+
+    failures = 0
+    records = scan(
+        args.roots,
+        directory=args.output,
+        fmt=args.format,
+        workers=args.workers,
+        chunksize=args.chunk_size,
+        processes=args.dot_processes,
+    )
+    for record in records:
+        if record['kind'] == 'pattern' and record['error'] is not None:
+            failures += 1
+        print(json.dumps(record, ensure_ascii=False))
+
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import os
+import sys
+
+from budget import Budget
+from pipeline import PARSER_VARIABLE
+from pipeline import PARSERS
+from server import DEFAULT_BUDGET
+from server import DOT_TIMEOUT
+from server import serve
+
+
+def main(argv=None) -> int:
+    arguments = argparse.ArgumentParser(description='Serve regular expression diagrams over HTTP.')
+    arguments.add_argument('--host', default='127.0.0.1', help='interface to listen on')
+    arguments.add_argument('--port', type=int, default=8000, help='port to listen on')
+    arguments.add_argument('--workers', type=int, default=None, help='threads parsing and drawing patterns')
+    arguments.add_argument('--dot-processes', type=int, default=None,
+                           help='concurrent dot processes (default: CPU count)')
+    arguments.add_argument('--cache-size', type=int, default=1024, help='rendered diagrams kept in memory')
+    arguments.add_argument('--max-age', type=int, default=86400, help='Cache-Control max-age in seconds')
+    arguments.add_argument('--max-nodes', type=int, default=DEFAULT_BUDGET.max_nodes,
+                           help='node budget of requests without max_nodes/max_depth (0: unbounded)')
+    arguments.add_argument('--dot-timeout', type=float, default=DOT_TIMEOUT,
+                           help='seconds a dot process may run before the request fails (0: no limit)')
+    arguments.add_argument('--parser', choices=PARSERS, default=None,
+                           help=f'pattern parser (default: ${PARSER_VARIABLE} or {PARSERS[0]})')
+    args = arguments.parse_args(argv)
+    if args.parser:
+        os.environ[PARSER_VARIABLE] = args.parser
+
+    print(f'Serving on http://{args.host}:{args.port}/render?pattern=...', file=sys.stderr)
+    try:
+        asyncio.run(serve(
+            args.host,
+            args.port,
+            workers=args.workers,
+            dot_processes=args.dot_processes,
+            cache_size=args.cache_size,
+            max_age=args.max_age,
+            budget=Budget(args.max_nodes) if args.max_nodes > 0 else None,
+            dot_timeout=args.dot_timeout or None,
+        ))
+    except KeyboardInterrupt:
+        pass
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+import argparse
+import re
+import shutil
+import sys
+import time
+from typing import Callable
+from typing import Tuple
+
+import svg
+from batch import read_patterns
+from benchmark import corpus
+from benchmark import SIZES
+from pipeline import graph_visitor
+from pipeline import parse
+from rendering import invoke
+from utils import convert
+from utils import Graph
+
+
+def size(graph: Graph) -> Tuple[int, int]:
+    return len(graph['nodes']), sum(len(targets) for targets in graph['edges'].values())
+
+
+def layout(engine: str) -> Callable[[Graph, str], float]:
+    def timed(graph: Graph, pattern: str) -> float:
+        start = time.perf_counter()
+        if engine == 'dot':
+            image = invoke([convert(graph, title=re.escape(pattern))], 'svg')[0]
+            if image.error is not None:
+                raise RuntimeError(image.error)
+        else:
+            svg.convert(graph, title=pattern)
+
+        return time.perf_counter() - start
+
+    return timed
+
+
+def main(argv=None) -> int:
+    arguments = argparse.ArgumentParser(description='Compare tree and shared (DAG) diagrams of regular expressions.')
+    arguments.add_argument('input', nargs='?', help="file with one pattern per line, '-' for stdin (default: corpus)")
+    arguments.add_argument('--size', choices=SIZES, action='append', default=None, help='corpus sizes (default: all)')
+    arguments.add_argument('--engine', choices=('dot', 'python'), default=None,
+                           help="layout engine to time (default: 'dot' when Graphviz is installed)")
+    args = arguments.parse_args(argv)
+    engine = args.engine or ('dot' if shutil.which('dot') else 'python')
+
+    if args.input is None:
+        patterns = corpus(tuple(args.size or SIZES))
+    else:
+        file = sys.stdin if args.input == '-' else open(args.input)
+        with file:
+            patterns = [(pattern[:24], pattern) for pattern in read_patterns(file)]
+
+    timed = layout(engine)
+    totals = [0, 0, 0.0, 0, 0, 0.0]
+    print(f"{'pattern':24} {'nodes':>7} {'edges':>7} {engine + ' (ms)':>11} {'shared':>7} {'edges':>7} {'(ms)':>9}")
+    for name, pattern in patterns:
+        tree = parse(pattern)
+        row = []
+        for share in (False, True):
+            graph = graph_visitor(share).draw(tree)
+            row.extend((*size(graph), timed(graph, pattern)))
+        totals = [a + b for a, b in zip(totals, row)]
+        print(f'{name:24} {row[0]:7d} {row[1]:7d} {row[2] * 1000:11.2f} {row[3]:7d} {row[4]:7d} {row[5] * 1000:9.2f}')
+
+    print(f'{"total":24} {totals[0]:7d} {totals[1]:7d} {totals[2] * 1000:11.2f} {totals[3]:7d} {totals[4]:7d}'
+          f' {totals[5] * 1000:9.2f}')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
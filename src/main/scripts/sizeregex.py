@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+import gc
+import sys
+import tracemalloc
+
+from compact import compact
+from pipeline import parse
+from visitor import GraphVisitor
+
+
+def retained(build, count: int) -> int:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [build() for _ in range(count)]
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+
+    return after - before
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    for test_expr in (
+            "^(abc)?\\1$",
+            "[^]\\p{L}\\n\\x64-\\x65\\u0066-\\u0067a-bc]+",
+            ".?a*\\w+\\x64{2}\\u0064{0,3}",
+            "(XYZ)|(123)",
+            "|".join(f"(ab[c-f]x{i}+|\\d{{2,3}}y)" for i in range(50)),
+    ):
+        tree = parse(test_expr)
+        graph = GraphVisitor().draw(tree)
+        plain = retained(lambda: GraphVisitor().draw(tree), count)
+        packed = retained(lambda: compact(GraphVisitor().draw(tree)), count)
+        print(f"{len(graph['nodes']):5d} nodes  dict {plain / count:9.0f} B  "
+              f"compact {packed / count:9.0f} B  ({packed / plain:.0%})  {test_expr[:40]}")
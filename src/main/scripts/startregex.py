@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+import os
+import statistics
+import subprocess
+import sys
+import time
+from importlib.util import find_spec
+from typing import Dict
+
+MODULES = ('utils', 'grammar', 'visitor', 'pipeline')
+
+FIRST_RENDER = "from pipeline import render; render('(ab|cd)+[^\\\\d\\\\s]x{2,3}')"
+
+
+def environment() -> Dict[str, str]:
+    env = dict(os.environ)
+    path = os.path.dirname(find_spec('utils').origin)
+    env['PYTHONPATH'] = os.pathsep.join(p for p in (path, env.get('PYTHONPATH')) if p)
+
+    return env
+
+
+def importtime(module: str, env: Dict[str, str]) -> Dict[str, int]:
+    done = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    result = {}
+    for line in done.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not name.startswith('  '):
+            result[name.strip()] = int(cumulative)
+
+    return result
+
+
+def wall(code: str, env: Dict[str, str]) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', code], env=env, check=True)
+
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    env = environment()
+
+    print(f"{'module':<12} {'import (ms)':>12}")
+    for module in MODULES:
+        samples = [importtime(module, env)[module] / 1000 for _ in range(runs)]
+        print(f"{module:<12} {statistics.median(samples):12.2f}")
+
+    interpreter = statistics.median(wall('pass', env) for _ in range(runs))
+    first = statistics.median(wall(FIRST_RENDER, env) for _ in range(runs))
+    print()
+    print(f"interpreter startup   {interpreter * 1000:8.2f} ms")
+    print(f"time to first render  {first * 1000:8.2f} ms  (+{(first - interpreter) * 1000:.2f} ms over bare startup)")
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import sys
+import unicodedata
+
+import properties
+from properties import generate
+
+
+def main(argv=None) -> int:
+    default = os.path.join(os.path.dirname(os.path.abspath(properties.__file__)), 'unicode_tables.py')
+    arguments = argparse.ArgumentParser(description='Generate the Unicode property tables used for \\p{...}.')
+    arguments.add_argument('--scripts', default=None,
+                           help='Scripts.txt from the Unicode Character Database matching unicodedata '
+                                f'{unicodedata.unidata_version} (required for the default --output)')
+    arguments.add_argument('--output', default=default, help=f'generated module (default: {default})')
+    args = arguments.parse_args(argv)
+    if args.scripts is None and os.path.abspath(args.output) == default:
+        arguments.error('--scripts is required to regenerate the committed tables (without it they have no scripts)')
+
+    if args.scripts is None:
+        source = generate()
+    else:
+        with open(args.scripts, encoding='utf-8') as file:
+            source = generate(file)
+    with open(args.output, 'w') as file:
+        file.write(source)
+    print(f'{args.output}: {len(source)} bytes', file=sys.stderr)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
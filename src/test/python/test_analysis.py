@@ -0,0 +1,67 @@
+import os
+import subprocess
+import sys
+import unittest
+
+from assertpy import assert_that
+
+import analysis
+from analysis import analyze
+from analysis import analyze_many
+from analysis import EXPONENTIAL
+from analysis import LINEAR
+from analysis import POLYNOMIAL
+
+
+class AnalysisTest(unittest.TestCase):
+
+    def test_linear(self):
+        for pattern in ('abc', 'a*b*', '[a-z]+@[a-z]+\\.com', '(ab|cd)*'):
+            with self.subTest(pattern=pattern):
+                assert_that(analyze(pattern).complexity).is_equal_to(LINEAR)
+
+    def test_nested_quantifiers(self):
+        report = analyze('x(a+)+b')
+
+        assert_that(report.complexity).is_equal_to(EXPONENTIAL)
+        assert_that(report.reason).is_equal_to('nested quantifiers')
+        assert_that(report.offending).is_equal_to('(a+)+')
+
+    def test_ambiguous_alternation(self):
+        report = analyze('(a|a)*')
+
+        assert_that(report.complexity).is_equal_to(EXPONENTIAL)
+        assert_that(report.reason).is_equal_to('ambiguous alternation')
+
+    def test_overlapping_quantifiers(self):
+        report = analyze('a*a*')
+
+        assert_that(report.complexity).is_equal_to(POLYNOMIAL)
+        assert_that(report.degree).is_equal_to(2)
+
+    def test_parse_error(self):
+        report = analyze('(')
+
+        assert_that(report.complexity).is_none()
+        assert_that(report.error).starts_with('ParseError')
+
+    def test_many_keeps_order(self):
+        patterns = ['abc', '(a+)+', 'a*a*', '(']
+        reports = list(analyze_many(patterns, workers=1))
+
+        assert_that([report.pattern for report in reports]).is_equal_to(patterns)
+        assert_that([report.complexity for report in reports]).is_equal_to([LINEAR, EXPONENTIAL, POLYNOMIAL, None])
+
+    def test_audit_gate_fails_on_patterns_that_cannot_be_analyzed(self):
+        directory = os.path.dirname(analysis.__file__)
+        script = os.path.join(directory, os.pardir, 'scripts', 'auditregex.py')
+        env = dict(os.environ, PYTHONPATH=directory)
+        for patterns, code in (('abc\n', 0), ('abc\n(?P<name>a)\n', 1)):
+            with self.subTest(patterns=patterns):
+                done = subprocess.run([sys.executable, script, '-', '--fail-on', EXPONENTIAL, '--workers', '1'],
+                                      input=patterns, env=env, capture_output=True, text=True)
+                assert_that(done.returncode).is_equal_to(code)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from assertpy import assert_that
+
+from batch import filename
+from batch import MAX_NAME
+from batch import read_patterns
+from batch import run
+from diskcache import DiskCache
+
+
+class BatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_read_patterns(self):
+        file = io.StringIO('a|b\n\n(c)\na|b\n')
+
+        assert_that(list(read_patterns(file))).is_equal_to(['a|b', '(c)'])
+
+    def test_read_jsonl_reports_bad_lines(self):
+        file = io.StringIO('"a"\n{"pattern": "b"}\nnot json\n{"other": 1}\n[1]\n{"pattern": 2}\n"c"\n')
+        errors = []
+
+        assert_that(list(read_patterns(file, jsonl=True, errors=errors))).is_equal_to(['a', 'b', 'c'])
+        assert_that([error.error.split(':')[:2] for error in errors]).is_equal_to([
+            ['line 3', ' JSONDecodeError'],
+            ['line 4', ' KeyError'],
+            ['line 5', ' TypeError'],
+            ['line 6', ' TypeError'],
+        ])
+
+    def test_filename(self):
+        assert_that(filename('abc')).is_equal_to('abc')
+        assert_that(filename('a+b')).is_not_equal_to(filename('a*b'))
+        assert_that(len(filename('x' * 1000))).is_less_than_or_equal_to(MAX_NAME)
+
+    def test_run_writes_dot_files_and_reports_errors(self):
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                outcomes = list(run(['a|b', '(', 'c*'], self.directory, 'dot', workers=workers, chunksize=1))
+
+                assert_that([outcome.pattern for outcome in outcomes]).is_equal_to(['a|b', '(', 'c*'])
+                assert_that([outcome.error is None for outcome in outcomes]).is_equal_to([True, False, True])
+                for outcome in outcomes:
+                    if outcome.path is not None:
+                        with open(outcome.path) as file:
+                            assert_that(file.read()).starts_with('digraph')
+                assert_that(sorted(os.listdir(self.directory))).is_equal_to(
+                    sorted(f'{filename(pattern)}.dot' for pattern in ('a|b', 'c*')))
+
+    def test_python_engine_writes_svg_without_dot(self):
+        outcomes = list(run(['a|b'], self.directory, 'svg', workers=1, engine='python'))
+
+        assert_that(outcomes[0].path).ends_with('.svg')
+        with open(outcomes[0].path) as file:
+            assert_that(file.read()).contains('<svg')
+        assert_that(os.listdir(self.directory)).is_equal_to([filename('a|b') + '.svg'])
+
+    def test_cached_renders_are_restored(self):
+        cache = DiskCache(os.path.join(self.directory, 'cache'))
+        output = os.path.join(self.directory, 'output')
+        os.mkdir(output)
+        first = list(run(['a|b', '('], output, 'svg', workers=1, engine='python', cache=cache))
+        os.remove(first[0].path)
+        second = list(run(['a|b', '('], output, 'svg', workers=1, engine='python', cache=cache))
+
+        assert_that(second).is_equal_to(first)
+        assert_that(cache.hits).is_equal_to(1)
+        with open(second[0].path) as file:
+            assert_that(file.read()).contains('<svg')
+
+
+if __name__ == '__main__':
+    unittest.main()
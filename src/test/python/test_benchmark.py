@@ -0,0 +1,38 @@
+import unittest
+
+from assertpy import assert_that
+
+import benchmark
+from benchmark import compare
+from benchmark import corpus
+
+
+def results(seconds: float, peak: int) -> dict:
+    return {'patterns': {'small': {'stages': {'parse': {'seconds': seconds, 'peak': peak}}}}}
+
+
+class BenchmarkTest(unittest.TestCase):
+
+    def test_corpus_is_deterministic(self):
+        assert_that(corpus(('small', 'medium'))).is_equal_to(corpus(('small', 'medium')))
+        assert_that({name for name, _ in corpus(('small',))}).is_not_empty()
+
+    def test_compare(self):
+        baseline = results(0.010, 100000)
+
+        assert_that(compare(baseline, results(0.011, 105000))).is_empty()
+        assert_that([(r.stage, r.metric) for r in compare(baseline, results(0.020, 100000))]).is_equal_to(
+            [('parse', 'seconds')])
+        assert_that([(r.stage, r.metric) for r in compare(baseline, results(0.010, 200000))]).is_equal_to(
+            [('parse', 'peak')])
+        assert_that(compare(results(0.0001, 100), results(0.0003, 100))).is_empty()
+
+    def test_measure(self):
+        stages = benchmark.measure('(a|b)*c', repeat=1, budget=0.01)
+
+        assert_that(set(stages)).is_equal_to(set(benchmark.STAGES))
+        assert_that(stages['parse']).contains_key('seconds', 'peak')
+
+
+if __name__ == '__main__':
+    unittest.main()
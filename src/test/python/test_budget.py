@@ -0,0 +1,44 @@
+import unittest
+
+from assertpy import assert_that
+
+from budget import amount
+from budget import BoundedVisitor
+from budget import Budget
+from pipeline import build
+from pipeline import parse
+
+WIDE = '|'.join(f'x{i}' for i in range(100))
+DEEP = '(' * 30 + 'a' + ')' * 30
+
+
+class BudgetTest(unittest.TestCase):
+
+    def test_max_nodes(self):
+        unbounded = len(build(WIDE).graph['nodes'])
+        bounded = build(WIDE, budget=Budget(max_nodes=20)).graph
+
+        assert_that(unbounded).is_greater_than(200)
+        assert_that(len(bounded['nodes'])).is_less_than_or_equal_to(20)
+        assert_that(list(bounded['nodes'].values())[-1]['label']).matches(r'^\.\.\. \d+ more branches$')
+
+    def test_max_depth(self):
+        unbounded = len(build(DEEP).graph['nodes'])
+        bounded = len(build(DEEP, budget=Budget(max_depth=5)).graph['nodes'])
+
+        assert_that(bounded).is_less_than(unbounded)
+
+    def test_within_budget_is_unchanged(self):
+        tree = parse('(a|b)*c')
+
+        assert_that(BoundedVisitor(1000).draw(tree)).is_equal_to(BoundedVisitor().draw(tree))
+
+    def test_zero_nodes_is_unbounded(self):
+        assert_that(build(WIDE, budget=Budget(max_nodes=0)).graph).is_equal_to(build(WIDE).graph)
+
+    def test_amount(self):
+        assert_that([amount(5), amount(1500), amount(2500000)]).is_equal_to(['5', '1.5k', '2.5M'])
+
+
+if __name__ == '__main__':
+    unittest.main()
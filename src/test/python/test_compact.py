@@ -0,0 +1,38 @@
+import unittest
+
+from assertpy import assert_that
+
+from compact import compact
+from compact import CompactGraph
+from pipeline import render
+from utils import convert
+
+PATTERNS = ('(a|b)*c', '^[a-z]+\\d{2,3}$', '(x|y)+?\\bz', '(?:x|y)+?\\bz')
+
+
+class CompactTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        for pattern in PATTERNS:
+            with self.subTest(pattern=pattern):
+                graph = render(pattern).graph
+                assert_that(compact(graph).to_graph()).is_equal_to(graph)
+
+    def test_same_dot(self):
+        for pattern in PATTERNS:
+            with self.subTest(pattern=pattern):
+                graph = render(pattern).graph
+                assert_that(convert(compact(graph), title=pattern)).is_equal_to(convert(graph, title=pattern))
+
+    def test_views(self):
+        graph = render('ab').graph
+        packed = CompactGraph.from_graph(graph)
+
+        assert_that(packed['top']).is_equal_to(graph['top'])
+        assert_that(dict(packed['nodes'])).is_equal_to(graph['nodes'])
+        assert_that(set(packed['edges'])).is_equal_to(set(graph['edges']))
+        self.assertRaises(KeyError, packed.__getitem__, 'other')
+
+
+if __name__ == '__main__':
+    unittest.main()
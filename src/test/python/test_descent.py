@@ -0,0 +1,37 @@
+import unittest
+
+from assertpy import assert_that
+
+from descent import parse
+from descent import ParseError
+from pipeline import parse as parse_with
+
+PATTERNS = (
+    'a', '(a|b)*c', '^[a-z0-9_]+$', 'x{2,3}?y', '(?:ab)+?\\d\\b', '\\p{Greek}+', '(a)\\1', '[^\\]a-c]\\.',
+    '\\x41\\u00e9\\U0001F600', 'a{3}c{1,2}', '(a|b?)|c??', '\\A\\w+\\Z', '[\\d\\s]*\\B',
+)
+
+
+class DescentTest(unittest.TestCase):
+
+    def test_same_tree_as_arpeggio(self):
+        for pattern in PATTERNS:
+            with self.subTest(pattern=pattern):
+                assert_that(repr(parse(pattern))).is_equal_to(repr(parse_with(pattern, using='arpeggio')))
+
+    def test_error_position(self):
+        for pattern, position in (('(a', 2), ('a|(', 3), ('[a', 2)):
+            with self.subTest(pattern=pattern):
+                with self.assertRaises(ParseError) as context:
+                    parse(pattern)
+                assert_that(context.exception.position).is_equal_to(position)
+
+    def test_rejects_what_arpeggio_rejects(self):
+        for pattern in ('(', ')', 'a)', '[', '*a'):
+            with self.subTest(pattern=pattern):
+                self.assertRaises(Exception, parse_with, pattern, using='arpeggio')
+                self.assertRaises(ParseError, parse, pattern)
+
+
+if __name__ == '__main__':
+    unittest.main()
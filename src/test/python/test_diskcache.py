@@ -0,0 +1,78 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+from assertpy import assert_that
+
+import diskcache
+from diskcache import DiskCache
+
+
+class DiskCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = DiskCache(self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_put_and_get(self):
+        key = self.cache.key('a|b', 'svg')
+        assert_that(self.cache.get(key)).is_none()
+
+        self.cache.put(key, b'<svg/>')
+
+        assert_that(key in self.cache).is_true()
+        assert_that(self.cache.get(key)).is_equal_to(b'<svg/>')
+        assert_that((self.cache.hits, self.cache.misses)).is_equal_to((1, 1))
+
+    def test_copy(self):
+        key = self.cache.key('a|b', 'png')
+        destination = os.path.join(self.directory, 'out.png')
+        assert_that(self.cache.copy(key, destination)).is_false()
+
+        self.cache.put(key, b'png')
+
+        assert_that(self.cache.copy(key, destination)).is_true()
+        with open(destination, 'rb') as file:
+            assert_that(file.read()).is_equal_to(b'png')
+
+    def test_keys_depend_on_options_and_version(self):
+        key = self.cache.key('a', 'png', share=False)
+
+        assert_that(self.cache.key('a', 'png', share=True)).is_not_equal_to(key)
+        assert_that(self.cache.key('a', 'svg', share=False)).is_not_equal_to(key)
+        assert_that(DiskCache(self.directory, version='other').key('a', 'png', share=False)).is_not_equal_to(key)
+
+    def test_version_covers_every_renderer(self):
+        directory = os.path.dirname(os.path.abspath(diskcache.__file__))
+        code = ('import sys, batch\n'
+                'print(*(name for name, module in list(sys.modules.items())\n'
+                '        if (getattr(module, "__file__", None) or "").startswith(sys.argv[1])))')
+        env = dict(os.environ, PYTHONPATH=directory)
+        done = subprocess.run([sys.executable, '-c', code, directory + os.sep], env=env, capture_output=True, text=True,
+                              check=True)
+
+        assert_that(set(done.stdout.split()) - set(diskcache.RENDERERS)).is_equal_to({'diskcache'})
+        assert_that(diskcache.RENDERERS).contains('batch', 'rendering', 'unicode_tables')
+
+    def test_prune_removes_least_recently_used(self):
+        keys = [self.cache.key(str(i), 'svg') for i in range(3)]
+        for i, key in enumerate(keys):
+            self.cache.put(key, b'x' * 100)
+            os.utime(self.cache.path(key), (time.time() - 100 + i, time.time() - 100 + i))
+
+        removed = self.cache.prune(max_bytes=250)
+
+        assert_that(removed).is_equal_to(1)
+        assert_that(keys[0] in self.cache).is_false()
+        assert_that(self.cache.stats()).is_equal_to((2, 200))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import gc
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import warnings
+
+from assertpy import assert_that
+
+from export import FormatError
+from export import GraphFile
+from export import GraphWriter
+from export import write_jsonl
+from pipeline import render
+from utils import Graph
+
+PATTERNS = ('(a|b)*c', '^[a-z]+\\d{2,3}$', 'x')
+
+
+def renumbered(graph: Graph) -> Graph:
+    position = {ident: i for i, ident in enumerate(graph['nodes'])}
+
+    return {
+        'top': position[graph['top']],
+        'nodes': {position[ident]: node for ident, node in graph['nodes'].items()},
+        'edges': {position[source]: {position[target]: edge for target, edge in targets.items()}
+                  for source, targets in graph['edges'].items()},
+    }
+
+
+class ExportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'graphs.drg')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, patterns, append: bool = False) -> None:
+        with GraphWriter(self.path, append=append) as writer:
+            for pattern in patterns:
+                writer.add(pattern, render(pattern).graph)
+
+    def test_round_trip(self):
+        self.write(PATTERNS)
+        with GraphFile(self.path) as stored:
+            assert_that(len(stored)).is_equal_to(len(PATTERNS))
+            for pattern, graph in zip(PATTERNS, stored):
+                with self.subTest(pattern=pattern):
+                    assert_that(graph.pattern).is_equal_to(pattern)
+                    assert_that(graph.to_graph()).is_equal_to(renumbered(render(pattern).graph))
+
+    def test_append(self):
+        self.write(PATTERNS[:1])
+        self.write(PATTERNS[1:], append=True)
+        with GraphFile(self.path) as stored:
+            assert_that([stored.pattern(i) for i in range(len(stored))]).is_equal_to(list(PATTERNS))
+
+    def test_unfinished_append_keeps_the_old_file_readable(self):
+        self.write(PATTERNS[:1])
+        writer = GraphWriter(self.path, append=True)
+        writer.add(PATTERNS[1], render(PATTERNS[1]).graph)
+        writer.file.flush()
+        with GraphFile(self.path) as stored:
+            assert_that(len(stored)).is_equal_to(1)
+            assert_that(stored[0].to_graph()).is_equal_to(renumbered(render(PATTERNS[0]).graph))
+
+        writer.close()
+        with GraphFile(self.path) as stored:
+            assert_that(len(stored)).is_equal_to(2)
+
+    def test_rejects_other_files(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'not a graph export at all, just some bytes')
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always', ResourceWarning)
+            self.assertRaises(FormatError, GraphFile, self.path)
+            gc.collect()
+
+        assert_that([w.category for w in caught]).does_not_contain(ResourceWarning)
+
+    def test_jsonl(self):
+        output = io.StringIO()
+        count = write_jsonl(((pattern, render(pattern).graph) for pattern in PATTERNS), output)
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+
+        assert_that(count).is_equal_to(len(PATTERNS))
+        assert_that([record['pattern'] for record in records]).is_equal_to(list(PATTERNS))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+
+from assertpy import assert_that
+
+from incremental import IncrementalRenderer
+from pipeline import build
+from utils import Graph
+
+
+def canonical(graph: Graph) -> list:
+    order, pending = {}, [graph['top']]
+    while pending:
+        ident = pending.pop(0)
+        if ident not in order:
+            order[ident] = len(order)
+            pending.extend(graph['edges'].get(ident, {}))
+
+    def edges(ident: int) -> list:
+        return sorted((order[target], sorted(edge.items())) for target, edge in graph['edges'].get(ident, {}).items())
+
+    return [(graph['nodes'][ident], edges(ident)) for ident in order]
+
+
+class IncrementalTest(unittest.TestCase):
+
+    def test_same_graph_as_a_full_render(self):
+        renderer = IncrementalRenderer()
+        for pattern in ('a', 'ab', 'ab|c', '(ab|c)*', '(ab|cd)*e', 'x(ab|cd)*e'):
+            with self.subTest(pattern=pattern):
+                rendering, _ = renderer.update(pattern)
+                assert_that(canonical(rendering.graph)).is_equal_to(canonical(build(pattern).graph))
+
+    def test_changes(self):
+        renderer = IncrementalRenderer()
+        first, changes = renderer.update('ab|cd')
+        assert_that(changes.added).is_equal_to(frozenset(first.graph['nodes']))
+        assert_that(changes.removed).is_empty()
+
+        second, changes = renderer.update('ab|cde')
+        kept = set(first.graph['nodes']) & set(second.graph['nodes'])
+
+        assert_that(changes.removed).is_not_empty()
+        assert_that(kept).is_not_empty()
+        assert_that(set(second.graph['nodes'])).is_equal_to(kept | changes.added)
+        assert_that(renderer.stats[0]).is_greater_than(0)
+
+    def test_reset(self):
+        renderer = IncrementalRenderer()
+        renderer.update('ab')
+        renderer.reset()
+        _, changes = renderer.update('ab')
+
+        assert_that(changes.removed).is_empty()
+        assert_that(renderer.stats).is_equal_to((0, renderer.stats[1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
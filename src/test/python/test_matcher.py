@@ -0,0 +1,90 @@
+import random
+import re
+import unittest
+
+from assertpy import assert_that
+
+import matcher
+from matcher import Unsupported
+from pipeline import parse
+from syntax import Group
+from syntax import walk
+
+ATOMS = ('a', 'b', 'c', '.', '[ab]', '[^a]', '\\d', '\\w', '[a-c]', '\\.', 'x')
+QUANTIFIERS = ('*', '+', '?', '{2}', '{1,3}', '*?', '+?', '??', '{0,2}?')
+
+
+def generate(rng: random.Random, depth: int = 0) -> str:
+    choice = rng.random()
+    if depth > 3 or choice < 0.35:
+        pattern = rng.choice(ATOMS)
+    elif choice < 0.55:
+        pattern = f"({rng.choice(('', '?:'))}{generate(rng, depth + 1)})"
+    elif choice < 0.75:
+        pattern = generate(rng, depth + 1) + generate(rng, depth + 1)
+    else:
+        pattern = f'({generate(rng, depth + 1)}|{generate(rng, depth + 1)})'
+    if rng.random() < 0.3 and not pattern.endswith(('*', '+', '?', '}')):
+        pattern += rng.choice(QUANTIFIERS)
+
+    return pattern
+
+
+def nullable_repeat(pattern: str) -> bool:
+    for node in walk(parse(pattern)):
+        if isinstance(node, Group) and node.quantifier is not None and node.quantifier.upper != 1:
+            if re.fullmatch(pattern[node.item.start:node.item.end], ''):
+                return True
+
+    return False
+
+
+def spans(pattern: re.Pattern, match, groups: bool) -> tuple:
+    return match and (match.span(), [match.span(i) for i in range(1, pattern.groups + 1)] if groups else None)
+
+
+class MatcherTest(unittest.TestCase):
+
+    def test_same_spans_as_re(self):
+        rng = random.Random(0)
+        for _ in range(300):
+            pattern = generate(rng)
+            pattern = ('^' if rng.random() < 0.2 else '') + pattern + ('$' if rng.random() < 0.2 else '')
+            expected, compiled = re.compile(pattern), matcher.compile(pattern)
+            groups = not nullable_repeat(pattern)
+            for _ in range(5):
+                text = ''.join(rng.choice('abcx1.\n') for _ in range(rng.randint(0, 8)))
+                for method in ('search', 'match', 'fullmatch'):
+                    with self.subTest(pattern=pattern, text=text, method=method):
+                        found = getattr(compiled, method)(text)
+                        reference = getattr(expected, method)(text)
+                        assert_that(spans(expected, found, groups)).is_equal_to(spans(expected, reference, groups))
+
+    def test_search_tries_every_position(self):
+        for pattern, text in (('\\bfoo', ' foo'), ('$', 'ab'), ('\\Bb', 'ab'), ('(?:$)', 'x'), ('a\\b', 'xa')):
+            with self.subTest(pattern=pattern, text=text):
+                assert_that(matcher.compile(pattern).search(text).span()).is_equal_to(re.search(pattern, text).span())
+
+    def test_unicode_classes(self):
+        cases = (('\\w+', 'é'), ('\\d', '٣'), ('\\s', '\u2003'), ('\\bß', ' ß'), ('a\\B', 'aé'), ('\\W', 'é!'),
+                 ('[\\w\\s]+', 'ñ \x1c٣'))
+        for pattern, text in cases:
+            with self.subTest(pattern=pattern, text=text):
+                assert_that(matcher.compile(pattern).search(text).span()).is_equal_to(re.search(pattern, text).span())
+
+    def test_groups(self):
+        match = matcher.compile('(a+)(b)?c').search('xaac')
+
+        assert_that(match.group()).is_equal_to('aac')
+        assert_that(match.groups()).is_equal_to(('aa', None))
+        assert_that(match.start(1)).is_equal_to(1)
+
+    def test_linear_on_pathological_input(self):
+        assert_that(matcher.compile('(a+)+b').match('a' * 5000)).is_none()
+
+    def test_backreference_is_unsupported(self):
+        self.assertRaises(Unsupported, matcher.compile, '(a)\\1')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from assertpy import assert_that
+
+from budget import Budget
+import pipeline
+from pipeline import build
+from pipeline import parse
+from pipeline import parser
+from pipeline import render
+from pipeline import RenderCache
+
+
+class PipelineTest(unittest.TestCase):
+
+    def test_parsers_agree(self):
+        for pattern in ('(a|b)*c', '[^\\d]{2,3}?$'):
+            with self.subTest(pattern=pattern):
+                assert_that(repr(parse(pattern, using='descent'))).is_equal_to(repr(parse(pattern, using='arpeggio')))
+
+    def test_parser_from_environment(self):
+        with mock.patch.dict(os.environ, {pipeline.PARSER_VARIABLE: 'unknown'}):
+            self.assertRaises(ValueError, parse, 'a')
+
+    def test_build(self):
+        rendering = build('(a|b)*c')
+
+        assert_that(rendering.dot).starts_with('digraph')
+        assert_that(rendering.graph['nodes']).contains_key(rendering.graph['top'])
+
+    def test_shared_parser(self):
+        assert_that(parser()).is_same_as(parser())
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            assert_that(executor.submit(parser).result()).is_not_same_as(parser())
+        assert_that(render('(a|b)*c')).is_same_as(render('(a|b)*c'))
+
+    def test_share_and_budget_are_exclusive(self):
+        self.assertRaises(ValueError, build, 'a', share=True, budget=Budget(10))
+
+    def test_import_does_not_build_the_parser(self):
+        code = ('import gc, arpeggio, pipeline\n'
+                'print(any(isinstance(o, arpeggio.ParserPython) for o in gc.get_objects()))')
+        env = dict(os.environ, PYTHONPATH=os.path.dirname(pipeline.__file__))
+        done = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True)
+
+        assert_that(done.stdout.strip()).is_equal_to('False')
+
+    def test_cache(self):
+        cache = RenderCache(maxsize=2)
+        first = cache.get('a')
+
+        assert_that(cache.get('a')).is_same_as(first)
+        cache.get('b')
+        cache.get('c')
+        assert_that(cache.info()).is_equal_to((1, 3, 1, 2, 2))
+
+        cache.resize(1)
+        assert_that(cache.info().currsize).is_equal_to(1)
+        cache.clear()
+        assert_that(cache.info()).is_equal_to((0, 0, 0, 1, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
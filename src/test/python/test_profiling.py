@@ -0,0 +1,42 @@
+import unittest
+
+from assertpy import assert_that
+
+from pipeline import build
+from pipeline import profile as profile_pattern
+from profiling import Profile
+
+
+class ProfilingTest(unittest.TestCase):
+
+    def test_record_and_update(self):
+        first, second = Profile(memory=False), Profile(memory=False)
+        first.record('parse', 0.5, 10)
+        second.record('parse', 0.25, 20)
+        second.count('nodes', 3)
+
+        first.update(second)
+
+        assert_that(first.stages['parse']).is_equal_to((2, 0.75, 20))
+        assert_that(first.as_dict()['counters']['nodes']).is_equal_to(3)
+        assert_that(first.format()).contains('parse')
+
+    def test_stage(self):
+        profile = Profile()
+        with profile.stage('allocate'):
+            data = [0] * 100000
+
+        assert_that(len(data)).is_equal_to(100000)
+        assert_that(profile.stages['allocate'].calls).is_equal_to(1)
+        assert_that(profile.stages['allocate'].peak).is_greater_than(100000)
+
+    def test_profiled_render_is_unchanged(self):
+        rendering, profile = profile_pattern('(a|b)*c')
+
+        assert_that(rendering.dot).is_equal_to(build('(a|b)*c').dot)
+        assert_that(profile.stages).contains_key('parse', 'draw', 'convert')
+        assert_that(profile.counters['nodes']).is_equal_to(len(rendering.graph['nodes']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unicodedata
+import unittest
+from unittest import mock
+
+from assertpy import assert_that
+
+import matcher
+import properties
+import unicode_tables
+from utils import MAX_ORDER
+from utils import Range
+
+
+class PropertiesTest(unittest.TestCase):
+
+    def test_encode_round_trip(self):
+        values = Range([(0, 0), (65, 90), (0x370, 0x3FF), (MAX_ORDER, MAX_ORDER)])
+
+        assert_that(properties.decode(properties.encode(values))).is_equal_to(values)
+
+    def test_categories_agree_with_unicodedata(self):
+        if unicode_tables.UNICODE_VERSION != unicodedata.unidata_version:
+            self.skipTest('unicode_tables.py was generated for another Unicode version')
+
+        for name in ('Lu', 'Nd', 'Zs', 'Po', 'Mn'):
+            values = properties.lookup(name)
+            for code in range(0, 0x3000):
+                with self.subTest(name=name, code=code):
+                    assert_that(code in values).is_equal_to(unicodedata.category(chr(code)) == name)
+
+    def test_aliases(self):
+        assert_that(properties.lookup('Uppercase_Letter')).is_equal_to(properties.lookup('Lu'))
+        assert_that(properties.lookup('is greek')).is_equal_to(properties.lookup('Greek'))
+        assert_that(properties.lookup('L')).is_equal_to(properties.lookup('Lu') | properties.lookup('Ll')
+                                                        | properties.lookup('Lt') | properties.lookup('Lm')
+                                                        | properties.lookup('Lo'))
+
+    def test_category(self):
+        greek = properties.category('\\p{Greek}')
+
+        assert_that(ord('α') in greek).is_true()
+        assert_that(ord('a') in greek).is_false()
+        assert_that(properties.category('\\P{Greek}')).is_equal_to(~greek)
+        assert_that(properties.category('\\p{Klingon}')).is_none()
+        assert_that(properties.category('\\d')).is_none()
+
+    def test_matcher_resolves_categories(self):
+        assert_that(matcher.compile('\\p{Greek}+').search('abc αβγ').span()).is_equal_to((4, 7))
+        assert_that(matcher.compile('[\\p{Lu}\\d]+').search('abAB12c').span()).is_equal_to((2, 6))
+
+    def test_warns_on_version_skew(self):
+        properties._names.cache_clear()
+        try:
+            with mock.patch.object(unicode_tables, 'UNICODE_VERSION', '1.0.0'):
+                with self.assertWarns(RuntimeWarning):
+                    properties.lookup('Lu')
+        finally:
+            properties._names.cache_clear()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import unittest
+
+from assertpy import assert_that
+
+from rendering import graphviz_version
+from rendering import invoke
+from rendering import render
+from rendering import split
+
+PROGRAM = '''#!{python}
+import sys
+import time
+
+if '-V' in sys.argv:
+    sys.stderr.write('fake dot version 1.0\\n')
+    sys.exit(0)
+data = sys.stdin.read()
+if 'SLOW' in data:
+    time.sleep(5)
+if 'FAIL' in data:
+    sys.stderr.write('Error: syntax error\\n')
+    sys.exit(1)
+for i in range(data.count('digraph')):
+    sys.stdout.write('<?xml version="1.0"?>\\n<svg>%d</svg>\\n' % i)
+'''
+
+
+@unittest.skipUnless(os.name == 'posix', 'needs an executable script in place of dot')
+class RenderingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.program = os.path.join(self.directory, 'dot')
+        with open(self.program, 'w') as file:
+            file.write(PROGRAM.format(python=sys.executable))
+        os.chmod(self.program, os.stat(self.program).st_mode | stat.S_IXUSR)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_split(self):
+        output = b'<?xml a?>\n<svg>1</svg>\n<?xml b?>\n<svg>2</svg>\n'
+
+        assert_that(split(output, 'svg')).is_equal_to([b'<?xml a?>\n<svg>1</svg>\n', b'<?xml b?>\n<svg>2</svg>\n'])
+
+    def test_batch(self):
+        images = invoke(['digraph {}\n'] * 3, 'svg', self.program)
+
+        assert_that([image.error for image in images]).is_equal_to([None] * 3)
+        assert_that([image.data for image in images]).is_equal_to(
+            [b'<?xml version="1.0"?>\n<svg>%d</svg>\n' % i for i in range(3)])
+
+    def test_failing_graph_is_isolated(self):
+        images = invoke(['digraph {}\n', 'digraph { FAIL }\n', 'digraph {}\n'], 'svg', self.program)
+
+        assert_that([image.error for image in images]).is_equal_to([None, 'Error: syntax error', None])
+
+    def test_timeout(self):
+        images = invoke(['digraph {}\n', 'digraph { SLOW }\n'], 'svg', self.program, timeout=1)
+
+        assert_that(images[0].error).is_none()
+        assert_that(images[1].error).contains('timed out after 1s')
+
+    def test_missing_program(self):
+        images = invoke(['digraph {}\n'] * 2, 'svg', os.path.join(self.directory, 'missing'))
+
+        assert_that(images).is_length(2)
+        assert_that(images[0].error).starts_with('FileNotFoundError')
+        assert_that(graphviz_version(os.path.join(self.directory, 'missing'))).is_none()
+
+    def test_version(self):
+        assert_that(graphviz_version(self.program)).is_equal_to('fake dot version 1.0')
+
+    def test_render_keeps_order(self):
+        dots = ['digraph { FAIL }\n' if i % 4 == 1 else 'digraph {}\n' for i in range(10)]
+        images = list(render(dots, 'svg', processes=2, batch=3, program=self.program))
+
+        assert_that([image.error is None for image in images]).is_equal_to([i % 4 != 1 for i in range(10)])
+        self.assertRaises(ValueError, list, render(dots, 'gif'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import random
+import re
+import unittest
+
+from assertpy import assert_that
+
+import ruleset
+from ruleset import RuleError
+
+WORDS = ('get', 'put', 'user', 'error', 'timeout', 'ok', 'bob', 'alice')
+
+
+def rules(rng: random.Random, count: int) -> list:
+    shapes = (
+        lambda: f'^{rng.choice(WORDS)}',
+        lambda: f'{rng.choice(WORDS)}$',
+        lambda: f'{rng.choice(WORDS)}=\\w+',
+        lambda: f'\\b{rng.choice(WORDS)}\\b',
+        lambda: f'\\B{rng.choice(WORDS)[1:]}',
+        lambda: f'(?:{rng.choice(WORDS)}|{rng.choice(WORDS)})\\ \\d{{1,3}}',
+        lambda: f'[a-c]+{rng.choice(WORDS)}?x*',
+    )
+
+    return [rng.choice(shapes)() for _ in range(count)]
+
+
+def lines(rng: random.Random, count: int) -> list:
+    pieces = (*WORDS, '=', ' ', '1', '42', 'abc', '\n', 'x')
+
+    return [''.join(rng.choice(pieces) for _ in range(rng.randint(0, 12))) for _ in range(count)]
+
+
+def expected(patterns: list, text: str) -> set:
+    return {index for index, pattern in enumerate(patterns) if re.search(pattern, text)}
+
+
+class RuleSetTest(unittest.TestCase):
+
+    def check(self, cache_size: int) -> ruleset.RuleSet:
+        rng = random.Random(cache_size)
+        patterns = rules(rng, 60)
+        compiled = ruleset.compile(patterns, cache_size=cache_size)
+        for text in lines(rng, 400):
+            with self.subTest(text=text):
+                assert_that(compiled.scan(text)).is_equal_to(expected(patterns, text))
+
+        return compiled
+
+    def test_same_rules_as_re(self):
+        assert_that(self.check(1 << 16).stats().fallback).is_false()
+
+    def test_falls_back_when_the_cache_thrashes(self):
+        compiled = self.check(4)
+
+        assert_that(compiled.stats().flushes).is_greater_than(0)
+        assert_that(compiled.stats().fallback).is_true()
+
+    def test_anchors(self):
+        patterns = ['a$', '^$', '\\B', '\\Aa\\Z', '\\b']
+        compiled = ruleset.compile(patterns)
+        for text in ('', 'a', 'a\n', '\n', 'ba', 'a b'):
+            with self.subTest(text=text):
+                assert_that(compiled.scan(text)).is_equal_to(expected(patterns, text))
+
+    def test_unicode_classes(self):
+        patterns = ['^\\w+$', '\\d', '\\s', '\\bß', 'a\\B', '\\W']
+        compiled = ruleset.compile(patterns)
+        for text in ('é', '٣', '\u2003', ' ß', 'aé', 'ñ!', 'ab'):
+            with self.subTest(text=text):
+                assert_that(compiled.scan(text)).is_equal_to(expected(patterns, text))
+
+    def test_matches(self):
+        compiled = ruleset.compile(['^ERROR', 'user=\\w+', 'timeout\\ \\d+ms'])
+
+        assert_that(compiled.matches('ERROR user=bob')).is_equal_to(['^ERROR', 'user=\\w+'])
+
+    def test_error_names_the_rule(self):
+        with self.assertRaises(RuleError) as context:
+            ruleset.compile(['a', 'b', '(c'])
+
+        assert_that(context.exception.index).is_equal_to(2)
+        assert_that(context.exception.pattern).is_equal_to('(c')
+        assert_that(str(context.exception)).starts_with("Rule 2 ('(c'): ParseError")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import re
+import shutil
+import tempfile
+import unittest
+
+from assertpy import assert_that
+
+import scan
+from scan import display
+from scan import examine
+from scan import extract
+from scan import ident
+from scan import verbose
+
+SOURCE = '''import re
+from re import compile as build, IGNORECASE
+
+WORD = re.compile(r'\\w+')
+VERBOSE = re.search(r"""
+    (\\d+)   # digits
+    [ ]x     # a space and an x
+""", text, re.X | re.I)
+OTHER = build('a|b', flags=IGNORECASE)
+DYNAMIC = re.match('c+', text, options)
+'''
+
+
+class ScanTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'module.py')
+        with open(self.path, 'w') as file:
+            file.write(SOURCE)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_extract(self):
+        sites, error = extract(self.path)
+
+        assert_that(error).is_none()
+        assert_that([(site.line, site.call, site.modes) for site in sites]).is_equal_to([
+            (4, 'compile', ()),
+            (5, 'search', ('IGNORECASE', 'VERBOSE')),
+            (9, 'compile', ('IGNORECASE',)),
+            (10, 'match', None),
+        ])
+
+    def test_verbose_matches_re(self):
+        pattern = extract(self.path)[0][1].pattern
+        stripped = re.compile(verbose(pattern))
+        for text in ('12 x', '12x', 'a 1 x', ' x'):
+            with self.subTest(text=text):
+                expected = re.search(pattern, text, re.VERBOSE)
+                found = stripped.search(text)
+                assert_that(found and found.span()).is_equal_to(expected and expected.span())
+
+    def test_ignore_case_is_drawn(self):
+        plain, folded = examine('[a-c]x'), examine('[a-c]x', ('IGNORECASE',))
+
+        assert_that(folded.translation.pattern).is_equal_to('(?i)[a-c]x')
+        assert_that(folded.nodes).is_greater_than(plain.nodes)
+
+    def test_flags_are_part_of_the_identity(self):
+        assert_that(ident('a', ('IGNORECASE',))).is_not_equal_to(ident('a'))
+        assert_that(ident('a', None)).is_equal_to(ident('a'))
+        assert_that(display('a b', ('IGNORECASE', 'VERBOSE'))).is_equal_to('(?ix)a b')
+
+    def test_scan(self):
+        records = list(scan.scan([self.directory], workers=1))
+        sites = [record for record in records if record['kind'] == 'site']
+        patterns = [record for record in records if record['kind'] == 'pattern']
+
+        assert_that(sites).is_length(4)
+        assert_that(patterns).is_length(4)
+        assert_that({record['id'] for record in patterns}).is_equal_to({record['id'] for record in sites})
+
+    def test_skips_files_without_re(self):
+        path = os.path.join(self.directory, 'other.py')
+        with open(path, 'w') as file:
+            file.write("compile('a+')\n")
+
+        assert_that(extract(path)).is_equal_to(([], None))
+
+
+if __name__ == '__main__':
+    unittest.main()
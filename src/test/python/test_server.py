@@ -0,0 +1,167 @@
+import asyncio
+import unittest
+
+from assertpy import assert_that
+
+from budget import Budget
+from pipeline import build
+from server import DEFAULT_BUDGET
+from server import LINGER
+from server import parse_job
+from server import RenderError
+from server import RenderServer
+
+
+class Writer:
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data: bytes) -> None:
+        self.chunks.append(data)
+
+    async def drain(self) -> None:
+        pass
+
+    def can_write_eof(self) -> bool:
+        return False
+
+    def close(self) -> None:
+        pass
+
+
+class Failing(RenderServer):
+
+    async def render(self, job):
+        raise RuntimeError('boom')
+
+
+class ServerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = RenderServer(workers=2, dot_processes=1, program='/nonexistent/dot')
+
+    def tearDown(self):
+        self.server.close()
+
+    def request(self, target: str, method: str = 'GET', headers: dict = None, body: bytes = b'', server=None):
+        return asyncio.run((server or self.server).respond(method, target, headers or {}, body))
+
+    def test_render_dot(self):
+        status, headers, body = self.request('/render?pattern=a|b&format=dot')
+
+        assert_that(status).is_equal_to(200)
+        assert_that(headers['Content-Type']).starts_with('text/vnd.graphviz')
+        assert_that(body.decode()).contains('digraph')
+
+    def test_post_and_etag(self):
+        status, headers, body = self.request('/render?format=svg&engine=python', 'POST', body=b'(a|b)*c')
+        assert_that(status).is_equal_to(200)
+        assert_that(body.decode()).contains('<svg')
+
+        status, _, body = self.request('/render?format=svg&engine=python', 'POST', {'if-none-match': headers['ETag']},
+                                       b'(a|b)*c')
+        assert_that(status).is_equal_to(304)
+        assert_that(body).is_empty()
+        assert_that(self.server.stats['hits']).is_equal_to(1)
+
+    def test_concurrent_requests_are_coalesced(self):
+        async def run() -> list:
+            target = '/render?pattern=(ab|cd)*e&format=svg&engine=python'
+
+            return await asyncio.gather(*(self.server.respond('GET', target, {}, b'') for _ in range(5)))
+
+        responses = asyncio.run(run())
+
+        assert_that({status for status, _, _ in responses}).is_equal_to({200})
+        assert_that((self.server.stats['renders'], self.server.stats['coalesced'])).is_equal_to((1, 4))
+
+    def test_client_errors(self):
+        assert_that(self.request('/render')[0]).is_equal_to(400)
+        assert_that(self.request('/render?pattern=(')[0]).is_equal_to(400)
+        assert_that(self.request('/render?pattern=a&format=gif')[0]).is_equal_to(400)
+        assert_that(self.request('/render?pattern=a', 'DELETE')[0]).is_equal_to(405)
+        assert_that(self.request('/elsewhere')[0]).is_equal_to(404)
+
+    def test_dot_failure_is_a_bad_gateway(self):
+        assert_that(self.request('/render?pattern=a&format=png')[0]).is_equal_to(502)
+
+    def test_unexpected_errors_are_answered(self):
+        server = Failing()
+        try:
+            status, _, body = self.request('/render?pattern=a', server=server)
+        finally:
+            server.close()
+
+        assert_that(status).is_equal_to(500)
+        assert_that(body.decode()).contains('RuntimeError: boom')
+
+    def test_default_budget(self):
+        assert_that(parse_job({'pattern': ['a']}, None, DEFAULT_BUDGET).budget).is_equal_to(DEFAULT_BUDGET)
+        assert_that(parse_job({'pattern': ['a'], 'share': ['1']}, None, DEFAULT_BUDGET).budget).is_none()
+        assert_that(parse_job({'pattern': ['a'], 'max_depth': ['3']}, None, DEFAULT_BUDGET).budget).is_equal_to(
+            Budget(None, 3))
+        self.assertRaises(RenderError, parse_job, {'pattern': ['a'], 'max_nodes': ['-1']}, None)
+
+    def test_zero_nodes_is_unbounded(self):
+        wide = '|'.join(f'x{i}' for i in range(100))
+        _, _, bounded = self.request(f'/render?pattern={wide}&format=dot&max_nodes=20')
+        _, _, unbounded = self.request(f'/render?pattern={wide}&format=dot&max_nodes=0')
+
+        assert_that(bounded.count(b'label=')).is_less_than(unbounded.count(b'label='))
+        assert_that(unbounded).is_equal_to(build(wide).dot.encode())
+
+    def exchange(self, request: bytes) -> str:
+        async def run() -> str:
+            reader = asyncio.StreamReader()
+            reader.feed_data(request)
+            reader.feed_eof()
+            writer = Writer()
+            await self.server.handle(reader, writer)
+
+            return b''.join(writer.chunks).decode('latin-1')
+
+        return asyncio.run(run())
+
+    def test_connection(self):
+        response = self.exchange(b'GET /render?pattern=a&format=dot HTTP/1.1\r\nConnection: close\r\n\r\n')
+
+        assert_that(response).starts_with('HTTP/1.1 200 OK\r\n')
+        assert_that(response).contains('Connection: close')
+
+    def test_oversized_requests(self):
+        line = b'GET /render?pattern=' + b'a' * (1 << 17) + b' HTTP/1.1\r\n\r\n'
+        header = b'GET /health HTTP/1.1\r\nX-Long: ' + b'a' * (1 << 17) + b'\r\n\r\n'
+        headers = b'GET /health HTTP/1.1\r\n' + b''.join(b'X-%d: 1\r\n' % i for i in range(200)) + b'\r\n'
+        body = b'POST /render HTTP/1.1\r\nContent-Length: %d\r\n\r\n' % (1 << 21)
+
+        assert_that(self.exchange(line)).starts_with('HTTP/1.1 414 ')
+        assert_that(self.exchange(header)).starts_with('HTTP/1.1 431 ')
+        assert_that(self.exchange(headers)).starts_with('HTTP/1.1 431 ')
+        assert_that(self.exchange(body)).starts_with('HTTP/1.1 413 ')
+
+    def test_rejection_reaches_the_client(self):
+        async def run() -> str:
+            handled = asyncio.Event()
+
+            async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+                await self.server.handle(reader, writer)
+                handled.set()
+
+            listener = await asyncio.start_server(handle, '127.0.0.1', 0)
+            async with listener:
+                port = listener.sockets[0].getsockname()[1]
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+                writer.write(b'GET /render?pattern=' + b'a' * (1 << 17) + b' HTTP/1.1\r\n\r\n')
+                await writer.drain()
+                response = await reader.read()
+                writer.close()
+                await asyncio.wait_for(handled.wait(), 2 * LINGER)
+
+            return response.decode('latin-1')
+
+        assert_that(asyncio.run(run())).starts_with('HTTP/1.1 414 ')
+
+
+if __name__ == '__main__':
+    unittest.main()
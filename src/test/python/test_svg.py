@@ -0,0 +1,49 @@
+import io
+import unittest
+from xml.etree import ElementTree
+
+from assertpy import assert_that
+
+from pipeline import render
+import svg
+
+NAMESPACE = '{http://www.w3.org/2000/svg}'
+
+
+class SvgTest(unittest.TestCase):
+
+    def test_well_formed(self):
+        for pattern in ('a', '(a|b)*c', '^[a-z<>&"]+\\d{2,3}$', 'x' * 50):
+            with self.subTest(pattern=pattern):
+                root = ElementTree.fromstring(svg.convert(render(pattern).graph, title=pattern))
+                assert_that(root.tag).is_equal_to(f'{NAMESPACE}svg')
+                assert_that(float(root.get('width'))).is_greater_than(0)
+
+    def test_one_label_per_node_and_edge(self):
+        graph = render('(a|b)*c').graph
+        root = ElementTree.fromstring(svg.convert(graph, title='(a|b)*c'))
+        texts = [text.text for text in root.iter(f'{NAMESPACE}text')]
+        labels = [node['label'] for node in graph['nodes'].values()]
+        labels.extend(edge['label'] for edges in graph['edges'].values() for edge in edges.values() if 'label' in edge)
+
+        assert_that(texts[0]).is_equal_to('(a|b)*c')
+        assert_that(sorted(texts[1:])).is_equal_to(sorted(labels))
+
+    def test_layout_does_not_overlap(self):
+        nodes, _ = svg.layout(render('(ab|cd|ef)+').graph)
+        for depth in {node.depth for node in nodes}:
+            row = sorted((node for node in nodes if node.depth == depth), key=lambda node: node.x)
+            for left, right in zip(row, row[1:]):
+                with self.subTest(depth=depth):
+                    assert_that(right.x - left.x).is_greater_than_or_equal_to((left.width + right.width) / 2)
+
+    def test_write(self):
+        graph = render('a|b').graph
+        output = io.StringIO()
+        svg.write(graph, output)
+
+        assert_that(output.getvalue()).is_equal_to(svg.convert(graph))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+from assertpy import assert_that
+
+from pipeline import parse
+from pipeline import render
+from syntax import Alternative
+from syntax import Atom
+from syntax import CharSet
+from syntax import Group
+from syntax import SET
+from syntax import Sequence
+from syntax import walk
+from utils import Range
+
+
+class SyntaxTest(unittest.TestCase):
+
+    def test_tree(self):
+        tree = parse('(?:ab)+[^a-c]')
+        group, atom = tree.items
+
+        assert_that(tree).is_instance_of(Sequence)
+        assert_that(group).is_instance_of(Group)
+        assert_that((group.capturing, group.quantifier.lower, group.quantifier.upper)).is_equal_to((False, 1, None))
+        assert_that(atom.item).is_instance_of(CharSet)
+        assert_that((atom.item.kind, atom.item.negated, atom.item.values)).is_equal_to((SET, True, Range.span(97, 99)))
+
+    def test_groups_are_numbered_once(self):
+        groups = [node for node in walk(parse('(a)(?:b)((c)|d)')) if isinstance(node, Group)]
+
+        assert_that([group.index for group in groups]).is_equal_to([1, None, 2, 3])
+
+    def test_spans(self):
+        pattern = 'x(ab|cd)*y'
+        alternative = next(node for node in walk(parse(pattern)) if isinstance(node, Alternative))
+
+        assert_that(pattern[alternative.start:alternative.end]).is_equal_to('ab|cd')
+        assert_that([pattern[item.start:item.end] for item in alternative.items]).is_equal_to(['ab', 'cd'])
+
+    def test_walk_visits_every_atom(self):
+        atoms = [node.item.text for node in walk(parse('a(b|c)+d')) if isinstance(node, Atom)]
+
+        assert_that(atoms).is_equal_to(['a', 'b', 'c', 'd'])
+
+    def test_drawing_fixes(self):
+        grouped = [node['label'] for node in render('(?:x|y)+z').graph['nodes'].values()]
+        bracketed = [node['label'] for node in render('a[bc]d').graph['nodes'].values()]
+
+        assert_that(grouped).contains('?:group+')
+        assert_that(bracketed).contains('a', 'charset', 'b-c', 'd').does_not_contain('acharsetd')
+
+
+if __name__ == '__main__':
+    unittest.main()
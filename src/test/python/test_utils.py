@@ -0,0 +1,118 @@
+import io
+import unittest
+
+from arpeggio import ParserPython
+from arpeggio import visit_parse_tree
+from assertpy import assert_that
+
+from grammar import regex
+from utils import Builder
+from utils import convert
+from utils import DIGIT
+from utils import MAX_ORDER
+from utils import order
+from utils import Range
+from utils import SPACE
+from utils import WORD
+from utils import write
+from visitor import RegExVisitor
+
+GRAPH = {
+    'top': 0,
+    'nodes': {0: {'label': 'a"b', 'color': 'red'}, 1: {'label': 'c', 'color': 'red'}},
+    'edges': {0: {1: {'label': 'x'}}, 1: {0: {}}},
+}
+
+
+def labels(pattern: str) -> list:
+    tree = ParserPython(regex, ws='\t ', debug=False).parse(pattern)
+    graph = visit_parse_tree(tree, RegExVisitor(debug=False))
+
+    return [node['label'] for node in graph['nodes'].values()]
+
+
+class RangeTest(unittest.TestCase):
+
+    def test_merges_intervals(self):
+        assert_that(Range([(5, 9), (1, 3), (4, 4), (20, 12)]).intervals).is_equal_to(((1, 9), (12, 20)))
+        assert_that(Range.of(3, 1, 2)).is_equal_to(Range.span(1, 3))
+        assert_that(len(Range([(0, 9), (20, 29)]))).is_equal_to(20)
+
+    def test_operators(self):
+        left, right = Range.span(0, 9), Range.span(5, 14)
+
+        assert_that(left | right).is_equal_to(Range.span(0, 14))
+        assert_that(left & right).is_equal_to(Range.span(5, 9))
+        assert_that(left - right).is_equal_to(Range.span(0, 4))
+        assert_that(~left).is_equal_to(Range.span(10, MAX_ORDER))
+        assert_that(~~left).is_equal_to(left)
+        assert_that(left & right <= left).is_true()
+        assert_that(left <= right).is_false()
+
+    def test_contains(self):
+        assert_that([code in WORD for code in map(ord, 'aZ_9 -')]).is_equal_to([True] * 4 + [False] * 2)
+        assert_that(ord('5') in ~DIGIT).is_false()
+        assert_that([code in WORD for code in map(ord, 'é٣ß\u2003')]).is_equal_to([True] * 3 + [False])
+        assert_that([code in SPACE for code in map(ord, '\u2003\x1c\u200b')]).is_equal_to([True, True, False])
+
+    def test_order(self):
+        assert_that(order('\\x41')).is_equal_to(Range.of(0x41))
+        assert_that(order('\\u00e9')).is_equal_to(Range.of(0xE9))
+        assert_that(order('\\d')).is_equal_to(DIGIT)
+        assert_that(order('\\]')).is_equal_to(Range.of(ord(']')))
+
+    def test_character_sets(self):
+        assert_that(labels('[ace]')[2:]).is_equal_to(['a', 'c', 'e'])
+        assert_that(labels('[\\w]')[2:]).is_equal_to(['\\w'])
+        assert_that(labels('[a-zA-Z0-9_]')[2:]).is_equal_to(['0-9', 'A-Z', '_', 'a-z'])
+        assert_that(labels('[^a-c]')[1:]).is_equal_to(['^charset', 'a-c'])
+
+
+class BuilderTest(unittest.TestCase):
+
+    def test_build_follows_the_merge_order(self):
+        builder = Builder()
+        first, second, third = (builder.add_node(label) for label in 'xyz')
+        graph = builder.merge(first, builder.merge(third, second))
+        built = builder.build(graph)
+
+        assert_that([node['label'] for node in built['nodes'].values()]).is_equal_to(['x', 'z', 'y'])
+        assert_that(built).does_not_contain_key('order')
+
+    def test_visitor_numbers_every_tree_from_zero(self):
+        parser = ParserPython(regex, ws='\t ', debug=False)
+        visitor = RegExVisitor(debug=False)
+        first = visit_parse_tree(parser.parse('(ab|cd)*'), visitor)
+        second = visit_parse_tree(parser.parse('x'), visitor)
+
+        assert_that(sorted(first['nodes'])).is_equal_to(list(range(len(first['nodes']))))
+        assert_that(sorted(second['nodes'])).is_equal_to(list(range(len(second['nodes']))))
+        assert_that(labels('(ab|cd)*')).is_equal_to(
+            ['group*', 'alternative', 'sequence', 'ab', 'atom', 'sequence', 'cd', 'atom'])
+
+
+class StreamTest(unittest.TestCase):
+
+    def test_convert(self):
+        assert_that(convert(GRAPH, title='t')).is_equal_to(
+            'digraph regex_graph {\n'
+            '\t0 [label="a\\"b" color="red"];\n'
+            '\t0 -> 1 [label="x"];\n'
+            '\n'
+            '\t1 [label="c" color="red"];\n'
+            '\t1 -> 0;\n'
+            '\n'
+            '\tlabel="t";\n'
+            '\tlabelloc="t";\n'
+            '\tfontname="times";\n'
+            '}\n')
+
+    def test_write(self):
+        output = io.StringIO()
+        write(GRAPH, output, title='t')
+
+        assert_that(output.getvalue()).is_equal_to(convert(GRAPH, title='t'))
+
+
+if __name__ == '__main__':
+    unittest.main()
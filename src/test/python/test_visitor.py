@@ -0,0 +1,70 @@
+import unittest
+
+from assertpy import assert_that
+
+from pipeline import build
+from pipeline import parse
+from utils import Color
+from utils import Context
+from utils import convert
+from utils import Graph
+from utils import Theme
+from visitor import GraphVisitor
+from visitor import SharingVisitor
+
+PATTERNS = ('(ab|cd)x(ab|cd)', 'a(b|c)*a(b|c)*', '((ab)+|(ab)+)(ab)+')
+
+
+def unfold(graph: Graph, ident: int = None) -> list:
+    ident = graph['top'] if ident is None else ident
+    labels = [graph['nodes'][ident]['label']]
+    for target, edge in graph['edges'].get(ident, {}).items():
+        labels.append(sorted(edge.items()))
+        if target != ident:
+            labels.extend(unfold(graph, target))
+
+    return labels
+
+
+class VisitorTest(unittest.TestCase):
+
+    def test_ids_restart_on_every_draw(self):
+        visitor = GraphVisitor()
+        first = convert(visitor.draw(parse('(a|b)*c')))
+        visitor.draw(parse('x|y|z'))
+
+        assert_that(convert(visitor.draw(parse('(a|b)*c')))).is_equal_to(first)
+        assert_that(convert(GraphVisitor().draw(parse('(a|b)*c')))).is_equal_to(first)
+
+    def test_theme(self):
+        graph = GraphVisitor(context=Context(Theme(negated=Color.BLUE))).draw(parse('[^a]'))
+
+        assert_that([node.get('color') for node in graph['nodes'].values()]).contains(Color.BLUE.value)
+
+    def test_sharing_marks_repeated_subtrees(self):
+        graph = SharingVisitor().draw(parse('(ab|cd)x(ab|cd)'))
+        plain = GraphVisitor().draw(parse('(ab|cd)x(ab|cd)'))
+
+        assert_that(len(graph['nodes'])).is_less_than(len(plain['nodes']))
+        assert_that([node.get('peripheries') for node in graph['nodes'].values()]).contains('2')
+
+    def test_sharing_unfolds_to_the_tree(self):
+        for pattern in PATTERNS:
+            with self.subTest(pattern=pattern):
+                shared = build(pattern, share=True).graph
+                assert_that(unfold(shared)).is_equal_to(unfold(GraphVisitor().draw(parse(pattern))))
+
+    def test_sharing_keeps_no_state_between_draws(self):
+        visitor = SharingVisitor()
+        first = convert(visitor.draw(parse('(ab|cd)x(ab|cd)')))
+        for i in range(20):
+            visitor.draw(parse(f'(a{i}|b{i})+c{i}'))
+
+        assert_that(visitor.table).is_empty()
+        assert_that(visitor.ids).is_empty()
+        assert_that(visitor.interned).is_empty()
+        assert_that(convert(visitor.draw(parse('(ab|cd)x(ab|cd)')))).is_equal_to(first)
+
+
+if __name__ == '__main__':
+    unittest.main()